@@ -0,0 +1,174 @@
+"""Re-align only the assembly sequences that changed since the previous run.
+
+minimap2 aligns every query sequence independently, so the PAF records of an
+unchanged sequence against an unchanged reference can be reused as-is (under
+the sequence's new name, if it was renamed). The cache holds, for one
+reference and preset, the PAF records of every query sequence keyed by the
+content digest of the sequence (see ``fasta_index.sequence_digests``). Its file
+name is the ``mmi_cache.cache_key`` of the reference, which covers the
+reference content, the minimap2 version and the preset.
+
+A run goes in two steps around minimap2, as for ``busco_incremental`` (see
+``sequence_cache``):
+
+  * ``plan`` hashes the assembly and writes the new/changed sequences to a
+    FASTA for minimap2. The cache key needs a pass over the whole reference,
+    so it is only computed here and recorded in the plan;
+  * ``merge`` assembles ``aln.paf`` from the cached records and those of the
+    fresh minimap2 run, in assembly order, adds the records of the current
+    assembly to the cache and reports hit, miss and eviction statistics.
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+from hobrac.fasta_index import fasta_lengths
+from hobrac.mmi_cache import cache_key, minimap2_version
+from hobrac.sequence_cache import (
+    DEFAULT_MAX_SEQUENCES,
+    cached_rows,
+    plan,
+    plan_cache_file,
+    read_cache,
+    read_plan,
+    update_cache,
+)
+
+
+def cache_path(cache_dir: str, reference: str, preset: str, version: str) -> str:
+    return os.path.join(cache_dir, f"{cache_key(reference, version, preset)}.paf.tsv")
+
+
+def merge(
+    plan_file: str,
+    cache_file: str,
+    output_paf: str,
+    new_paf: str = None,
+    lengths: Dict[str, int] = None,
+    max_sequences: int = DEFAULT_MAX_SEQUENCES,
+) -> Dict[str, int]:
+    """Write ``output_paf`` from cached and new records and update the cache.
+
+    Returns hit/miss counts, in sequences and, when ``lengths`` is given, in bp.
+    Raises ValueError when a sequence planned as cached was evicted meanwhile.
+    """
+    _, cached = read_cache(cache_file)
+    new_by_query: Dict[str, List[List[str]]] = {}
+    if new_paf:
+        with open(new_paf) as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) >= 12:
+                    new_by_query.setdefault(fields[0], []).append(fields[1:])
+
+    stats = {"hit": 0, "miss": 0, "hit_bp": 0, "miss_bp": 0}
+    refreshed: Dict[str, List[List[str]]] = {}
+    with open(output_paf, "w") as out:
+        for name, digest, source in read_plan(plan_file):
+            if source == "cached":
+                records = cached_rows(cached, name, digest, cache_file)
+                key = "hit"
+            else:
+                records = new_by_query.get(name, [])
+                key = "miss"
+            stats[key] += 1
+            stats[f"{key}_bp"] += (lengths or {}).get(name, 0)
+            for record in records:
+                out.write(name + "\t" + "\t".join(record) + "\n")
+            refreshed.setdefault(digest, records)
+
+    stats["evicted"] = update_cache(cache_file, [], refreshed, max_sequences)
+    return stats
+
+
+def format_stats(stats: Dict[str, int]) -> str:
+    total = stats["hit"] + stats["miss"]
+    total_bp = stats["hit_bp"] + stats["miss_bp"]
+    rate = 100 * stats["hit"] / total if total else 0.0
+    bp_rate = 100 * stats["hit_bp"] / total_bp if total_bp else 0.0
+    return (
+        "\tsequences\tbp\n"
+        f"hit\t{stats['hit']}\t{stats['hit_bp']}\n"
+        f"miss\t{stats['miss']}\t{stats['miss_bp']}\n"
+        f"hit_rate\t{rate:.2f}%\t{bp_rate:.2f}%\n"
+        f"evicted\t{stats.get('evicted', 0)}\t-\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="aln_cache",
+        description="Reuse per-sequence minimap2 alignments across assembly revisions.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = subparsers.add_parser(
+        "plan", help="Write the new/changed sequences that minimap2 must align."
+    )
+    plan_parser.add_argument("--assembly", required=True, help="Assembly FASTA")
+    plan_parser.add_argument("--changed-fasta", required=True, help="Output FASTA")
+    plan_parser.add_argument("--plan", required=True, help="Output plan TSV")
+
+    merge_parser = subparsers.add_parser(
+        "merge", help="Merge cached records with the new minimap2 run."
+    )
+    merge_parser.add_argument("--plan", required=True, help="Plan TSV from 'plan'")
+    merge_parser.add_argument(
+        "--assembly", required=True, help="Assembly FASTA (for bp statistics)"
+    )
+    merge_parser.add_argument(
+        "--new-paf", default=None, help="PAF of the changed sequences, if any"
+    )
+    merge_parser.add_argument("--out", required=True, help="Output PAF")
+    merge_parser.add_argument(
+        "--stats", default=None, help="Write hit/miss statistics here"
+    )
+    merge_parser.add_argument(
+        "--max-sequences",
+        type=int,
+        default=DEFAULT_MAX_SEQUENCES,
+        help="Evict the least recently used sequences beyond this many (0: never)",
+    )
+
+    plan_parser.add_argument(
+        "--cache-dir", required=True, help="Alignment cache directory"
+    )
+    plan_parser.add_argument("--reference", required=True, help="Reference FASTA")
+    plan_parser.add_argument("-x", "--preset", default="asm20", help="minimap2 preset")
+
+    args = parser.parse_args()
+
+    if args.command == "plan":
+        os.makedirs(args.cache_dir, exist_ok=True)
+        cache_file = cache_path(
+            args.cache_dir, args.reference, args.preset, minimap2_version()
+        )
+        hits, misses = plan(args.assembly, cache_file, args.changed_fasta, args.plan)
+        print(
+            f"Alignment cache: {hits} sequences reused, {misses} new or changed"
+            " sequences to align.",
+            file=sys.stderr,
+        )
+    else:
+        new_paf = args.new_paf
+        if new_paf and not os.path.isfile(new_paf):
+            new_paf = None
+        stats = merge(
+            args.plan,
+            plan_cache_file(args.plan),
+            args.out,
+            new_paf,
+            fasta_lengths(args.assembly),
+            args.max_sequences,
+        )
+        report = format_stats(stats)
+        if args.stats:
+            with open(args.stats, "w") as out:
+                out.write(report)
+        sys.stderr.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""Alignment-free genome-to-genome overview from shared minimizer anchors.
+
+A chromosome-scale dotplot does not need base-level alignments, only where the
+two genomes share long collinear stretches. This step replaces minimap2 with a
+much cheaper sketch-and-join:
+
+  * both FASTAs are reduced to their ``(k, w)`` minimizers (the smallest hash
+    of every window of ``w`` consecutive canonical k-mers), computed with
+    vectorized NumPy operations over fixed-size blocks of each sequence;
+  * minimizers shared by the two genomes are joined through a sorted hash
+    index; hashes occurring more than ``max_occurrences`` times in either
+    genome (repeats) are dropped;
+  * anchors are grouped by sequence pair, relative strand and diagonal band,
+    split on gaps longer than ``max_gap`` and neighbouring pieces are merged
+    back into coarse collinear segments.
+
+Each segment with at least ``min_anchors`` anchors is written as a PAF record,
+with the anchor count in a minimap2-style ``cm:i`` tag and a rough identity
+estimate (the fraction of expected anchors found, to the power ``1/k``) as the
+number of matching bases, so the existing dotplot rules render it unchanged.
+"""
+
+import argparse
+import sys
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from hobrac.fasta_index import iter_sequences
+
+# k-mers handled per vectorized block (sequences are processed block by block).
+BLOCK_KMERS = 1 << 22
+
+_CODES = np.full(256, 4, dtype=np.uint8)
+for _i, _base in enumerate(b"ACGT"):
+    _CODES[_base] = _i
+_NO_HASH = np.iinfo(np.uint64).max
+
+
+class Sketch(NamedTuple):
+    """Minimizers of a FASTA, one entry per minimizer occurrence."""
+
+    names: List[str]
+    lengths: List[int]
+    sequence: np.ndarray  # index into names
+    position: np.ndarray  # k-mer start on the sequence
+    hash: np.ndarray
+    reverse: np.ndarray  # canonical k-mer is the reverse complement
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spreads k-mer codes uniformly over 64 bits."""
+    with np.errstate(over="ignore"):
+        values = values ^ (values >> np.uint64(30))
+        values = values * np.uint64(0xBF58476D1CE4E5B9)
+        values = values ^ (values >> np.uint64(27))
+        values = values * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+
+def _sliding(values: np.ndarray, window: int, op) -> np.ndarray:
+    """``op`` (minimum or maximum) of every window of ``window`` values."""
+    out = values
+    span = 1
+    while span * 2 <= window:
+        out = op(out[:-span], out[span:])
+        span *= 2
+    rest = window - span
+    if rest:
+        out = op(out[: len(out) - rest], out[rest:])
+    return out
+
+
+def kmer_hashes(codes: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Canonical k-mer hashes of 2-bit ``codes`` (4 marks a non-ACGT base).
+
+    k-mers spanning a non-ACGT base, and palindromes, get the maximal hash so
+    they are never picked. Also returns whether the canonical form is reverse.
+    """
+    n = len(codes) - k + 1
+    forward = np.zeros(n, dtype=np.uint64)
+    backward = np.zeros(n, dtype=np.uint64)
+    bases = (codes & 3).astype(np.uint64)
+    for j in range(k):
+        window = bases[j : j + n]
+        forward = (forward << np.uint64(2)) | window
+        backward |= (np.uint64(3) - window) << np.uint64(2 * j)
+
+    invalid = np.concatenate(([0], np.cumsum(codes == 4)))
+    invalid = (invalid[k:] - invalid[:-k]) > 0
+    invalid |= forward == backward
+
+    reverse = backward < forward
+    hashes = _mix(np.minimum(forward, backward))
+    hashes[invalid] = _NO_HASH
+    return hashes, reverse
+
+
+def minimizers(
+    codes: np.ndarray, k: int, w: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positions, hashes and orientations of the ``(k, w)`` minimizers."""
+    n = len(codes) - k + 1
+    if n <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.astype(np.uint64), empty.astype(bool)
+    w = min(w, n)
+    hashes, reverse = kmer_hashes(codes, k)
+
+    # A k-mer is a minimizer when it is the minimum of one of the windows that
+    # contain it, i.e. when it equals the largest of those window minima.
+    window_min = _sliding(hashes, w, np.minimum)
+    padding = np.zeros(w - 1, dtype=np.uint64)
+    best = _sliding(np.concatenate((padding, window_min, padding)), w, np.maximum)
+    selected = np.flatnonzero((hashes == best) & (hashes != _NO_HASH))
+    return selected, hashes[selected], reverse[selected]
+
+
+def sketch_sequence(
+    residues: bytes, k: int, w: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Minimizers of a whole sequence, computed block by block."""
+    codes = _CODES[np.frombuffer(residues, dtype=np.uint8)]
+    n = len(codes) - k + 1
+    if n <= BLOCK_KMERS:
+        return minimizers(codes, k, w)
+
+    positions, hashes, reverse = [], [], []
+    for start in range(0, n, BLOCK_KMERS):
+        stop = min(start + BLOCK_KMERS, n)
+        # Extend the block by the k-mers of every window overlapping it.
+        first = max(start - (w - 1), 0)
+        last = min(stop + (w - 1), n)
+        found, found_hashes, found_reverse = minimizers(
+            codes[first : last + k - 1], k, w
+        )
+        found += first
+        keep = (found >= start) & (found < stop)
+        positions.append(found[keep])
+        hashes.append(found_hashes[keep])
+        reverse.append(found_reverse[keep])
+    return np.concatenate(positions), np.concatenate(hashes), np.concatenate(reverse)
+
+
+def sketch_fasta(fasta_path: str, k: int = 19, w: int = 50) -> Sketch:
+    names, lengths = [], []
+    sequence, positions, hashes, reverse = [], [], [], []
+    for index, (name, residues) in enumerate(iter_sequences(fasta_path)):
+        found, found_hashes, found_reverse = sketch_sequence(residues, k, w)
+        names.append(name)
+        lengths.append(len(residues))
+        sequence.append(np.full(len(found), index, dtype=np.int32))
+        positions.append(found)
+        hashes.append(found_hashes)
+        reverse.append(found_reverse)
+    if not names:
+        sequence, positions = [np.zeros(0, np.int32)], [np.zeros(0, np.int64)]
+        hashes, reverse = [np.zeros(0, np.uint64)], [np.zeros(0, bool)]
+    return Sketch(
+        names,
+        lengths,
+        np.concatenate(sequence),
+        np.concatenate(positions),
+        np.concatenate(hashes),
+        np.concatenate(reverse),
+    )
+
+
+def join_anchors(
+    query: Sketch, target: Sketch, max_occurrences: int = 8
+) -> Dict[str, np.ndarray]:
+    """Pair every query minimizer with the target minimizers of equal hash."""
+    order = np.argsort(target.hash, kind="stable")
+    t_hashes, t_first, t_counts = np.unique(
+        target.hash[order], return_index=True, return_counts=True
+    )
+    _, q_inverse, q_counts = np.unique(
+        query.hash, return_inverse=True, return_counts=True
+    )
+
+    if not len(t_hashes):
+        t_hashes = np.zeros(1, dtype=np.uint64)
+        t_first = t_counts = np.zeros(1, dtype=np.int64)
+    slot = np.minimum(np.searchsorted(t_hashes, query.hash), len(t_hashes) - 1)
+    found = (t_hashes[slot] == query.hash) & (t_counts[slot] > 0)
+    found &= t_counts[slot] <= max_occurrences
+    found &= q_counts[q_inverse] <= max_occurrences
+
+    q_index = np.flatnonzero(found)
+    counts = t_counts[slot[q_index]]
+    first = np.repeat(t_first[slot[q_index]], counts)
+    q_index = np.repeat(q_index, counts)
+    within = np.arange(len(q_index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    t_index = order[first + within]
+
+    return {
+        "q_seq": query.sequence[q_index],
+        "q_pos": query.position[q_index],
+        "t_seq": target.sequence[t_index],
+        "t_pos": target.position[t_index],
+        "reverse": query.reverse[q_index] != target.reverse[t_index],
+    }
+
+
+class Segment(NamedTuple):
+    q_seq: int
+    t_seq: int
+    reverse: bool
+    q_start: int
+    q_end: int
+    t_start: int
+    t_end: int
+    anchors: int
+
+
+def _diagonal_gap(last: Segment, segment: Segment) -> int:
+    """Diagonal shift between the end of ``last`` and the start of ``segment``."""
+    if segment.reverse:
+        return abs((segment.t_end + segment.q_start) - (last.t_start + last.q_end))
+    return abs((segment.t_start - segment.q_start) - (last.t_end - last.q_end))
+
+
+def chain_anchors(
+    anchors: Dict[str, np.ndarray],
+    k: int,
+    band: int = 2000,
+    max_gap: int = 20000,
+    min_anchors: int = 3,
+) -> List[Segment]:
+    """Group anchors into coarse collinear segments.
+
+    Anchors of a sequence pair and relative strand are binned on their diagonal
+    (``band`` wide) and split wherever consecutive anchors are more than
+    ``max_gap`` apart on the query. Pieces whose ends are within ``max_gap`` on
+    the query and ``2 * band`` on the diagonal are then merged, which also joins
+    back the pieces of a segment drifting across a band boundary.
+    """
+    q_seq, q_pos = anchors["q_seq"], anchors["q_pos"]
+    t_seq, t_pos = anchors["t_seq"], anchors["t_pos"]
+    reverse = anchors["reverse"]
+    if not len(q_pos):
+        return []
+
+    diagonal = np.where(reverse, t_pos + q_pos, t_pos - q_pos)
+    bins = np.floor_divide(diagonal, band)
+    order = np.lexsort((q_pos, bins, reverse, t_seq, q_seq))
+    q_seq, q_pos, t_seq, t_pos = q_seq[order], q_pos[order], t_seq[order], t_pos[order]
+    reverse, bins = reverse[order], bins[order]
+
+    breaks = np.flatnonzero(
+        (q_seq[1:] != q_seq[:-1])
+        | (t_seq[1:] != t_seq[:-1])
+        | (reverse[1:] != reverse[:-1])
+        | (bins[1:] != bins[:-1])
+        | (q_pos[1:] - q_pos[:-1] > max_gap)
+    )
+    starts = np.concatenate(([0], breaks + 1))
+    counts = np.diff(np.concatenate((starts, [len(q_pos)])))
+
+    pieces = sorted(
+        Segment(
+            int(q_seq[start]),
+            int(t_seq[start]),
+            bool(reverse[start]),
+            int(q_start),
+            int(q_end) + k,
+            int(t_start),
+            int(t_end) + k,
+            int(count),
+        )
+        for start, q_start, q_end, t_start, t_end, count in zip(
+            starts,
+            np.minimum.reduceat(q_pos, starts),
+            np.maximum.reduceat(q_pos, starts),
+            np.minimum.reduceat(t_pos, starts),
+            np.maximum.reduceat(t_pos, starts),
+            counts,
+        )
+        # Lone anchors are mostly spurious matches; they may only extend a
+        # segment through the merge below if they belong to a longer piece.
+        if count > 1
+    )
+
+    segments: List[Segment] = []
+    for piece in pieces:
+        last = segments[-1] if segments else None
+        if (
+            last
+            and last[:3] == piece[:3]
+            and piece.q_start - last.q_end <= max_gap
+            and _diagonal_gap(last, piece) <= 2 * band
+        ):
+            segments[-1] = last._replace(
+                q_end=max(last.q_end, piece.q_end),
+                t_start=min(last.t_start, piece.t_start),
+                t_end=max(last.t_end, piece.t_end),
+                anchors=last.anchors + piece.anchors,
+            )
+        else:
+            segments.append(piece)
+
+    return [segment for segment in segments if segment.anchors >= min_anchors]
+
+
+def write_paf(
+    segments: List[Segment], query: Sketch, target: Sketch, path: str, k: int, w: int
+) -> None:
+    density = 2 / (w + 1)
+    with open(path, "w") as out:
+        for segment in segments:
+            block = max(
+                segment.q_end - segment.q_start, segment.t_end - segment.t_start
+            )
+            shared = min(1.0, segment.anchors / max(block * density, 1))
+            matches = round(block * shared ** (1 / k))
+            fields = [
+                query.names[segment.q_seq],
+                query.lengths[segment.q_seq],
+                segment.q_start,
+                segment.q_end,
+                "-" if segment.reverse else "+",
+                target.names[segment.t_seq],
+                target.lengths[segment.t_seq],
+                segment.t_start,
+                segment.t_end,
+                matches,
+                block,
+                255,
+                f"cm:i:{segment.anchors}",
+            ]
+            print("\t".join(str(field) for field in fields), file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="anchor_paf",
+        description=(
+            "Write coarse collinear segments between two genomes, chained from"
+            " shared minimizers, as PAF."
+        ),
+    )
+    parser.add_argument("-q", "--query", required=True, help="Query (assembly) FASTA")
+    parser.add_argument("-r", "--reference", required=True, help="Reference FASTA")
+    parser.add_argument("-o", "--output", required=True, help="Output PAF")
+    parser.add_argument("-k", type=int, default=19, help="k-mer size (at most 31)")
+    parser.add_argument("-w", type=int, default=50, help="Minimizer window")
+    parser.add_argument(
+        "--max-occurrences",
+        type=int,
+        default=8,
+        help="Ignore minimizers occurring more often in either genome",
+    )
+    parser.add_argument(
+        "--band", type=int, default=2000, help="Diagonal band width (bp)"
+    )
+    parser.add_argument(
+        "--max-gap", type=int, default=20000, help="Largest gap within a segment (bp)"
+    )
+    parser.add_argument(
+        "--min-anchors", type=int, default=3, help="Minimum anchors per segment"
+    )
+    args = parser.parse_args()
+    if not 1 <= args.k <= 31:
+        parser.error("-k must be between 1 and 31")
+
+    query = sketch_fasta(args.query, args.k, args.w)
+    target = sketch_fasta(args.reference, args.k, args.w)
+    anchors = join_anchors(query, target, args.max_occurrences)
+    segments = chain_anchors(anchors, args.k, args.band, args.max_gap, args.min_anchors)
+    segments.sort(key=lambda s: (s.q_seq, s.q_start, s.t_seq, s.t_start))
+    write_paf(segments, query, target, args.output, args.k, args.w)
+    print(
+        f"{len(query.hash)} query and {len(target.hash)} reference minimizers,"
+        f" {len(anchors['q_pos'])} anchors, {len(segments)} segments",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
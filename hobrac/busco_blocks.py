@@ -0,0 +1,186 @@
+"""Collinear synteny blocks from BUSCO genes shared by two genomes.
+
+``busco_to_paf`` writes one PAF record per shared single-copy BUSCO gene. Most
+questions (is this chromosome a fusion? where are the inversions?) are about
+runs of genes kept in the same order, which this module extracts directly:
+
+  * shared genes are grouped by chromosome pair and ranked by position on
+    each side, so genes of other chromosomes never break a run;
+  * genes are visited in query order and each one extends the open block whose
+    last gene is at most ``max_gap`` ranks behind on the query and adjacent
+    (at most ``max_gap`` ranks away, in the block orientation) on the target;
+    the lookup is a dictionary keyed by target rank, so chaining is linear
+    after the O(n log n) sorts;
+  * blocks with at least ``min_genes`` genes are reported, with their
+    orientation (``+`` when the target ranks increase) and gene count.
+"""
+
+from typing import Dict, List, NamedTuple, Tuple
+
+# Blocks in the TSV/PAF outputs must hold at least this many genes.
+DEFAULT_MIN_GENES = 3
+# Largest rank difference between consecutive genes of a block.
+DEFAULT_MAX_GAP = 3
+
+
+class SharedGene(NamedTuple):
+    busco_id: str
+    query: str
+    query_start: int
+    query_end: int
+    target: str
+    target_start: int
+    target_end: int
+
+
+class Block(NamedTuple):
+    query: str
+    query_start: int
+    query_end: int
+    target: str
+    target_start: int
+    target_end: int
+    strand: str
+    genes: int
+    first_gene: str
+    last_gene: str
+
+
+def shared_genes(query_data: Dict[str, dict], target_data: Dict[str, dict]):
+    """Genes present in both ``read_busco_tsv`` tables, in query table order."""
+    return [
+        SharedGene(
+            busco_id,
+            data["chr"],
+            data["start"],
+            data["end"],
+            target_data[busco_id]["chr"],
+            target_data[busco_id]["start"],
+            target_data[busco_id]["end"],
+        )
+        for busco_id, data in query_data.items()
+        if busco_id in target_data
+    ]
+
+
+def _ranks(genes: List[SharedGene]) -> Tuple[List[int], List[int]]:
+    """Rank of every gene along the query and along the target."""
+    q_order = sorted(range(len(genes)), key=lambda i: (genes[i].query_start, i))
+    t_order = sorted(range(len(genes)), key=lambda i: (genes[i].target_start, i))
+    q_rank = [0] * len(genes)
+    t_rank = [0] * len(genes)
+    for rank, i in enumerate(q_order):
+        q_rank[i] = rank
+    for rank, i in enumerate(t_order):
+        t_rank[i] = rank
+    return q_rank, t_rank
+
+
+def _chain_pair(genes: List[SharedGene], max_gap: int) -> List[List[int]]:
+    """Collinear runs of one chromosome pair, as lists of gene indices."""
+    q_rank, t_rank = _ranks(genes)
+    chains: List[List[int]] = []
+    orientation: List[int] = []  # +1, -1, or 0 while a chain has one gene
+    # Target rank of the last gene of each open chain -> chain index.
+    open_ends: Dict[int, int] = {}
+
+    for i in sorted(range(len(genes)), key=lambda i: q_rank[i]):
+        best = None
+        for delta in range(1, max_gap + 1):
+            for sign in (1, -1):
+                chain = open_ends.get(t_rank[i] - sign * delta)
+                if chain is None or orientation[chain] not in (0, sign):
+                    continue
+                if q_rank[i] - q_rank[chains[chain][-1]] > max_gap:
+                    continue
+                if best is None:
+                    best = (chain, sign)
+            if best is not None:
+                break
+
+        if best is None:
+            chains.append([i])
+            orientation.append(0)
+            open_ends[t_rank[i]] = len(chains) - 1
+            continue
+        chain, sign = best
+        del open_ends[t_rank[chains[chain][-1]]]
+        chains[chain].append(i)
+        orientation[chain] = sign
+        open_ends[t_rank[i]] = chain
+
+    return chains
+
+
+def collinear_blocks(
+    genes: List[SharedGene],
+    max_gap: int = DEFAULT_MAX_GAP,
+    min_genes: int = DEFAULT_MIN_GENES,
+) -> List[Block]:
+    """Synteny blocks of all chromosome pairs, sorted by query position."""
+    by_pair: Dict[Tuple[str, str], List[SharedGene]] = {}
+    for gene in genes:
+        by_pair.setdefault((gene.query, gene.target), []).append(gene)
+
+    blocks = []
+    for (query, target), pair_genes in by_pair.items():
+        for chain in _chain_pair(pair_genes, max_gap):
+            if len(chain) < min_genes:
+                continue
+            members = [pair_genes[i] for i in chain]
+            increasing = members[-1].target_start >= members[0].target_start
+            blocks.append(
+                Block(
+                    query,
+                    min(g.query_start for g in members),
+                    max(g.query_end for g in members),
+                    target,
+                    min(g.target_start for g in members),
+                    max(g.target_end for g in members),
+                    "+" if increasing else "-",
+                    len(members),
+                    members[0].busco_id,
+                    members[-1].busco_id,
+                )
+            )
+
+    blocks.sort(key=lambda b: (b.query, b.query_start, b.target, b.target_start))
+    return blocks
+
+
+def write_blocks_tsv(blocks: List[Block], output_file: str) -> None:
+    with open(output_file, "w") as out:
+        print("\t".join(Block._fields), file=out)
+        for block in blocks:
+            print("\t".join(str(value) for value in block), file=out)
+
+
+def write_blocks_paf(
+    blocks: List[Block],
+    len_query: Dict[str, int],
+    len_target: Dict[str, int],
+    output_file: str,
+) -> None:
+    """One PAF record per block; the gene count goes in an ``ng:i`` tag."""
+    with open(output_file, "w") as out:
+        for block in blocks:
+            length = max(
+                block.query_end - block.query_start,
+                block.target_end - block.target_start,
+            )
+            fields = [
+                block.query,
+                len_query[block.query],
+                block.query_start,
+                block.query_end,
+                block.strand,
+                block.target,
+                len_target[block.target],
+                block.target_start,
+                block.target_end,
+                length,
+                length,
+                60,
+                f"ng:i:{block.genes}",
+            ]
+            print("\t".join(str(field) for field in fields), file=out)
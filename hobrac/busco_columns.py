@@ -0,0 +1,144 @@
+"""Columnar loader for BUSCO ``full_table.tsv`` with a binary sidecar cache.
+
+Several steps read the same BUSCO tables (``busco_to_paf`` once per
+reference, the JCVI synteny analysis once per species), each building its own
+per-gene objects. This loader parses a table once into NumPy columns: gene ids,
+interned chromosome and status codes, and start/end coordinates, one row per
+located hit (``Missing`` rows carry no coordinates and are skipped).
+
+When a cache directory is given, the columns are cached there as one ``.npz``
+per table, named after the table's absolute path and keyed by its size and
+modification time, so later readers load the binary arrays instead of
+re-parsing the text. The BUSCO directories themselves are never written to:
+they are the outputs of other workflow rules, or user-supplied. The cache is
+best-effort: an unwritable cache directory simply goes unused.
+"""
+
+import hashlib
+import os
+from typing import List, NamedTuple
+
+import numpy as np
+
+SIDECAR_SUFFIX = ".npz"
+# Bumped whenever the sidecar layout changes, to invalidate older caches.
+SIDECAR_VERSION = 1
+
+
+class BuscoColumns(NamedTuple):
+    busco_id: np.ndarray  # str
+    chromosome: np.ndarray  # int32 code into ``chromosomes``
+    start: np.ndarray  # int64
+    end: np.ndarray  # int64
+    status: np.ndarray  # int8 code into ``statuses``
+    chromosomes: List[str]
+    statuses: List[str]
+
+    def status_mask(self, status: str = "Complete") -> np.ndarray:
+        if status not in self.statuses:
+            return np.zeros(len(self.busco_id), dtype=bool)
+        return self.status == self.statuses.index(status)
+
+    def complete_mask(self, min_genes: int = 0) -> np.ndarray:
+        """Complete rows, restricted to chromosomes with ``min_genes`` of them."""
+        mask = self.status_mask("Complete")
+        if min_genes > 0:
+            counts = np.bincount(self.chromosome[mask], minlength=len(self.chromosomes))
+            mask &= counts[self.chromosome] >= min_genes
+        return mask
+
+
+def sidecar_path(table_path: str, cache_dir: str) -> str:
+    name = hashlib.blake2b(
+        os.path.abspath(table_path).encode(), digest_size=16
+    ).hexdigest()
+    return os.path.join(cache_dir, name + SIDECAR_SUFFIX)
+
+
+def parse_table(table_path: str) -> BuscoColumns:
+    chromosome_codes = {}
+    status_codes = {}
+    busco_ids, chromosomes, starts, ends, statuses = [], [], [], [], []
+    with open(table_path) as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 5:
+                continue
+            busco_ids.append(parts[0])
+            statuses.append(status_codes.setdefault(parts[1], len(status_codes)))
+            chromosomes.append(
+                chromosome_codes.setdefault(parts[2], len(chromosome_codes))
+            )
+            starts.append(int(parts[3]))
+            ends.append(int(parts[4]))
+
+    return BuscoColumns(
+        np.array(busco_ids, dtype=str),
+        np.array(chromosomes, dtype=np.int32),
+        np.array(starts, dtype=np.int64),
+        np.array(ends, dtype=np.int64),
+        np.array(statuses, dtype=np.int8),
+        list(chromosome_codes),
+        list(status_codes),
+    )
+
+
+def _stamp(table_path: str) -> np.ndarray:
+    stat = os.stat(table_path)
+    return np.array([SIDECAR_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def _read_sidecar(path: str, stamp: np.ndarray):
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if not np.array_equal(data["stamp"], stamp):
+                return None
+            return BuscoColumns(
+                data["busco_id"],
+                data["chromosome"],
+                data["start"],
+                data["end"],
+                data["status"],
+                data["chromosomes"].tolist(),
+                data["statuses"].tolist(),
+            )
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_sidecar(path: str, columns: BuscoColumns, stamp: np.ndarray):
+    tmp_path = f"{path}.tmp.{os.getpid()}.npz"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(
+            tmp_path,
+            stamp=stamp,
+            busco_id=columns.busco_id,
+            chromosome=columns.chromosome,
+            start=columns.start,
+            end=columns.end,
+            status=columns.status,
+            chromosomes=np.array(columns.chromosomes, dtype=str),
+            statuses=np.array(columns.statuses, dtype=str),
+        )
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_table(table_path: str, cache_dir: str = "") -> BuscoColumns:
+    """Columns of ``table_path``, from ``cache_dir`` when its entry is up to date."""
+    if not cache_dir:
+        return parse_table(table_path)
+    path = sidecar_path(table_path, cache_dir)
+    stamp = _stamp(table_path)
+    columns = _read_sidecar(path, stamp)
+    if columns is None:
+        columns = parse_table(table_path)
+        _write_sidecar(path, columns, stamp)
+    return columns
@@ -0,0 +1,173 @@
+"""Re-run BUSCO only on the sequences that changed since the previous run.
+
+During curation the assembly is revised many times, usually by joining,
+splitting or renaming a handful of scaffolds. BUSCO hits are local to the
+sequence they sit on, so the hits of a sequence whose residues did not change
+can be reused as-is (under its new name, if it was renamed).
+
+The hit cache holds, for one BUSCO lineage and gene predictor, every hit row of
+the previous runs keyed by the content digest of its sequence (see
+``fasta_index.sequence_digests``; the cache format and ``plan`` are shared with
+``aln_cache``, see ``sequence_cache``). A run goes in two steps around BUSCO:
+
+  * ``plan`` hashes the assembly, writes the new/changed sequences to a FASTA
+    for BUSCO and records, per sequence, whether its hits come from the cache;
+  * ``merge`` joins the cached hits with the rows of the fresh BUSCO run,
+    re-resolves Complete/Duplicated over the merged set, writes the final
+    ``full_table.tsv`` and adds the hits of the current assembly to the cache,
+    which keeps those of other assemblies (see ``sequence_cache``).
+
+When nothing changed, ``plan`` writes an empty FASTA and BUSCO is skipped.
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+from hobrac.busco_table import (
+    is_hit,
+    read_full_table,
+    resolve_statuses,
+    write_full_table,
+    write_short_summary,
+)
+from hobrac.sequence_cache import (
+    DEFAULT_MAX_SEQUENCES,
+    cached_rows,
+    plan,
+    read_cache,
+    read_plan,
+    update_cache,
+)
+
+# Digest column value of the rows that only record BUSCO id order.
+ORDER_KEY = "-"
+
+
+def cache_path(cache_dir: str, lineage: str, method: str) -> str:
+    """Path of the hit cache for one lineage / gene predictor combination.
+
+    Besides the hits, the cache holds one Missing row per BUSCO id of the
+    lineage under ``ORDER_KEY``, in table order.
+    """
+    return os.path.join(cache_dir, f"{lineage}.{method}.tsv")
+
+
+def merge(
+    plan_file: str,
+    cache_file: str,
+    output_table: str,
+    busco_table: str = None,
+    max_sequences: int = DEFAULT_MAX_SEQUENCES,
+) -> List[List[str]]:
+    """Build the full table for the current assembly and update the cache.
+
+    ``busco_table`` is the ``full_table.tsv`` of the BUSCO run on the changed
+    sequences, or None when every sequence came from the cache. Raises
+    ValueError when a sequence planned as cached was evicted meanwhile.
+    """
+    cached_header, cached = read_cache(cache_file)
+    new_header: List[str] = []
+    new_rows: List[List[str]] = []
+    if busco_table:
+        new_header, new_rows = read_full_table(busco_table)
+
+    new_by_sequence: Dict[str, List[List[str]]] = {}
+    for row in new_rows:
+        if is_hit(row):
+            new_by_sequence.setdefault(row[2], []).append(row)
+
+    # BUSCO id order (and the ids of genes missing everywhere) comes from the
+    # fresh run when there is one, else from the previous run.
+    if new_rows:
+        order_rows = [[row[0], "Missing"] for row in new_rows]
+    else:
+        order_rows = cached.get(ORDER_KEY, [])
+
+    merged = list(order_rows)
+    refreshed: Dict[str, List[List[str]]] = {}
+    for name, digest, source in read_plan(plan_file):
+        if source == "cached":
+            rows = [
+                [row[0], row[1], name, *row[3:]]
+                for row in cached_rows(cached, name, digest, cache_file)
+            ]
+        else:
+            rows = new_by_sequence.get(name, [])
+        merged.extend(rows)
+        refreshed.setdefault(digest, rows)
+
+    resolved = resolve_statuses(merged)
+    header = new_header or cached_header
+
+    os.makedirs(os.path.dirname(output_table) or ".", exist_ok=True)
+    write_full_table(output_table, header, resolved)
+    write_short_summary(
+        os.path.join(os.path.dirname(output_table), "short_summary.txt"),
+        resolved,
+        "Incremental BUSCO table assembled by hobrac from cached and new hits",
+    )
+
+    cache_rows = {ORDER_KEY: [[row[0], "Missing"] for row in resolved]}
+    cache_rows.update(refreshed)
+    update_cache(cache_file, header, cache_rows, max_sequences)
+
+    return resolved
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="busco_incremental",
+        description="Reuse per-sequence BUSCO hits across assembly revisions.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = subparsers.add_parser(
+        "plan", help="Write the new/changed sequences that BUSCO must process."
+    )
+    plan_parser.add_argument("--assembly", required=True, help="Assembly FASTA")
+    plan_parser.add_argument("--changed-fasta", required=True, help="Output FASTA")
+    plan_parser.add_argument("--plan", required=True, help="Output plan TSV")
+
+    merge_parser = subparsers.add_parser(
+        "merge", help="Merge cached hits with the new BUSCO run."
+    )
+    merge_parser.add_argument("--plan", required=True, help="Plan TSV from 'plan'")
+    merge_parser.add_argument(
+        "--busco-table",
+        default=None,
+        help="full_table.tsv of the BUSCO run on the changed sequences, if any",
+    )
+    merge_parser.add_argument("--out", required=True, help="Output full_table.tsv")
+    merge_parser.add_argument(
+        "--max-sequences",
+        type=int,
+        default=DEFAULT_MAX_SEQUENCES,
+        help="Evict the least recently used sequences beyond this many (0: never)",
+    )
+
+    for sub in (plan_parser, merge_parser):
+        sub.add_argument("--cache-dir", required=True, help="Hit cache directory")
+        sub.add_argument("--lineage", required=True, help="BUSCO lineage name")
+        sub.add_argument("--method", required=True, help="BUSCO gene predictor")
+
+    args = parser.parse_args()
+    cache_file = cache_path(args.cache_dir, args.lineage, args.method)
+
+    if args.command == "plan":
+        reused, changed = plan(args.assembly, cache_file, args.changed_fasta, args.plan)
+        print(
+            f"Incremental BUSCO: {reused} sequences reused from cache,"
+            f" {changed} new or changed sequences to process.",
+            file=sys.stderr,
+        )
+    else:
+        busco_table = args.busco_table
+        if busco_table and not os.path.isfile(busco_table):
+            busco_table = None
+        merge(args.plan, cache_file, args.out, busco_table, args.max_sequences)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Build a reduced BUSCO lineage dataset for quick-look runs.
+
+A full BUSCO run dominates the runtime of a first karyotype, while the ALG
+assignment of the assembly chromosomes only needs a few hundred well-spread
+markers. ``select_markers`` picks a deterministic subset of the lineage markers
+that is spread evenly over the ALGs of the pre-computed colour files
+(``hobrac/colors/Busco.Colors.<scheme>.<lineage>``): every ALG of every scheme
+gets its turn in a round robin, so small ALGs stay represented. Markers are
+ranked inside an ALG by a hash of their id rather than by id, so the subset is
+stable across runs but not biased towards low OrthoDB ids.
+
+``write_subset_dataset`` copies the lineage directory of ``busco_downloads``
+keeping only the chosen markers (HMMs, profiles, cutoffs, reference proteins),
+which BUSCO then runs against exactly as it would against the full dataset.
+
+The complement of a quick-look subset is a dataset too: running BUSCO on it and
+merging the tables with ``busco_table.merge_tables`` upgrades a quick look to a
+full run without searching the already processed markers again.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sys
+from typing import Dict, Iterable, List, Set
+
+from xopen import xopen
+
+# OrthoDB group ids used as BUSCO marker names, e.g. 100960at7898.
+MARKER_RE = re.compile(r"^\d+at\d+$")
+
+
+def default_colors_dir() -> str:
+    import hobrac
+
+    return os.path.join(os.path.dirname(hobrac.__file__), "colors")
+
+
+def lineage_color_files(colors_dir: str, lineage: str) -> List[str]:
+    """Colour files of every scheme available for ``lineage``, sorted by name."""
+    if not os.path.isdir(colors_dir):
+        return []
+    suffix = f".{lineage}"
+    return sorted(
+        os.path.join(colors_dir, name)
+        for name in os.listdir(colors_dir)
+        if name.startswith("Busco.Colors.") and name.endswith(suffix)
+    )
+
+
+def read_alg_groups(color_file: str) -> Dict[str, List[str]]:
+    """Return ``{alg_name: [busco_id, ...]}`` from a ``BUSCO_ID COLOR ALG`` file."""
+    groups: Dict[str, List[str]] = {}
+    with open(color_file) as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 3 or line.startswith("#"):
+                continue
+            groups.setdefault(fields[2], []).append(fields[0])
+    return groups
+
+
+def _rank(marker: str) -> str:
+    return hashlib.blake2b(marker.encode(), digest_size=8).hexdigest()
+
+
+def select_markers(
+    markers: Iterable[str], color_files: List[str], n_markers: int
+) -> List[str]:
+    """Pick ``n_markers`` markers spread evenly over the ALGs of ``color_files``.
+
+    ALG groups of all colour files take turns, one marker each, until the target
+    is reached or every group is exhausted; markers absent from all colour files
+    fill any remaining slots. Only ids present in ``markers`` are selected, and
+    the result is sorted so it does not depend on the selection order.
+    """
+    available = set(markers)
+    groups = []
+    for color_file in color_files:
+        for _, members in sorted(read_alg_groups(color_file).items()):
+            ranked = sorted((m for m in set(members) if m in available), key=_rank)
+            if ranked:
+                groups.append(ranked)
+
+    selected: Set[str] = set()
+    positions = [0] * len(groups)
+    progress = True
+    while len(selected) < n_markers and progress:
+        progress = False
+        for i, group in enumerate(groups):
+            # Skip markers already taken through another scheme's ALG.
+            while positions[i] < len(group) and group[positions[i]] in selected:
+                positions[i] += 1
+            if positions[i] < len(group):
+                selected.add(group[positions[i]])
+                positions[i] += 1
+                progress = True
+                if len(selected) >= n_markers:
+                    break
+
+    for marker in sorted(available - selected, key=_rank):
+        if len(selected) >= n_markers:
+            break
+        selected.add(marker)
+
+    return sorted(selected)
+
+
+def lineage_markers(lineage_dir: str) -> List[str]:
+    """All marker ids of a BUSCO lineage directory, from its HMMs or cutoffs."""
+    hmm_dir = os.path.join(lineage_dir, "hmms")
+    if os.path.isdir(hmm_dir):
+        return sorted(
+            name.split(".")[0]
+            for name in os.listdir(hmm_dir)
+            if MARKER_RE.match(name.split(".")[0])
+        )
+    markers = []
+    with open(os.path.join(lineage_dir, "scores_cutoff")) as f:
+        for line in f:
+            if line.split() and MARKER_RE.match(line.split()[0]):
+                markers.append(line.split()[0])
+    return sorted(markers)
+
+
+def _line_marker(line: str):
+    """Marker id a line of a tabular or FASTA lineage file refers to, if any."""
+    fields = line.lstrip(">").split()
+    if not fields:
+        return None
+    # Reference protein and ancestral sequence names append "_<suffix>".
+    candidate = fields[0].split("_")[0]
+    return candidate if MARKER_RE.match(candidate) else None
+
+
+def _filter_file(src: str, dst: str, keep: Set[str]) -> None:
+    """Copy ``src`` dropping the lines (or FASTA records) of unselected markers."""
+    keep_record = True
+    with xopen(src) as fin, xopen(dst, "w") as fout:
+        for line in fin:
+            marker = _line_marker(line)
+            if line.startswith(">"):
+                keep_record = marker is None or marker in keep
+                if not keep_record:
+                    continue
+            elif marker is not None:
+                if marker not in keep:
+                    continue
+            elif not keep_record:
+                continue
+            fout.write(line)
+
+
+def _update_config(src: str, dst: str, n_markers: int) -> None:
+    with open(src) as fin, open(dst, "w") as fout:
+        for line in fin:
+            if line.startswith("number_of_BUSCOs="):
+                line = f"number_of_BUSCOs={n_markers}\n"
+            fout.write(line)
+
+
+def write_subset_dataset(lineage_dir: str, out_dir: str, markers: List[str]) -> None:
+    """Copy a BUSCO lineage directory restricted to ``markers``.
+
+    Per-marker files (``hmms/<id>.hmm``, ``prfl/<id>.prfl``...) of other markers
+    are skipped, files listing markers line by line or as FASTA records are
+    filtered, and everything else is copied unchanged.
+    """
+    keep = set(markers)
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+
+    for root, _, files in os.walk(lineage_dir):
+        dest_root = os.path.join(out_dir, os.path.relpath(root, lineage_dir))
+        os.makedirs(dest_root, exist_ok=True)
+        for name in files:
+            src = os.path.join(root, name)
+            dst = os.path.join(dest_root, name)
+            stem = name.split(".")[0]
+            if MARKER_RE.match(stem):
+                if stem in keep:
+                    shutil.copy2(src, dst)
+            elif name == "dataset.cfg":
+                _update_config(src, dst, len(keep))
+            elif name.startswith("links_to_") or name in (
+                "lengths_cutoff",
+                "scores_cutoff",
+                "ancestral",
+                "ancestral_variants",
+                "refseq_db.faa.gz",
+            ):
+                _filter_file(src, dst, keep)
+            else:
+                shutil.copy2(src, dst)
+
+
+def read_marker_list(path: str) -> List[str]:
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="busco_subset",
+        description=(
+            "Write a reduced BUSCO lineage dataset: an ALG-balanced quick-look"
+            " subset of the markers, or the complement of a previous subset."
+        ),
+    )
+    parser.add_argument(
+        "--download-dir", required=True, help="BUSCO download directory (source)"
+    )
+    parser.add_argument(
+        "--lineage", required=True, help="Lineage dataset name, e.g. metazoa_odb12"
+    )
+    parser.add_argument(
+        "--out-dir", required=True, help="Download directory to write the subset to"
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--markers", type=int, help="Number of markers of the quick-look subset"
+    )
+    group.add_argument(
+        "--complement-of",
+        help="Marker list of a quick-look run; write all the other markers",
+    )
+    parser.add_argument(
+        "--selected-out", default=None, help="Write the selected marker ids here"
+    )
+    parser.add_argument(
+        "--colors-dir",
+        default=None,
+        help="Directory of Busco.Colors.* files (default: the bundled ones)",
+    )
+    args = parser.parse_args()
+
+    lineage_dir = os.path.join(args.download_dir, "lineages", args.lineage)
+    markers = lineage_markers(lineage_dir)
+
+    if args.complement_of:
+        done = set(read_marker_list(args.complement_of))
+        selected = [m for m in markers if m not in done]
+        what = f"complement of {len(done)} quick-look markers"
+    else:
+        color_files = lineage_color_files(
+            args.colors_dir or default_colors_dir(), args.lineage
+        )
+        selected = select_markers(markers, color_files, args.markers)
+        what = f"ALG-balanced subset over {len(color_files)} colour files"
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    write_subset_dataset(
+        lineage_dir, os.path.join(args.out_dir, "lineages", args.lineage), selected
+    )
+    # Keep the download bookkeeping files BUSCO may look at in offline mode.
+    for name in os.listdir(args.download_dir):
+        src = os.path.join(args.download_dir, name)
+        if os.path.isfile(src):
+            shutil.copy2(src, os.path.join(args.out_dir, name))
+
+    if args.selected_out:
+        with open(args.selected_out, "w") as out:
+            for marker in selected:
+                print(marker, file=out)
+
+    print(
+        f"{args.lineage}: {len(selected)} of {len(markers)} markers ({what})",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Read, merge and write BUSCO ``full_table.tsv`` files row by row.
+
+Downstream steps (``busco_to_paf``, ``jcvi_synteny``) only ever read the
+``Complete`` rows of a ``full_table.tsv``, but whenever hobrac has to stitch a
+table together from several partial BUSCO runs the Complete/Duplicated status
+of each BUSCO must be decided again over the merged hit set: a gene found once
+in each of two partial runs is ``Duplicated``, not twice ``Complete``.
+
+Rows are kept as plain lists of fields so every BUSCO column (score, length,
+OrthoDB url, description...) survives a round trip untouched.
+"""
+
+import argparse
+import os
+from typing import Dict, List, Tuple
+
+COMPLETE_STATUSES = ("Complete", "Duplicated")
+
+DEFAULT_HEADER = [
+    "# Busco id\tStatus\tSequence\tGene Start\tGene End\tStrand\tScore\tLength"
+    "\tOrthoDB url\tDescription\n"
+]
+
+
+def read_full_table(file_path: str) -> Tuple[List[str], List[List[str]]]:
+    """Return the ``#`` header lines and the data rows of a ``full_table.tsv``."""
+    header = []
+    rows = []
+    with open(file_path) as f:
+        for line in f:
+            if line.startswith("#"):
+                header.append(line)
+                continue
+            line = line.rstrip("\n")
+            if line:
+                rows.append(line.split("\t"))
+    return header, rows
+
+
+def write_full_table(file_path: str, header: List[str], rows: List[List[str]]) -> None:
+    """Write ``rows`` to ``file_path`` after the ``header`` comment lines."""
+    with open(file_path, "w") as f:
+        for line in header or DEFAULT_HEADER:
+            f.write(line if line.endswith("\n") else line + "\n")
+        for row in rows:
+            f.write("\t".join(row) + "\n")
+
+
+def is_hit(row: List[str]) -> bool:
+    """Return True if the row locates a gene (i.e. is not a Missing row)."""
+    return len(row) >= 5 and row[1] != "Missing"
+
+
+def resolve_statuses(rows: List[List[str]]) -> List[List[str]]:
+    """Re-derive the status of every BUSCO over a merged set of hit rows.
+
+    For each BUSCO id:
+      * two or more Complete/Duplicated hits: every hit becomes ``Duplicated``;
+      * exactly one: it becomes ``Complete``;
+      * none, but Fragmented hits: the fragments are kept as ``Fragmented``;
+      * nothing at all: a single ``Missing`` row.
+
+    Fragments of a BUSCO that is complete elsewhere are dropped, as BUSCO does.
+    Input ``Missing`` rows only contribute their id, so a gene missing from one
+    partial run but found in another ends up found. BUSCO ids keep the order in
+    which they first appear in ``rows``.
+    """
+    order: List[str] = []
+    complete: Dict[str, List[List[str]]] = {}
+    fragmented: Dict[str, List[List[str]]] = {}
+
+    for row in rows:
+        busco_id = row[0]
+        if busco_id not in complete:
+            order.append(busco_id)
+            complete[busco_id] = []
+            fragmented[busco_id] = []
+        if not is_hit(row):
+            continue
+        if row[1] in COMPLETE_STATUSES:
+            complete[busco_id].append(row)
+        else:
+            fragmented[busco_id].append(row)
+
+    resolved = []
+    for busco_id in order:
+        hits = complete[busco_id]
+        if hits:
+            status = "Duplicated" if len(hits) > 1 else "Complete"
+            resolved.extend([row[0], status, *row[2:]] for row in hits)
+        elif fragmented[busco_id]:
+            resolved.extend(
+                [row[0], "Fragmented", *row[2:]] for row in fragmented[busco_id]
+            )
+        else:
+            resolved.append([busco_id, "Missing"])
+    return resolved
+
+
+def summarize(rows: List[List[str]]) -> Dict[str, int]:
+    """Count single-copy, duplicated, fragmented and missing BUSCOs."""
+    statuses: Dict[str, str] = {}
+    for row in rows:
+        # Duplicated rows repeat the id; the first status seen is representative.
+        statuses.setdefault(row[0], row[1])
+    counts = {"S": 0, "D": 0, "F": 0, "M": 0}
+    key = {"Complete": "S", "Duplicated": "D", "Fragmented": "F", "Missing": "M"}
+    for status in statuses.values():
+        counts[key.get(status, "M")] += 1
+    counts["C"] = counts["S"] + counts["D"]
+    counts["n"] = len(statuses)
+    return counts
+
+
+def format_summary(counts: Dict[str, int]) -> str:
+    """Format counts as BUSCO's one-line ``C:..%[S:..%,D:..%],F:..%,M:..%,n:..``."""
+    n = counts["n"] or 1
+
+    def pct(key):
+        return f"{100 * counts[key] / n:.1f}%"
+
+    return (
+        f"C:{pct('C')}[S:{pct('S')},D:{pct('D')}],F:{pct('F')},M:{pct('M')},"
+        f"n:{counts['n']}"
+    )
+
+
+def write_short_summary(file_path: str, rows: List[List[str]], note: str) -> None:
+    """Write a minimal ``short_summary.txt`` for a table hobrac assembled itself."""
+    with open(file_path, "w") as f:
+        f.write(f"# {note}\n")
+        f.write(f"\t{format_summary(summarize(rows))}\n")
+
+
+def merge_tables(file_paths: List[str]) -> Tuple[List[str], List[List[str]]]:
+    """Merge the tables of partial BUSCO runs on disjoint sets of sequences.
+
+    The header of the first table that has one is kept, and the statuses are
+    re-resolved over all hits (see ``resolve_statuses``).
+    """
+    header: List[str] = []
+    rows: List[List[str]] = []
+    for path in file_paths:
+        table_header, table_rows = read_full_table(path)
+        header = header or table_header
+        rows.extend(table_rows)
+    return header, resolve_statuses(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="merge_busco_tables",
+        description=(
+            "Merge BUSCO full_table.tsv files of partial runs into one table,"
+            " re-resolving Complete/Duplicated status over all hits."
+        ),
+    )
+    parser.add_argument(
+        "--tables", nargs="+", required=True, help="Partial full_table.tsv files"
+    )
+    parser.add_argument("--out", required=True, help="Output full_table.tsv")
+    args = parser.parse_args()
+
+    header, rows = merge_tables(args.tables)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    write_full_table(args.out, header, rows)
+    write_short_summary(
+        os.path.join(os.path.dirname(args.out), "short_summary.txt"),
+        rows,
+        f"BUSCO table merged by hobrac from {len(args.tables)} partial runs",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,39 @@
 #!/usr/bin/env python3
 import argparse
+import glob
 import os
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 
-from Bio import SeqIO
-from xopen import xopen
+import numpy as np
 
+from hobrac.busco_blocks import (
+    DEFAULT_MAX_GAP,
+    DEFAULT_MIN_GENES,
+    collinear_blocks,
+    shared_genes,
+    write_blocks_paf,
+    write_blocks_tsv,
+)
+from hobrac.busco_columns import load_table
+from hobrac.fasta_index import fasta_lengths
 
-def read_busco_tsv(file_path):
+
+def read_busco_tsv(file_path, cache_dir=""):
+    columns = load_table(file_path, cache_dir)
     busco_data = {}
-    with open(file_path, "r") as file:
-        for line in file:
-            if line.startswith("#"):
-                continue
-            parts = line.strip().split("\t")
-            if parts[1] == "Complete":
-                busco_id = parts[0]
-                busco_data[busco_id] = {
-                    "chr": parts[2],
-                    "start": int(parts[3]),
-                    "end": int(parts[4]),
-                }
+    for i in np.flatnonzero(columns.complete_mask()):
+        busco_data[str(columns.busco_id[i])] = {
+            "chr": columns.chromosomes[columns.chromosome[i]],
+            "start": int(columns.start[i]),
+            "end": int(columns.end[i]),
+        }
     return busco_data
 
 
 def calculate_fasta_lengths(file_path):
-    lengths = {}
-    with xopen(file_path) as file:
-        for record in SeqIO.parse(file, "fasta"):
-            lengths[record.id] = len(record.seq)
-    return lengths
+    # Uses the samtools .fai index when present instead of parsing the FASTA.
+    return fasta_lengths(file_path)
 
 
 def write_idx_file(file_path, keyword, lengths):
@@ -52,23 +56,31 @@ def generate_paf(busco1_data, busco2_data, len_query, len_target, output_file):
                 )
 
 
-def run(busco_query, busco_ref, query_fasta, ref_fasta, output_dir=None):
-    # Generate a unique output directory name if not provided
-    if output_dir is None:
-        output_dir = f"alignment_busco_{uuid.uuid4()}"
-
+def write_outputs(
+    busco_query_data,
+    busco_ref_data,
+    len_query,
+    len_target,
+    output_dir,
+    block_max_gap=DEFAULT_MAX_GAP,
+    min_block_genes=DEFAULT_MIN_GENES,
+):
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
 
-    busco_query_data = read_busco_tsv(busco_query)
-    busco_ref_data = read_busco_tsv(busco_ref)
-    len_query = calculate_fasta_lengths(query_fasta)
-    len_target = calculate_fasta_lengths(ref_fasta)
-
     # Write PAF file
     paf_file = os.path.join(output_dir, "aln_busco.paf")
     generate_paf(busco_query_data, busco_ref_data, len_query, len_target, paf_file)
 
+    # Collinear blocks of shared genes, as PAF and TSV
+    blocks = collinear_blocks(
+        shared_genes(busco_query_data, busco_ref_data), block_max_gap, min_block_genes
+    )
+    write_blocks_paf(
+        blocks, len_query, len_target, os.path.join(output_dir, "blocks_busco.paf")
+    )
+    write_blocks_tsv(blocks, os.path.join(output_dir, "blocks_busco.tsv"))
+
     # Write query_assembly.idx file
     query_idx_file = os.path.join(output_dir, "query_assembly.idx")
     write_idx_file(query_idx_file, "Assembly", len_query)
@@ -78,6 +90,101 @@ def run(busco_query, busco_ref, query_fasta, ref_fasta, output_dir=None):
     write_idx_file(target_idx_file, "Reference", len_target)
 
 
+def run(
+    busco_query,
+    busco_ref,
+    query_fasta,
+    ref_fasta,
+    output_dir=None,
+    block_max_gap=DEFAULT_MAX_GAP,
+    min_block_genes=DEFAULT_MIN_GENES,
+    cache_dir="",
+):
+    # Generate a unique output directory name if not provided
+    if output_dir is None:
+        output_dir = f"alignment_busco_{uuid.uuid4()}"
+
+    write_outputs(
+        read_busco_tsv(busco_query, cache_dir),
+        read_busco_tsv(busco_ref, cache_dir),
+        calculate_fasta_lengths(query_fasta),
+        calculate_fasta_lengths(ref_fasta),
+        output_dir,
+        block_max_gap,
+        min_block_genes,
+    )
+
+
+def _resolve_table(pattern, accession):
+    """Expand ``{accession}`` and the BUSCO ``run*`` glob of a table pattern."""
+    path = pattern.replace("{accession}", accession)
+    matches = sorted(glob.glob(path))
+    if not matches:
+        raise FileNotFoundError(f"No BUSCO table matches {path}")
+    return matches[0]
+
+
+def _run_reference(task):
+    (
+        busco_query_data,
+        len_query,
+        busco_ref,
+        ref_fasta,
+        output_dir,
+        block_max_gap,
+        min_block_genes,
+        cache_dir,
+    ) = task
+    write_outputs(
+        busco_query_data,
+        read_busco_tsv(busco_ref, cache_dir),
+        len_query,
+        calculate_fasta_lengths(ref_fasta),
+        output_dir,
+        block_max_gap,
+        min_block_genes,
+    )
+    return output_dir
+
+
+def run_batch(
+    busco_query,
+    query_fasta,
+    accessions,
+    busco_ref_pattern,
+    ref_pattern,
+    out_pattern,
+    jobs=1,
+    block_max_gap=DEFAULT_MAX_GAP,
+    min_block_genes=DEFAULT_MIN_GENES,
+    cache_dir="",
+):
+    """Write the outputs of every reference, reading the assembly side once.
+
+    Patterns contain ``{accession}``; the BUSCO table pattern may also hold
+    shell wildcards (``run*``). References are processed by ``jobs`` workers.
+    """
+    busco_query_data = read_busco_tsv(busco_query, cache_dir)
+    len_query = calculate_fasta_lengths(query_fasta)
+    tasks = [
+        (
+            busco_query_data,
+            len_query,
+            _resolve_table(busco_ref_pattern, accession),
+            ref_pattern.replace("{accession}", accession),
+            out_pattern.replace("{accession}", accession),
+            block_max_gap,
+            min_block_genes,
+            cache_dir,
+        )
+        for accession in accessions
+    ]
+    if jobs <= 1 or len(tasks) <= 1:
+        return [_run_reference(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_run_reference, tasks))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate PAF and index files from BUSCO and FASTA files."
@@ -86,11 +193,19 @@ def main():
         "--busco_query", required=True, help="Path to the query BUSCO TSV file."
     )
     parser.add_argument(
-        "--busco_ref", required=True, help="Path to the reference BUSCO TSV file."
+        "--busco_ref",
+        required=True,
+        help=(
+            "Path to the reference BUSCO TSV file. In batch mode, a pattern with"
+            " {accession} (and optionally run* globs)."
+        ),
     )
     parser.add_argument("--query", required=True, help="Path to the query FASTA file.")
     parser.add_argument(
-        "--ref", required=True, help="Path to the reference FASTA file."
+        "--ref",
+        required=True,
+        help="Path to the reference FASTA file. In batch mode, a pattern with"
+        " {accession}.",
     )
     parser.add_argument(
         "--out",
@@ -98,9 +213,66 @@ def main():
         help=(
             "Output directory. If not specified,"
             " a unique directory name will be generated."
+            " In batch mode, a pattern with {accession}."
+        ),
+    )
+    parser.add_argument(
+        "--accessions",
+        default=None,
+        help=(
+            "Batch mode: file with one reference accession per line. The assembly"
+            " side is read once and every reference is processed."
         ),
     )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Batch mode: parallel worker processes."
+    )
+    parser.add_argument(
+        "--block_max_gap",
+        type=int,
+        default=DEFAULT_MAX_GAP,
+        help="Largest rank gap between consecutive genes of a collinear block.",
+    )
+    parser.add_argument(
+        "--min_block_genes",
+        type=int,
+        default=DEFAULT_MIN_GENES,
+        help="Minimum number of genes of a reported collinear block.",
+    )
+    parser.add_argument(
+        "--busco_cache_dir",
+        default="",
+        help="Directory caching the parsed BUSCO tables, shared across runs.",
+    )
 
     args = parser.parse_args()
 
-    run(args.busco_query, args.busco_ref, args.query, args.ref, args.out)
+    if args.accessions:
+        if not args.out:
+            parser.error("--out is required in batch mode")
+        with open(args.accessions) as f:
+            accessions = [line.strip() for line in f if line.strip()]
+        run_batch(
+            args.busco_query,
+            args.query,
+            accessions,
+            args.busco_ref,
+            args.ref,
+            args.out,
+            args.jobs,
+            args.block_max_gap,
+            args.min_block_genes,
+            args.busco_cache_dir,
+        )
+        return
+
+    run(
+        args.busco_query,
+        args.busco_ref,
+        args.query,
+        args.ref,
+        args.out,
+        args.block_max_gap,
+        args.min_block_genes,
+        args.busco_cache_dir,
+    )
@@ -98,6 +98,216 @@ def get_args():
         type=os.path.abspath,
     )
 
+    optional_args.add_argument(
+        "--aln-scatter",
+        action="store",
+        dest="aln_scatter",
+        help=(
+            "Split the assembly into this many size-balanced chunks of whole"
+            " sequences and align each chunk as a separate minimap2 job against"
+            " a shared reference index. 0 or 1 aligns the whole assembly in a"
+            " single job. Ignored with --anchor-dotplot or --aln-cache-dir,"
+            " which take precedence"
+        ),
+        default=0,
+        type=int,
+    )
+
+    optional_args.add_argument(
+        "--mmi-cache-dir",
+        action="store",
+        dest="mmi_cache_dir",
+        help=(
+            "Shared directory caching minimap2 reference indexes across runs,"
+            " keyed by reference content, minimap2 version and preset"
+        ),
+        default=None,
+        type=os.path.abspath,
+    )
+    optional_args.add_argument(
+        "--mmi-cache-max-gb",
+        action="store",
+        dest="mmi_cache_max_gb",
+        help=(
+            "Evict the least recently used indexes when the --mmi-cache-dir"
+            " cache grows beyond this size (GB). 0 keeps every index"
+        ),
+        default=0,
+        type=float,
+    )
+
+    optional_args.add_argument(
+        "--aln-cache-dir",
+        action="store",
+        dest="aln_cache_dir",
+        help=(
+            "Directory caching the minimap2 alignments of every assembly"
+            " sequence, keyed by sequence content, reference and preset. Only"
+            " new or changed sequences are aligned again"
+        ),
+        default=None,
+        type=os.path.abspath,
+    )
+    optional_args.add_argument(
+        "--aln-cache-max-sequences",
+        action="store",
+        dest="aln_cache_max_sequences",
+        help=(
+            "Evict the least recently used sequences when the --aln-cache-dir"
+            " cache of a reference holds more than this many. 0 keeps every"
+            " sequence"
+        ),
+        default=100_000,
+        type=int,
+    )
+
+    optional_args.add_argument(
+        "--compress-paf",
+        action="store_true",
+        dest="compress_paf",
+        help=(
+            "Store genome-to-genome alignments as sorted, block-compressed and"
+            " indexed aln.paf.gz instead of plain aln.paf"
+            " (plain PAF: paf_store view aln.paf.gz)"
+        ),
+        default=False,
+    )
+
+    optional_args.add_argument(
+        "--fast-dotplot",
+        action="store_true",
+        dest="fast_dotplot",
+        help=(
+            "Draw the genome-to-genome dotplots from a binned density raster"
+            " computed in-process, instead of running dotplotrs twice."
+            " No significance_results.txt is written in this mode"
+        ),
+        default=False,
+    )
+
+    optional_args.add_argument(
+        "--incremental-busco",
+        action="store_true",
+        dest="incremental_busco",
+        help=(
+            "Reuse the per-sequence BUSCO hits of the previous run on the"
+            " assembly and only run BUSCO on new or changed sequences"
+        ),
+        default=False,
+    )
+    optional_args.add_argument(
+        "--busco-cache-dir",
+        action="store",
+        dest="busco_cache_dir",
+        help=(
+            "Directory holding the BUSCO hit cache used by --incremental-busco."
+            " Defaults to busco/hit_cache inside the output directory; point it"
+            " to a shared directory to reuse hits across output directories"
+        ),
+        default=None,
+        type=os.path.abspath,
+    )
+    optional_args.add_argument(
+        "--busco-cache-max-sequences",
+        action="store",
+        dest="busco_cache_max_sequences",
+        help=(
+            "Evict the least recently used sequences when the BUSCO hit cache of"
+            " a lineage holds more than this many. 0 keeps every sequence"
+        ),
+        default=100_000,
+        type=int,
+    )
+
+    optional_args.add_argument(
+        "--busco-scatter",
+        action="store",
+        dest="busco_scatter",
+        help=(
+            "Split each genome into this many size-balanced chunks of whole"
+            " sequences and run BUSCO on every chunk as a separate job."
+            " 0 or 1 runs BUSCO on the whole genome in a single job."
+            " With --incremental-busco, only the references are split"
+        ),
+        default=0,
+        type=int,
+    )
+
+    optional_args.add_argument(
+        "--prefilter-min-length",
+        action="store",
+        dest="prefilter_min_length",
+        help=(
+            "Only give BUSCO and minimap2 the assembly sequences at least this"
+            " long (bp). Excluded sequences are listed in prefilter/excluded.tsv"
+        ),
+        default=0,
+        type=int,
+    )
+    optional_args.add_argument(
+        "--prefilter-coverage",
+        action="store",
+        dest="prefilter_coverage",
+        help=(
+            "Only give BUSCO and minimap2 the longest assembly sequences needed"
+            " to cover this percentage of the assembly bases (e.g. 95)"
+        ),
+        default=0,
+        type=float,
+    )
+    optional_args.add_argument(
+        "--prefilter-max-sequences",
+        action="store",
+        dest="prefilter_max_sequences",
+        help="Only give BUSCO and minimap2 the N longest assembly sequences",
+        default=0,
+        type=int,
+    )
+
+    optional_args.add_argument(
+        "--marker-engine",
+        action="store",
+        dest="marker_engine",
+        choices=["busco", "miniprot"],
+        help=(
+            "How BUSCO markers are located. 'miniprot' maps the lineage's"
+            " ancestral proteins with miniprot directly and calls markers"
+            " against the dataset length cutoffs, skipping the BUSCO run"
+            " (faster; --busco-scatter and --incremental-busco are ignored)"
+        ),
+        default="busco",
+    )
+
+    optional_args.add_argument(
+        "--quick-look",
+        action="store_true",
+        dest="quick_look",
+        help=(
+            "Run BUSCO against a reduced, ALG-balanced subset of the lineage"
+            " markers for a fast, preliminary karyotype"
+        ),
+        default=False,
+    )
+    optional_args.add_argument(
+        "--quick-look-markers",
+        action="store",
+        dest="quick_look_markers",
+        help="Number of BUSCO markers used by --quick-look",
+        default=250,
+        type=int,
+    )
+    optional_args.add_argument(
+        "--upgrade-quick-look",
+        action="store_true",
+        dest="upgrade_quick_look",
+        help=(
+            "Complete a previous --quick-look run in the same output directory:"
+            " BUSCO only searches the remaining markers and the hits already"
+            " found are reused"
+        ),
+        default=False,
+    )
+
     optional_args.add_argument(
         "-e",
         "--executor",
@@ -208,6 +418,17 @@ def get_args():
         default=False,
         required=False,
     )
+    optional_args.add_argument(
+        "--anchor-dotplot",
+        action="store_true",
+        dest="anchor_dotplot",
+        help=(
+            "Replace the minimap2 alignment with coarse collinear segments"
+            " chained from minimizers shared by the assembly and each reference."
+            " Much cheaper, for a chromosome-scale overview only"
+        ),
+        default=False,
+    )
     optional_args.add_argument(
         "--ref-count",
         action="store",
@@ -353,6 +574,35 @@ def get_args():
         ),
         default=False,
     )
+    synteny_args.add_argument(
+        "--alg-sweep-pvalues",
+        action="store",
+        dest="alg_sweep_pvalues",
+        help=(
+            "Comma-separated --alg-pvalue values to compare in"
+            " synteny_plots/alg_sweep.tsv (e.g. 0.01,0.001,1e-5), listing the"
+            " chains and recovered ALGs of each setting."
+        ),
+        default="",
+    )
+    synteny_args.add_argument(
+        "--alg-sweep-min-chain-genes",
+        action="store",
+        dest="alg_sweep_min_chain_genes",
+        help=(
+            "Comma-separated --min-chain-genes values to compare in"
+            " synteny_plots/alg_sweep.tsv (e.g. 3,5,10)."
+        ),
+        default="",
+    )
+    synteny_args.add_argument(
+        "--alg-sweep-permissive",
+        action="store_true",
+        dest="alg_sweep_permissive",
+        help="Compare strict and permissive chain validation in"
+        " synteny_plots/alg_sweep.tsv.",
+        default=False,
+    )
 
     args = parser.parse_args()
 
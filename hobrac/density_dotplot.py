@@ -0,0 +1,344 @@
+"""Render genome-to-genome dotplots from a binned density raster.
+
+``dotplotrs`` draws every alignment of ``aln.paf`` as a vector segment and is
+run once per image. This renderer streams the PAF once, rasterizes every
+alignment segment into a fixed-resolution grid and keeps, per cell, the number
+of aligned bases drawn there plus their identity- and strand-weighted sums.
+Both the colour and the black-and-white images are drawn from that single
+raster, so memory only depends on the image size and a million-record PAF
+plots in seconds.
+
+The reference runs along X and the assembly along Y, each sequence in FASTA
+order. In the colour image, forward alignments are blue and reverse ones red,
+darker for higher identity.
+"""
+
+import argparse
+import os
+from typing import Dict, List, Tuple
+
+import matplotlib
+import numpy as np
+from xopen import xopen
+
+from hobrac.fasta_index import fasta_lengths
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+# Records parsed before each vectorized rasterization batch.
+CHUNK_RECORDS = 100_000
+# Upper bound on the raster points generated at once, to bound memory.
+MAX_BATCH_POINTS = 5_000_000
+
+FORWARD_RGB = np.array([0.12, 0.35, 0.75])
+REVERSE_RGB = np.array([0.80, 0.15, 0.15])
+# Identity mapped to the faintest colour; identities above it darken linearly.
+MIN_IDENTITY = 0.7
+
+
+def _shift(values: np.ndarray, shift: int, axis: int) -> np.ndarray:
+    """*values* moved by *shift* cells along *axis*, zero-filled (no wrap-around)."""
+    shifted = np.zeros_like(values)
+    source = [slice(None)] * values.ndim
+    target = [slice(None)] * values.ndim
+    if shift > 0:
+        source[axis], target[axis] = slice(None, -shift), slice(shift, None)
+    else:
+        source[axis], target[axis] = slice(-shift, None), slice(None, shift)
+    shifted[tuple(target)] = values[tuple(source)]
+    return shifted
+
+
+def axis_layout(lengths: Dict[str, int]) -> Tuple[Dict[str, int], int]:
+    """Offset of each sequence on a concatenated axis, and the axis length."""
+    offsets = {}
+    total = 0
+    for name, length in lengths.items():
+        offsets[name] = total
+        total += length
+    return offsets, total
+
+
+class DensityRaster:
+    """Per-cell aligned bases, identity sum and strand sum of a dotplot."""
+
+    def __init__(
+        self,
+        target_lengths: Dict[str, int],
+        query_lengths: Dict[str, int],
+        width: int = 2000,
+        height: int = 2000,
+    ):
+        self.target_lengths = target_lengths
+        self.query_lengths = query_lengths
+        self.t_offsets, self.t_total = axis_layout(target_lengths)
+        self.q_offsets, self.q_total = axis_layout(query_lengths)
+        self.width = width
+        self.height = height
+        cells = width * height
+        self.bases = np.zeros(cells, dtype=np.float64)
+        self.identity = np.zeros(cells, dtype=np.float64)
+        self.strand = np.zeros(cells, dtype=np.float64)
+
+    def add(
+        self,
+        t_start: np.ndarray,
+        t_end: np.ndarray,
+        q_start: np.ndarray,
+        q_end: np.ndarray,
+        reverse: np.ndarray,
+        identity: np.ndarray,
+        block_length: np.ndarray,
+    ) -> None:
+        """Rasterize segments given in concatenated-axis coordinates."""
+        sx = self.width / max(self.t_total, 1)
+        sy = self.height / max(self.q_total, 1)
+        x0 = t_start * sx
+        x1 = t_end * sx
+        # Reverse alignments run from the query end down to the query start.
+        y0 = np.where(reverse, q_end, q_start) * sy
+        y1 = np.where(reverse, q_start, q_end) * sy
+
+        steps = np.ceil(np.maximum(np.abs(x1 - x0), np.abs(y1 - y0))).astype(np.int64)
+        steps += 1
+        weight = block_length / steps
+        sign = np.where(reverse, -1.0, 1.0)
+
+        ends = np.cumsum(steps)
+        start = 0
+        while start < len(steps):
+            base = ends[start - 1] if start else 0
+            stop = int(np.searchsorted(ends, base + MAX_BATCH_POINTS, side="right"))
+            stop = max(stop, start + 1)
+            self._draw(
+                x0[start:stop],
+                x1[start:stop],
+                y0[start:stop],
+                y1[start:stop],
+                steps[start:stop],
+                weight[start:stop],
+                identity[start:stop],
+                sign[start:stop],
+            )
+            start = stop
+
+    def _draw(self, x0, x1, y0, y1, steps, weight, identity, sign):
+        segment = np.repeat(np.arange(len(steps)), steps)
+        first = np.repeat(np.cumsum(steps) - steps, steps)
+        position = np.arange(len(segment)) - first
+        t = position / np.maximum(steps[segment] - 1, 1)
+
+        px = np.clip(
+            (x0[segment] + t * (x1 - x0)[segment]).astype(np.int64), 0, self.width - 1
+        )
+        py = np.clip(
+            (y0[segment] + t * (y1 - y0)[segment]).astype(np.int64), 0, self.height - 1
+        )
+        cell = py * self.width + px
+        cells = self.width * self.height
+
+        w = weight[segment]
+        self.bases += np.bincount(cell, weights=w, minlength=cells)
+        self.identity += np.bincount(
+            cell, weights=w * identity[segment], minlength=cells
+        )
+        self.strand += np.bincount(cell, weights=w * sign[segment], minlength=cells)
+
+    def add_paf(self, paf_path: str, min_length: int = 0) -> int:
+        """Stream ``paf_path`` (plain or gzipped) into the raster.
+
+        Records with an alignment block shorter than ``min_length`` or on
+        sequences absent from the layout are skipped. Returns the records drawn.
+        """
+        drawn = 0
+        batch: List[Tuple[int, int, int, int, bool, float, int]] = []
+        with xopen(paf_path) as f:
+            for line in f:
+                fields = line.split("\t", 12)
+                if len(fields) < 12:
+                    continue
+                block = int(fields[10])
+                if block < min_length:
+                    continue
+                q_offset = self.q_offsets.get(fields[0])
+                t_offset = self.t_offsets.get(fields[5])
+                if q_offset is None or t_offset is None:
+                    continue
+                batch.append(
+                    (
+                        t_offset + int(fields[7]),
+                        t_offset + int(fields[8]),
+                        q_offset + int(fields[2]),
+                        q_offset + int(fields[3]),
+                        fields[4] == "-",
+                        int(fields[9]) / block if block else 0.0,
+                        block,
+                    )
+                )
+                if len(batch) >= CHUNK_RECORDS:
+                    drawn += self._add_batch(batch)
+                    batch = []
+        if batch:
+            drawn += self._add_batch(batch)
+        return drawn
+
+    def _add_batch(self, batch) -> int:
+        columns = list(zip(*batch))
+        self.add(
+            np.array(columns[0], dtype=np.float64),
+            np.array(columns[1], dtype=np.float64),
+            np.array(columns[2], dtype=np.float64),
+            np.array(columns[3], dtype=np.float64),
+            np.array(columns[4], dtype=bool),
+            np.array(columns[5], dtype=np.float64),
+            np.array(columns[6], dtype=np.float64),
+        )
+        return len(batch)
+
+    def images(self, thickness: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Colour and black-and-white RGB images (row 0 at the top)."""
+        bases = self.bases.reshape(self.height, self.width)
+        filled = bases > 0
+        safe = np.where(filled, bases, 1)
+        identity = self.identity.reshape(self.height, self.width) / safe
+        strand = self.strand.reshape(self.height, self.width) / safe
+
+        # Grow the drawn cells so thin diagonals stay visible once downscaled.
+        for _ in range(max(thickness - 1, 0)):
+            grown = filled.copy()
+            for axis in (0, 1):
+                for shift in (-1, 1):
+                    grown |= _shift(filled, shift, axis)
+            for values in (identity, strand):
+                for axis in (0, 1):
+                    for shift in (-1, 1):
+                        source = _shift(filled, shift, axis)
+                        take = source & ~filled
+                        values[take] = _shift(values, shift, axis)[take]
+            filled = grown
+
+        darkness = np.clip((identity - MIN_IDENTITY) / (1 - MIN_IDENTITY), 0, 1)
+        darkness = 0.35 + 0.65 * darkness
+        forward = ((strand + 1) / 2)[..., None]
+        hue = forward * FORWARD_RGB + (1 - forward) * REVERSE_RGB
+        color = 1 - darkness[..., None] * (1 - hue)
+        color[~filled] = 1.0
+
+        bw = np.ones((self.height, self.width, 3))
+        bw[filled] = 0.0
+
+        # Row 0 of the raster is the start of the query axis: flip for display.
+        return color[::-1], bw[::-1]
+
+
+def _ticks(lengths: Dict[str, int], offsets: Dict[str, int], total: int):
+    """Boundaries, and label positions of sequences wide enough to be named."""
+    boundaries = [offsets[name] + length for name, length in lengths.items()]
+    labels = [
+        (offsets[name] + length / 2, name)
+        for name, length in lengths.items()
+        if length >= total / 100
+    ]
+    return boundaries, labels
+
+
+# Margins (px) around the plotted raster, for tick labels and axis titles.
+MARGINS = {"left": 150, "right": 20, "top": 20, "bottom": 150}
+
+
+def save_image(
+    raster: DensityRaster,
+    image: np.ndarray,
+    output_path: str,
+    reference_name: str,
+    assembly_name: str,
+    dpi: int = 100,
+) -> None:
+    """Save ``image`` at native raster resolution with sequence ticks and grid."""
+    total_w = raster.width + MARGINS["left"] + MARGINS["right"]
+    total_h = raster.height + MARGINS["top"] + MARGINS["bottom"]
+    fig = plt.figure(figsize=(total_w / dpi, total_h / dpi), dpi=dpi)
+    ax = fig.add_axes(
+        [
+            MARGINS["left"] / total_w,
+            MARGINS["bottom"] / total_h,
+            raster.width / total_w,
+            raster.height / total_h,
+        ]
+    )
+    ax.imshow(
+        image,
+        extent=(0, raster.t_total, 0, raster.q_total),
+        aspect="auto",
+        interpolation="nearest",
+    )
+
+    for axis, lengths, offsets, total in (
+        ("x", raster.target_lengths, raster.t_offsets, raster.t_total),
+        ("y", raster.query_lengths, raster.q_offsets, raster.q_total),
+    ):
+        boundaries, labels = _ticks(lengths, offsets, total)
+        line = ax.axvline if axis == "x" else ax.axhline
+        for boundary in boundaries[:-1]:
+            line(boundary, color="#bbbbbb", linewidth=0.5)
+        positions = [position for position, _ in labels]
+        names = [name for _, name in labels]
+        if axis == "x":
+            ax.set_xticks(positions, names, rotation=90, fontsize=8)
+        else:
+            ax.set_yticks(positions, names, fontsize=8)
+
+    ax.set_xlim(0, raster.t_total)
+    ax.set_ylim(0, raster.q_total)
+    ax.set_xlabel(reference_name)
+    ax.set_ylabel(assembly_name)
+    fig.savefig(output_path, dpi=dpi)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="density_dotplot",
+        description=(
+            "Draw colour and black-and-white dotplots of a PAF file from a single"
+            " binned density raster."
+        ),
+    )
+    parser.add_argument("-p", "--paf", required=True, help="PAF file (plain or .gz)")
+    parser.add_argument("-q", "--query", required=True, help="Query (assembly) FASTA")
+    parser.add_argument("-r", "--reference", required=True, help="Reference FASTA")
+    parser.add_argument("-o", "--output", required=True, help="Colour PNG")
+    parser.add_argument("--bw", default=None, help="Black-and-white PNG")
+    parser.add_argument(
+        "-m",
+        "--min-length",
+        type=int,
+        default=0,
+        help="Skip alignments with a shorter block length",
+    )
+    parser.add_argument(
+        "--size", type=int, default=2000, help="Raster width and height (pixels)"
+    )
+    parser.add_argument(
+        "--thickness", type=int, default=2, help="Line thickness (pixels)"
+    )
+    parser.add_argument("--query-name", default=None, help="Y axis label")
+    parser.add_argument("--reference-name", default=None, help="X axis label")
+    args = parser.parse_args()
+
+    raster = DensityRaster(
+        fasta_lengths(args.reference), fasta_lengths(args.query), args.size, args.size
+    )
+    raster.add_paf(args.paf, args.min_length)
+    color, bw = raster.images(args.thickness)
+
+    reference_name = args.reference_name or os.path.basename(args.reference)
+    query_name = args.query_name or os.path.basename(args.query)
+    save_image(raster, color, args.output, reference_name, query_name)
+    if args.bw:
+        save_image(raster, bw, args.bw, reference_name, query_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Lightweight FASTA helpers shared by the pipeline steps that work per sequence.
+
+HoBRAC never needs random access into the assembly, only a few streaming passes:
+reading sequence lengths (from a samtools ``.fai`` index when one is available),
+hashing each sequence so unchanged ones can be recognised across assembly
+revisions, and copying chosen subsets of records to new FASTA files. Sequence
+names are the first whitespace-delimited token of the header, as everywhere else
+in the pipeline (BUSCO, minimap2, ``read_fasta_sizes``).
+"""
+
+import hashlib
+import heapq
+import os
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from xopen import xopen
+
+
+def fasta_lengths(fasta_path: str) -> Dict[str, int]:
+    """Return sequence lengths in file order.
+
+    A samtools ``<fasta>.fai`` index is used when it exists and is not older than
+    the FASTA; otherwise the file is scanned once.
+    """
+    fai_path = f"{fasta_path}.fai"
+    if os.path.isfile(fai_path) and os.path.getmtime(fai_path) >= os.path.getmtime(
+        fasta_path
+    ):
+        lengths = {}
+        with open(fai_path) as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) >= 2:
+                    lengths[fields[0]] = int(fields[1])
+        return lengths
+
+    lengths = {}
+    name = None
+    with xopen(fasta_path) as f:
+        for line in f:
+            if line.startswith(">"):
+                name = line[1:].split()[0] if line[1:].split() else ""
+                lengths[name] = 0
+            elif name is not None:
+                lengths[name] += len(line.strip())
+    return lengths
+
+
+def balanced_chunks(lengths: Dict[str, int], n_chunks: int) -> List[List[str]]:
+    """Distribute whole sequences over ``n_chunks`` bins of similar total size.
+
+    Sequences are never cut. Longest-first greedy assignment to the currently
+    lightest bin (ties broken by bin index, then by name) keeps the result
+    deterministic. Within a bin, sequences keep their order in ``lengths``; bins
+    may be empty when there are fewer sequences than bins.
+    """
+    n_chunks = max(1, n_chunks)
+    heap = [(0, i) for i in range(n_chunks)]
+    assignment: Dict[str, int] = {}
+    for name in sorted(lengths, key=lambda n: (-lengths[n], n)):
+        total, index = heapq.heappop(heap)
+        assignment[name] = index
+        heapq.heappush(heap, (total + lengths[name], index))
+
+    chunks: List[List[str]] = [[] for _ in range(n_chunks)]
+    for name in lengths:
+        chunks[assignment[name]].append(name)
+    return chunks
+
+
+def sequence_digests(fasta_path: str) -> Dict[str, str]:
+    """Return a content digest for every sequence of ``fasta_path``.
+
+    The digest only covers the (upper-cased) residues, so line wrapping, soft
+    masking and the sequence name do not change it: a renamed scaffold keeps its
+    digest, an edited one gets a new digest.
+    """
+    digests = {}
+    name = None
+    hasher = None
+
+    with xopen(fasta_path) as f:
+        for line in f:
+            if line.startswith(">"):
+                if name is not None:
+                    digests[name] = hasher.hexdigest()
+                name = line[1:].split()[0] if line[1:].split() else ""
+                hasher = hashlib.blake2b(digest_size=16)
+            elif name is not None:
+                hasher.update(line.strip().upper().encode())
+
+    if name is not None:
+        digests[name] = hasher.hexdigest()
+
+    return digests
+
+
+def iter_sequences(fasta_path: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield ``(name, residues)`` for every record, residues upper-cased."""
+    name = None
+    parts: List[bytes] = []
+    with xopen(fasta_path, "rb") as f:
+        for line in f:
+            if line.startswith(b">"):
+                if name is not None:
+                    yield name, b"".join(parts)
+                header = line[1:].decode().split()
+                name = header[0] if header else ""
+                parts = []
+            elif name is not None:
+                parts.append(line.strip().upper())
+    if name is not None:
+        yield name, b"".join(parts)
+
+
+def write_subset(fasta_path: str, output_path: str, names: Iterable[str]) -> int:
+    """Copy the records of ``fasta_path`` whose name is in ``names``.
+
+    Records are written in their original order and with their original line
+    wrapping. Returns the number of records written.
+    """
+    wanted = set(names)
+    written = 0
+    keep = False
+
+    with xopen(fasta_path) as src, open(output_path, "w") as dst:
+        for line in src:
+            if line.startswith(">"):
+                header = line[1:].split()
+                keep = (header[0] if header else "") in wanted
+                if keep:
+                    written += 1
+            if keep:
+                dst.write(line)
+
+    return written
+
+
+def write_chunks(fasta_path: str, chunks: List[List[str]], output_paths: List[str]):
+    """Write each chunk of sequence names to its own FASTA in a single pass."""
+    route = {name: i for i, names in enumerate(chunks) for name in names}
+    outputs = [open(path, "w") for path in output_paths]
+    try:
+        target = None
+        with xopen(fasta_path) as src:
+            for line in src:
+                if line.startswith(">"):
+                    header = line[1:].split()
+                    target = route.get(header[0] if header else "")
+                if target is not None:
+                    outputs[target].write(line)
+    finally:
+        for out in outputs:
+            out.close()
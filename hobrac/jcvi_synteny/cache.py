@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from importlib.metadata import PackageNotFoundError, version
+from typing import Optional
+
+from .matrix import GeneMatrix
+
+# Kept next to the run's outputs (synteny_plots/), reused by later runs.
+CACHE_DIRNAME = ".alg_cache"
+# Bumped whenever the cached layout changes. Entries are also tied to the
+# installed hobrac version, so a new release never reads older results.
+CACHE_VERSION = 1
+
+
+def _package_version() -> str:
+    try:
+        return version("hobrac")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+# Prefix of the entry file names of this cache and package version; entries
+# with any other prefix are pruned when saving.
+VERSION_TAG = hashlib.blake2b(
+    f"v{CACHE_VERSION} {_package_version()}".encode(), digest_size=4
+).hexdigest()
+
+
+def matrix_digest(matrix: GeneMatrix) -> str:
+    """Digest of the gene placements the ALG analysis depends on.
+
+    Species names, gene ids and chromosome names and codes; coordinates do
+    not influence associations or chains and are left out.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"v{CACHE_VERSION}\n".encode())
+    for name, chromosomes in zip(matrix.species, matrix.chromosomes):
+        hasher.update(f"{name}\t{chr(31).join(chromosomes)}\n".encode())
+    hasher.update("\n".join(matrix.gene_ids).encode())
+    hasher.update(matrix.codes.tobytes())
+    return hasher.hexdigest()
+
+
+def cache_key(*parts) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(repr((VERSION_TAG, *parts)).encode())
+    return hasher.hexdigest()
+
+
+def _path(cache_dir: str, kind: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{VERSION_TAG}-{kind}-{key}.json")
+
+
+def prune(cache_dir: str) -> None:
+    """Remove the entries written by other cache or package versions."""
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith(".json") and not name.startswith(f"{VERSION_TAG}-"):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def load(cache_dir: str, kind: str, key: str) -> Optional[dict]:
+    try:
+        with open(_path(cache_dir, kind, key)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save(cache_dir: str, kind: str, key: str, data: dict) -> None:
+    """Write an entry atomically; a cache that cannot be written is skipped.
+
+    Entries of other versions are pruned first, so the cache directory only
+    grows with the inputs and parameters analysed by the current version.
+    """
+    path = _path(cache_dir, kind, key)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    prune(cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def to_records(items) -> list:
+    return [asdict(item) for item in items]
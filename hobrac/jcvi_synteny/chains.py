@@ -1,26 +1,23 @@
 import logging
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Set, Tuple, Union
 
-logger = logging.getLogger(__name__)
+import numpy as np
+
+from .matrix import GeneMatrix, SpeciesBusco
+from .models import ChromosomeAssociation, PairwiseAssociation
 
-from .models import BuscoGene, ChromosomeAssociation, PairwiseAssociation
+logger = logging.getLogger(__name__)
 
 
-def _eligible_genes(
-    species_busco: List[Tuple[str, Dict[str, BuscoGene]]],
-) -> Set[str]:
+def _eligible_genes(species_busco: Union[GeneMatrix, SpeciesBusco]) -> Set[str]:
     """Return gene IDs present in at least two species."""
-    counts: Dict[str, int] = defaultdict(int)
-    for _, busco_data in species_busco:
-        for gene_id in busco_data:
-            counts[gene_id] += 1
-    return {g for g, c in counts.items() if c >= 2}
+    return set(GeneMatrix.coerce(species_busco).eligible_ids())
 
 
 def _walk_chain_counts(
     pairwise_associations: List[PairwiseAssociation],
-    species_busco: List[Tuple[str, Dict[str, BuscoGene]]],
+    species_busco: Union[GeneMatrix, SpeciesBusco],
 ) -> Dict[Tuple[Tuple[str, str], ...], int]:
     """
     For each eligible gene, build a subgraph of significant associations
@@ -29,6 +26,11 @@ def _walk_chain_counts(
 
     Uses bidirectional edges and graph search so results are independent
     of the ordering of *species_busco*.
+
+    Genes sharing a chromosome signature (the same chromosome in every
+    species) have the same subgraph, so each signature is walked once and
+    its chains counted with the signature's multiplicity; the longest path
+    of each distinct component is also memoized across signatures.
     """
     if not pairwise_associations or not species_busco:
         return {}
@@ -40,17 +42,23 @@ def _walk_chain_counts(
         adj[a].add(b)
         adj[b].add(a)
 
-    eligible = _eligible_genes(species_busco)
-    chain_counts: Dict[Tuple[Tuple[str, str], ...], int] = defaultdict(int)
+    matrix = GeneMatrix.coerce(species_busco)
 
-    for gene_id in eligible:
-        gene_nodes: List[Tuple[str, str]] = []
-        for sp_name, busco_data in species_busco:
-            if gene_id in busco_data:
-                gene_nodes.append((sp_name, busco_data[gene_id].chromosome))
+    # Signatures in order of their first gene, so chains are first counted in
+    # the same order as when walking gene by gene.
+    signatures: Dict[Tuple[int, ...], int] = defaultdict(int)
+    for codes in matrix.codes[matrix.eligible_rows].tolist():
+        signatures[tuple(codes)] += 1
 
-        if len(gene_nodes) < 2:
-            continue
+    chain_counts: Dict[Tuple[Tuple[str, str], ...], int] = defaultdict(int)
+    memo: Dict[tuple, Tuple[Tuple[str, str], ...]] = {}
+
+    for signature, multiplicity in signatures.items():
+        gene_nodes = [
+            (matrix.species[sp], matrix.chromosomes[sp][code])
+            for sp, code in enumerate(signature)
+            if code >= 0
+        ]
 
         node_set = set(gene_nodes)
         gene_adj: Dict[Tuple[str, str], Set[Tuple[str, str]]] = defaultdict(set)
@@ -59,21 +67,31 @@ def _walk_chain_counts(
                 if neighbor in node_set:
                     gene_adj[node].add(neighbor)
 
-        for chain in _longest_paths_per_component(gene_nodes, gene_adj):
-            chain_counts[chain] += 1
+        for chain in _longest_paths_per_component(gene_nodes, gene_adj, memo):
+            chain_counts[chain] += multiplicity
 
     return chain_counts
 
 
+# Components up to this many nodes get the exact longest path (bitmask DP);
+# larger ones, or ones whose DP would exceed _MAX_DP_STATES (path
+# prefix, end node) states, fall back to the visit-capped DFS.
+_MAX_EXACT_NODES = 25
+_MAX_DP_STATES = 2_000_000
 _MAX_DFS_VISITS = 500_000
 
 
 def _longest_paths_per_component(
     nodes: List[Tuple[str, str]],
     adj: Dict[Tuple[str, str], Set[Tuple[str, str]]],
+    memo: Dict[tuple, Tuple[Tuple[str, str], ...]] = None,
 ) -> List[Tuple[Tuple[str, str], ...]]:
     """Find the longest path in each connected component, canonicalized
-    as the lexicographically smaller of the path and its reverse."""
+    as the lexicographically smaller of the path and its reverse.
+
+    *memo* caches the path of each component, keyed by its sorted nodes and
+    edges, across calls.
+    """
     visited: Set[Tuple[str, str]] = set()
     result: List[Tuple[Tuple[str, str], ...]] = []
 
@@ -97,45 +115,13 @@ def _longest_paths_per_component(
 
         component.sort()
 
-        best: Tuple[Tuple[str, str], ...] = ()
-        total_visits = 0
-        for start in component:
-            if len(best) == len(component):
-                break
-            dfs: List[
-                Tuple[
-                    Tuple[str, str],
-                    Tuple[Tuple[str, str], ...],
-                    frozenset,
-                ]
-            ] = [(start, (start,), frozenset((start,)))]
-            while dfs:
-                if len(best) == len(component):
-                    break
-                total_visits += 1
-                if total_visits > _MAX_DFS_VISITS:
-                    break
-                cur, path, path_visited = dfs.pop()
-                extended = False
-                for nbr in sorted(adj.get(cur, set())):
-                    if nbr not in path_visited:
-                        extended = True
-                        dfs.append((nbr, path + (nbr,), path_visited | {nbr}))
-                if not extended and len(path) >= 2:
-                    canon = min(path, path[::-1])
-                    if len(canon) > len(best) or (
-                        len(canon) == len(best) and canon < best
-                    ):
-                        best = canon
-            if total_visits > _MAX_DFS_VISITS:
-                logger.warning(
-                    "DFS visit limit (%d) reached for component of %d nodes; "
-                    "returning best path found (length %d)",
-                    _MAX_DFS_VISITS,
-                    len(component),
-                    len(best),
-                )
-                break
+        if memo is None:
+            best = _longest_path(component, adj)
+        else:
+            key = tuple((cur, tuple(sorted(adj.get(cur, ())))) for cur in component)
+            if key not in memo:
+                memo[key] = _longest_path(component, adj)
+            best = memo[key]
 
         if best:
             result.append(best)
@@ -143,9 +129,150 @@ def _longest_paths_per_component(
     return result
 
 
+def _longest_path(
+    component: List[Tuple[str, str]],
+    adj: Dict[Tuple[str, str], Set[Tuple[str, str]]],
+) -> Tuple[Tuple[str, str], ...]:
+    """Longest simple path of a sorted connected component, canonicalized."""
+    if len(component) <= _MAX_EXACT_NODES:
+        try:
+            return _longest_path_exact(component, adj)
+        except _StateBudgetExceeded:
+            logger.debug(
+                "Component of %d nodes exceeds %d DP states; using capped DFS",
+                len(component),
+                _MAX_DP_STATES,
+            )
+    return _longest_path_dfs(component, adj)
+
+
+class _StateBudgetExceeded(Exception):
+    pass
+
+
+def _longest_path_exact(
+    component: List[Tuple[str, str]],
+    adj: Dict[Tuple[str, str], Set[Tuple[str, str]]],
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Exact longest simple path by dynamic programming over (visited set, end
+    node) bitmask states, returning the same path as an exhaustive search
+    with _longest_path_dfs:
+
+    - if some path covers the whole component, the search stops at the first
+      one it meets: starting from the smallest node that has one, and taking
+      the largest neighbour first (the DFS pushes neighbours in ascending
+      order), i.e. the lexicographically largest such path from that node;
+    - otherwise every path is visited and the lexicographically smallest
+      canonical path of maximal length wins.
+
+    Nodes are integer ids in sorted order, so lexicographic order on ids is
+    lexicographic order on the nodes.
+    """
+    n = len(component)
+    index = {node: i for i, node in enumerate(component)}
+    nbrs = [
+        sorted(index[u] for u in adj.get(node, ()) if u in index) for node in component
+    ]
+    memo: Dict[int, int] = {}
+
+    def longest(mask: int, v: int, remaining: int) -> int:
+        """Nodes on the longest path from v through nodes outside mask."""
+        key = mask << 5 | v
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+        best = 0
+        for u in nbrs[v]:
+            if not mask >> u & 1:
+                sub = longest(mask | 1 << u, u, remaining - 1)
+                if sub > best:
+                    best = sub
+                    if best == remaining:
+                        break
+        if len(memo) >= _MAX_DP_STATES:
+            raise _StateBudgetExceeded()
+        memo[key] = best + 1
+        return best + 1
+
+    def walk(start: int, length: int, largest: bool) -> List[int]:
+        """Extremal path of *length* nodes from *start*, one node at a time."""
+        path, mask = [start], 1 << start
+        while len(path) < length:
+            candidates = reversed(nbrs[path[-1]]) if largest else nbrs[path[-1]]
+            for u in candidates:
+                if not mask >> u & 1 and (
+                    longest(mask | 1 << u, u, n - len(path) - 1) >= length - len(path)
+                ):
+                    path.append(u)
+                    mask |= 1 << u
+                    break
+        return path
+
+    lengths = [longest(1 << v, v, n - 1) for v in range(n)]
+    if n in lengths:
+        path = walk(lengths.index(n), n, largest=True)
+    else:
+        length = max(lengths)
+        start = next(v for v in range(n) if lengths[v] == length)
+        path = walk(start, length, largest=False)
+    path = min(path, path[::-1])
+    return tuple(component[i] for i in path)
+
+
+def _longest_path_dfs(
+    component: List[Tuple[str, str]],
+    adj: Dict[Tuple[str, str], Set[Tuple[str, str]]],
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Longest simple path of a sorted connected component by exhaustive DFS,
+    capped at _MAX_DFS_VISITS path extensions. Used as an approximation for
+    components too large for _longest_path_exact: past the cap it returns
+    the best path found so far.
+    """
+    best: Tuple[Tuple[str, str], ...] = ()
+    total_visits = 0
+    for start in component:
+        if len(best) == len(component):
+            break
+        dfs: List[
+            Tuple[
+                Tuple[str, str],
+                Tuple[Tuple[str, str], ...],
+                frozenset,
+            ]
+        ] = [(start, (start,), frozenset((start,)))]
+        while dfs:
+            if len(best) == len(component):
+                break
+            total_visits += 1
+            if total_visits > _MAX_DFS_VISITS:
+                break
+            cur, path, path_visited = dfs.pop()
+            extended = False
+            for nbr in sorted(adj.get(cur, set())):
+                if nbr not in path_visited:
+                    extended = True
+                    dfs.append((nbr, path + (nbr,), path_visited | {nbr}))
+            if not extended and len(path) >= 2:
+                canon = min(path, path[::-1])
+                if len(canon) > len(best) or (len(canon) == len(best) and canon < best):
+                    best = canon
+        if total_visits > _MAX_DFS_VISITS:
+            logger.warning(
+                "DFS visit limit (%d) reached for component of %d nodes; "
+                "returning best path found (length %d)",
+                _MAX_DFS_VISITS,
+                len(component),
+                len(best),
+            )
+            break
+    return best
+
+
 def enumerate_chains(
     pairwise_associations: List[PairwiseAssociation],
-    species_busco: List[Tuple[str, Dict[str, BuscoGene]]],
+    species_busco: Union[GeneMatrix, SpeciesBusco],
     min_chain_genes: int = 0,
 ) -> List[List[Tuple[str, str]]]:
     """
@@ -159,7 +286,8 @@ def enumerate_chains(
 
     Args:
         pairwise_associations: List of significant PairwiseAssociation objects
-        species_busco: Ordered list of (species_name, busco_data) tuples
+        species_busco: Ordered list of (species_name, busco_data) tuples, or
+            the GeneMatrix built from it
         min_chain_genes: Drop chains whose maximal-walk support is strictly
             below this threshold before sub-chain pruning. Support is the
             number of distinct genes whose maximal walk equals the chain
@@ -171,6 +299,13 @@ def enumerate_chains(
         of (species, chromosome) tuples in canonical path order.
     """
     chain_counts = _walk_chain_counts(pairwise_associations, species_busco)
+    return _select_chains(chain_counts, min_chain_genes)
+
+
+def _select_chains(
+    chain_counts: Dict[Tuple[Tuple[str, str], ...], int], min_chain_genes: int
+) -> List[List[Tuple[str, str]]]:
+    """Chains walked by at least *min_chain_genes* genes, sub-chains pruned."""
     surviving = {
         chain for chain, count in chain_counts.items() if count >= min_chain_genes
     }
@@ -186,24 +321,34 @@ def _prune_subchains(
 
     Keeping both would let genes match the shorter chain even when they
     diverge from the longer one at positions the short chain doesn't cover.
+
+    Chains are sorted by length and indexed by node as int bitsets, so the
+    longer chains containing every node of a chain are one AND per node.
     """
-    chain_sets = {chain: set(chain) for chain in chains}
+    ordered = sorted(chains, key=len)
+    containing: Dict[Tuple[str, str], int] = defaultdict(int)
+    for i, chain in enumerate(ordered):
+        for node in chain:
+            containing[node] |= 1 << i
+
     filtered: Set[Tuple[Tuple[str, str], ...]] = set()
-    for chain in chains:
-        is_subchain = False
-        for other in chains:
-            if len(other) <= len(chain):
-                continue
-            if chain_sets[chain].issubset(chain_sets[other]):
-                is_subchain = True
+    first_longer = len(ordered)
+    for i in range(len(ordered) - 1, -1, -1):
+        if i + 1 < len(ordered) and len(ordered[i + 1]) > len(ordered[i]):
+            first_longer = i + 1
+        # Bits of the strictly longer chains.
+        candidates = ~((1 << first_longer) - 1)
+        for node in ordered[i]:
+            candidates &= containing[node]
+            if not candidates:
                 break
-        if not is_subchain:
-            filtered.add(chain)
+        if not candidates:
+            filtered.add(ordered[i])
     return filtered
 
 
 def build_gene_chain_mapping(
-    species_busco: List[Tuple[str, Dict[str, BuscoGene]]],
+    species_busco: Union[GeneMatrix, SpeciesBusco],
     chains: List[List[Tuple[str, str]]],
 ) -> Dict[str, int]:
     """
@@ -214,7 +359,8 @@ def build_gene_chain_mapping(
     gene is present, the gene's chromosome equals the chain's chromosome.
 
     Args:
-        species_busco: Ordered list of (species_name, busco_data) tuples
+        species_busco: Ordered list of (species_name, busco_data) tuples, or
+            the GeneMatrix built from it
         chains: Chains from enumerate_chains
 
     Returns:
@@ -224,29 +370,19 @@ def build_gene_chain_mapping(
     if not species_busco:
         return {}
 
-    species_index = {name: i for i, (name, _) in enumerate(species_busco)}
-
-    chain_paths = [
-        {species_index[sp]: chrom for sp, chrom in chain} for chain in chains
-    ]
-
-    eligible = _eligible_genes(species_busco)
+    matrix = GeneMatrix.coerce(species_busco)
+    signatures, inverse, _ = matrix.signatures()
+    index = _ChainIndex(matrix.code_paths(chains), len(matrix))
+    signature_matches = [index.matches(codes) for codes in signatures.tolist()]
 
     gene_mapping: Dict[str, int] = {}
     chain_counts: Dict[int, int] = defaultdict(int)
     ambiguous: List[Tuple[str, List[int]]] = []
 
-    for gene_id in sorted(eligible):
-        gene_chroms: Dict[int, str] = {}
-        for pos, (_, busco_data) in enumerate(species_busco):
-            if gene_id in busco_data:
-                gene_chroms[pos] = busco_data[gene_id].chromosome
-
-        matches = [
-            cid
-            for cid, cpath in enumerate(chain_paths)
-            if _gene_matches_chain(gene_chroms, cpath)
-        ]
+    # Eligible rows follow the sorted gene ids.
+    for row, sig in zip(matrix.eligible_rows.tolist(), inverse.tolist()):
+        gene_id = matrix.gene_ids[row]
+        matches = signature_matches[sig]
 
         if len(matches) == 1:
             gene_mapping[gene_id] = matches[0]
@@ -264,46 +400,76 @@ def build_gene_chain_mapping(
     return gene_mapping
 
 
-def _gene_matches_chain(
-    gene_chroms: Dict[int, str], chain_path: Dict[int, str]
-) -> bool:
-    """Return True if the gene is compatible with the chain at all shared positions."""
-    compared = False
-    for pos, chrom in chain_path.items():
-        if pos in gene_chroms:
-            if gene_chroms[pos] != chrom:
-                return False
-            compared = True
-    return compared
+class _ChainIndex:
+    """
+    Inverted index from (species position, chromosome code) to chains.
+
+    A gene matches a chain if the chain covers at least one species where the
+    gene is present, and the gene's chromosome equals the chain's there at
+    every such species. Chain sets are int bitsets, so the matching chains of
+    a gene are a few ANDs per species instead of a scan over all chains.
+    """
+
+    def __init__(self, chain_paths: List[Dict[int, int]], n_species: int):
+        self.covers = [0] * n_species
+        self.by_code: Dict[Tuple[int, int], int] = defaultdict(int)
+        for cid, path in enumerate(chain_paths):
+            bit = 1 << cid
+            for pos, code in path.items():
+                self.covers[pos] |= bit
+                self.by_code[(pos, code)] |= bit
+        self.all_chains = (1 << len(chain_paths)) - 1
+
+    def matches(self, codes: List[int]) -> List[int]:
+        """Ids of the chains matching a gene's codes, ascending."""
+        allowed, compared = self.all_chains, 0
+        for pos, code in enumerate(codes):
+            if code < 0:
+                continue
+            covers = self.covers[pos]
+            allowed &= ~covers | self.by_code.get((pos, code), 0)
+            compared |= covers
+        found = allowed & compared
+        matches = []
+        while found:
+            low = found & -found
+            matches.append(low.bit_length() - 1)
+            found ^= low
+        return matches
+
+
+# Bound on the (chains x signatures x species) comparison done at once.
+_MATCH_BLOCK = 1 << 22
 
 
 def _count_matching_genes(
-    chain: List[Tuple[str, str]],
-    species_busco: List[Tuple[str, Dict[str, BuscoGene]]],
-    species_index: Dict[str, int],
-    eligible: Set[str],
-) -> int:
-    chain_path = {species_index[sp]: chrom for sp, chrom in chain}
-    count = 0
-    for gene_id in eligible:
-        if _gene_matches_chain(
-            {
-                pos: busco_data[gene_id].chromosome
-                for pos, (_, busco_data) in enumerate(species_busco)
-                if gene_id in busco_data
-            },
-            chain_path,
-        ):
-            count += 1
-    return count
-
-
-def _count_sig_links(
-    node: Tuple[str, str],
-    nodes: List[Tuple[str, str]],
-    sig_pairs: Set[Tuple[Tuple[str, str], Tuple[str, str]]],
-) -> int:
-    return sum(1 for other in nodes if other is not node and (node, other) in sig_pairs)
+    chains: List[List[Tuple[str, str]]], matrix: GeneMatrix
+) -> np.ndarray:
+    """Number of eligible genes matching each chain (see _ChainIndex).
+
+    Compares every chain with every distinct gene signature in one
+    broadcast per block of chains, weighting signatures by their gene count.
+    """
+    signatures, _, weights = matrix.signatures()
+    counts = np.zeros(len(chains), dtype=np.int64)
+    if not len(chains) or not len(signatures):
+        return counts
+
+    # Chain codes per species, -1 where the chain does not cover it.
+    paths = np.full((len(chains), len(matrix)), -1, dtype=np.int32)
+    for cid, path in enumerate(matrix.code_paths(chains)):
+        for pos, code in path.items():
+            paths[cid, pos] = code
+    covered = paths != -1
+    present = signatures >= 0
+
+    step = max(1, _MATCH_BLOCK // signatures.size)
+    for lo in range(0, len(chains), step):
+        shared = covered[lo : lo + step, None, :] & present[None, :, :]
+        differs = paths[lo : lo + step, None, :] != signatures[None, :, :]
+        match = shared.any(axis=2) & ~(shared & differs).any(axis=2)
+        counts[lo : lo + step] = match @ weights
+    return counts
 
 
 def _split_into_contiguous_segments(
@@ -349,7 +515,7 @@ def validate_chains(
     all_chromosome_associations: List[ChromosomeAssociation],
     permissive: bool = False,
     min_chain_genes: int = 0,
-    species_busco: List[Tuple[str, Dict[str, BuscoGene]]] = None,
+    species_busco: Union[GeneMatrix, SpeciesBusco] = None,
 ) -> List[List[Tuple[str, str]]]:
     """
     Validate chains by iteratively pruning nodes that lack enough significant
@@ -370,13 +536,20 @@ def validate_chains(
     Returns:
         Validated (and possibly split) chains, sorted deterministically.
     """
-    sig_pairs: Set[Tuple[Tuple[str, str], Tuple[str, str]]] = set()
+    # Significant links between chain nodes as an adjacency bit matrix: bit j
+    # of sig_links[i] is set when nodes i and j are significantly associated.
+    node_ids: Dict[Tuple[str, str], int] = {}
+    for chain in chains:
+        for node in chain:
+            node_ids.setdefault(node, len(node_ids))
+    sig_links = [0] * len(node_ids)
     for assoc in all_chromosome_associations:
         if assoc.significant:
-            a = (assoc.species1, assoc.chr1)
-            b = (assoc.species2, assoc.chr2)
-            sig_pairs.add((a, b))
-            sig_pairs.add((b, a))
+            a = node_ids.get((assoc.species1, assoc.chr1))
+            b = node_ids.get((assoc.species2, assoc.chr2))
+            if a is not None and b is not None and a != b:
+                sig_links[a] |= 1 << b
+                sig_links[b] |= 1 << a
 
     validated: List[List[Tuple[str, str]]] = []
     for chain in chains:
@@ -386,10 +559,13 @@ def validate_chains(
             if n < 2:
                 break
             threshold = 1 if permissive else n // 2
+            surviving_bits = 0
+            for node in surviving:
+                surviving_bits |= 1 << node_ids[node]
             still_ok = [
                 node
                 for node in surviving
-                if _count_sig_links(node, surviving, sig_pairs) >= threshold
+                if (sig_links[node_ids[node]] & surviving_bits).bit_count() >= threshold
             ]
             if len(still_ok) == len(surviving):
                 break
@@ -403,13 +579,11 @@ def validate_chains(
     validated = _dedup_segments(validated)
 
     if min_chain_genes > 0 and species_busco:
-        species_index = {name: i for i, (name, _) in enumerate(species_busco)}
-        eligible = _eligible_genes(species_busco)
+        support = _count_matching_genes(validated, GeneMatrix.coerce(species_busco))
         validated = [
             seg
-            for seg in validated
-            if _count_matching_genes(seg, species_busco, species_index, eligible)
-            >= min_chain_genes
+            for seg, count in zip(validated, support.tolist())
+            if count >= min_chain_genes
         ]
 
     validated = [list(c) for c in _prune_subchains({tuple(c) for c in validated})]
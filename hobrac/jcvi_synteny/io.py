@@ -1,10 +1,13 @@
 import os
 import warnings
 from collections import defaultdict
-from typing import Dict
+from typing import Dict, Tuple
 
+import numpy as np
 from xopen import xopen
 
+from hobrac.busco_columns import load_table
+
 from .models import BuscoGene
 
 
@@ -193,25 +196,47 @@ def read_busco_tsv(file_path: str, min_busco_genes: int = 0) -> Dict[str, BuscoG
     Returns:
         Dictionary mapping BUSCO ID to BuscoGene
     """
-    busco_data = {}
-    with open(file_path, "r") as f:
-        for line in f:
-            if line.startswith("#"):
-                continue
-            parts = line.strip().split("\t")
-            if len(parts) >= 5 and parts[1] == "Complete":
-                busco_id = parts[0]
-                busco_data[busco_id] = BuscoGene(
-                    busco_id=busco_id,
-                    chromosome=parts[2],
-                    start=int(parts[3]),
-                    end=int(parts[4]),
-                )
+    return read_busco_views(file_path, min_busco_genes)[0]
+
+
+def read_busco_views(
+    file_path: str, min_busco_genes: int = 0, cache_dir: str = ""
+) -> Tuple[Dict[str, BuscoGene], Dict[str, BuscoGene]]:
+    """
+    Load a BUSCO full_table.tsv once and return its filtered and unfiltered views.
+
+    The table is read through the columnar loader; both views share the same
+    BuscoGene objects.
 
-    if min_busco_genes > 0:
-        busco_data = filter_by_min_genes(busco_data, min_busco_genes)
+    Args:
+        file_path: Path to BUSCO full_table.tsv file
+        min_busco_genes: Minimum complete BUSCO genes required per sequence
+                         in the filtered view.
+        cache_dir: Directory caching the parsed table (see
+                   hobrac.busco_columns), or empty to parse it every time.
 
-    return busco_data
+    Returns:
+        (genes on sequences passing min_busco_genes, all Complete genes), each
+        a dictionary mapping BUSCO ID to BuscoGene in table order
+    """
+    columns = load_table(file_path, cache_dir)
+    complete = columns.complete_mask()
+    passing = columns.complete_mask(min_busco_genes)
+
+    unfiltered = {}
+    filtered = {}
+    for i in np.flatnonzero(complete):
+        busco_id = str(columns.busco_id[i])
+        gene = BuscoGene(
+            busco_id=busco_id,
+            chromosome=columns.chromosomes[columns.chromosome[i]],
+            start=int(columns.start[i]),
+            end=int(columns.end[i]),
+        )
+        unfiltered[busco_id] = gene
+        if passing[i]:
+            filtered[busco_id] = gene
+    return filtered, unfiltered
 
 
 def filter_by_min_genes(
@@ -0,0 +1,145 @@
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .models import BuscoGene
+
+SpeciesBusco = List[Tuple[str, Dict[str, BuscoGene]]]
+
+
+class GeneMatrix:
+    """
+    Genes x species view of the BUSCO data shared by the analysis functions.
+
+    ``codes[g, s]`` is the chromosome code of gene ``gene_ids[g]`` in species
+    ``species[s]`` (an index into ``chromosomes[s]``), or -1 when the gene is
+    absent there; ``starts``/``ends`` hold the coordinates (0 when absent).
+    Genes are sorted by id and chromosome codes follow first appearance in
+    each species' BUSCO data.
+
+    Presence masks and the eligible genes (present in at least two species)
+    are computed once here instead of in every analysis step. The original
+    ``species_busco`` list is kept for the callers that still need per-gene
+    records (BED and links files).
+    """
+
+    def __init__(self, species_busco: SpeciesBusco):
+        self.species_busco = species_busco
+        self.species: List[str] = [name for name, _ in species_busco]
+        self.species_index: Dict[str, int] = {}
+        # Names shared by several tracks cannot be looked up (species_position).
+        self._ambiguous = set()
+        for i, name in enumerate(self.species):
+            if name in self.species_index:
+                self._ambiguous.add(name)
+            self.species_index.setdefault(name, i)
+
+        all_ids = set()
+        for _, busco_data in species_busco:
+            all_ids.update(busco_data)
+        self.gene_ids: List[str] = sorted(all_ids)
+        self.gene_index: Dict[str, int] = {g: i for i, g in enumerate(self.gene_ids)}
+
+        n_genes, n_species = len(self.gene_ids), len(self.species)
+        self.codes = np.full((n_genes, n_species), -1, dtype=np.int32)
+        self.starts = np.zeros((n_genes, n_species), dtype=np.int64)
+        self.ends = np.zeros((n_genes, n_species), dtype=np.int64)
+        self.chromosomes: List[List[str]] = []
+        self.chromosome_index: List[Dict[str, int]] = []
+
+        for s, (_, busco_data) in enumerate(species_busco):
+            index: Dict[str, int] = {}
+            rows = np.fromiter((self.gene_index[g] for g in busco_data), dtype=np.int64)
+            codes = np.fromiter(
+                (
+                    index.setdefault(gene.chromosome, len(index))
+                    for gene in busco_data.values()
+                ),
+                dtype=np.int32,
+            )
+            self.codes[rows, s] = codes
+            self.starts[rows, s] = [gene.start for gene in busco_data.values()]
+            self.ends[rows, s] = [gene.end for gene in busco_data.values()]
+            self.chromosomes.append(list(index))
+            self.chromosome_index.append(index)
+
+        self.present = self.codes >= 0
+        self.presence_count = self.present.sum(axis=1)
+        self.eligible = self.presence_count >= 2
+        self.eligible_rows = np.flatnonzero(self.eligible)
+        self._signatures = None
+
+    @classmethod
+    def coerce(cls, species_busco: Union["GeneMatrix", SpeciesBusco]) -> "GeneMatrix":
+        """Return *species_busco* as a GeneMatrix, building it if needed."""
+        if isinstance(species_busco, cls):
+            return species_busco
+        return cls(species_busco or [])
+
+    def __len__(self) -> int:
+        return len(self.species)
+
+    def __iter__(self):
+        return iter(self.species_busco)
+
+    def __getitem__(self, i):
+        return self.species_busco[i]
+
+    def eligible_ids(self) -> List[str]:
+        """Ids of genes present in at least two species, sorted."""
+        return [self.gene_ids[g] for g in self.eligible_rows]
+
+    def signatures(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Distinct code rows of the eligible genes, as ``(signatures, inverse,
+        counts)``: ``signatures[inverse[i]]`` is the codes of
+        ``eligible_rows[i]`` and ``counts`` the genes sharing each signature.
+        """
+        if self._signatures is None:
+            codes = self.codes[self.eligible_rows]
+            if len(codes):
+                signatures, inverse, counts = np.unique(
+                    codes, axis=0, return_inverse=True, return_counts=True
+                )
+                inverse = inverse.reshape(-1)
+            else:
+                signatures = codes
+                inverse = counts = np.zeros(0, dtype=np.int64)
+            self._signatures = (signatures, inverse, counts)
+        return self._signatures
+
+    def species_position(self, name: str) -> int:
+        """Column of species *name*; a name shared by several tracks is an error."""
+        if name in self._ambiguous:
+            raise ValueError(f"Several species are named {name!r}")
+        return self.species_index[name]
+
+    def chromosome_code(self, species: int, chromosome: str) -> int:
+        """Code of *chromosome* in *species*, or -2 (matches no gene) if unknown."""
+        return self.chromosome_index[species].get(chromosome, -2)
+
+    def gene_nodes(self, row: int) -> List[Tuple[str, str]]:
+        """(species, chromosome) nodes of a gene, in species order."""
+        return [
+            (self.species[s], self.chromosomes[s][code])
+            for s, code in enumerate(self.codes[row].tolist())
+            if code >= 0
+        ]
+
+    def common_rows(self, s1: int, s2: int) -> np.ndarray:
+        """Rows of the genes present in both species."""
+        return np.flatnonzero(self.present[:, s1] & self.present[:, s2])
+
+    def code_paths(
+        self, chains: Sequence[Sequence[Tuple[str, str]]]
+    ) -> List[Dict[int, int]]:
+        """Chains as ``{species position: chromosome code}``."""
+        return [
+            {
+                self.species_position(sp): self.chromosome_code(
+                    self.species_position(sp), chrom
+                )
+                for sp, chrom in chain
+            }
+            for chain in chains
+        ]
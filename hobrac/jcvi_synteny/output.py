@@ -3,19 +3,21 @@ import glob
 import os
 import sys
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 from hobrac.rename_chr import fasta_basename
 
+from .cache import CACHE_DIRNAME
 from .coloring import apply_custom_colors, apply_custom_colors_with_algs
 from .io import (
     parse_custom_algs,
     parse_custom_colors,
-    read_busco_tsv,
+    read_busco_views,
     read_fasta_sizes,
     resolve_assembly_title,
     resolve_titles,
 )
+from .matrix import GeneMatrix
 from .models import (
     DEFAULT_COLOR,
     BuscoGene,
@@ -28,6 +30,7 @@ from .ordering import (
 )
 from .rearrangement import calculate_rearrangement_indices, save_rearrangement_indices
 from .statistics import detect_algs_transitive
+from .sweep import save_sweep_table, sweep
 
 
 def generate_bed_file(
@@ -315,7 +318,7 @@ def save_chains(
 
 
 def save_gene_chains(
-    species_busco: List[Tuple[str, Dict[str, BuscoGene]]],
+    species_busco: Union[GeneMatrix, List[Tuple[str, Dict[str, BuscoGene]]]],
     gene_to_chain: Dict[str, int],
     gene_colors: Dict[str, str],
     custom_algs: Dict[str, str],
@@ -351,13 +354,11 @@ def save_gene_chains(
     even when no genes are present — in that case only the header is emitted.
     """
     custom_algs = custom_algs or {}
-    species_names = [name for name, _ in species_busco]
+    matrix = GeneMatrix.coerce(species_busco)
+    species_names = matrix.species
 
-    all_ids = set()
-    for _, busco_data in species_busco:
-        all_ids.update(busco_data.keys())
-
-    def sort_key(gid: str) -> Tuple[bool, int, str]:
+    def sort_key(row: int) -> Tuple[bool, int, str]:
+        gid = matrix.gene_ids[row]
         chain_id = gene_to_chain.get(gid, -1)
         return (chain_id < 0, chain_id if chain_id >= 0 else 0, gid)
 
@@ -372,19 +373,19 @@ def save_gene_chains(
     ]
     with open(output_path, "w") as f:
         f.write("\t".join(header) + "\n")
-        for gid in sorted(all_ids, key=sort_key):
+        for row in sorted(range(len(matrix.gene_ids)), key=sort_key):
+            gid = matrix.gene_ids[row]
             chain_id = gene_to_chain.get(gid, -1)
+            codes = matrix.codes[row].tolist()
+            starts = matrix.starts[row].tolist()
+            ends = matrix.ends[row].tolist()
             chroms = [
-                busco_data[gid].chromosome if gid in busco_data else "ABSENT"
-                for _, busco_data in species_busco
+                matrix.chromosomes[s][code] if code >= 0 else "ABSENT"
+                for s, code in enumerate(codes)
             ]
             positions = [
-                (
-                    f"{busco_data[gid].start}:{busco_data[gid].end}"
-                    if gid in busco_data
-                    else "ABSENT"
-                )
-                for _, busco_data in species_busco
+                f"{starts[s]}:{ends[s]}" if code >= 0 else "ABSENT"
+                for s, code in enumerate(codes)
             ]
             custom_alg = custom_algs.get(gid, "-")
             color = gene_colors.get(gid, DEFAULT_COLOR)
@@ -465,6 +466,13 @@ def run(
     alpha: float = 0.01,
     min_chain_genes: int = 5,
     permissive_alg: bool = False,
+    alg_min_genes: int = 5,
+    jobs: int = 1,
+    alg_cache: bool = True,
+    busco_cache_dir: str = "",
+    sweep_alphas: Optional[List[float]] = None,
+    sweep_min_chain_genes: Optional[List[int]] = None,
+    sweep_permissive: bool = False,
 ) -> Dict[str, str]:
     """
     Main entry point for JCVI synteny analysis.
@@ -498,6 +506,21 @@ def run(
         min_chain_genes: Minimum BUSCO genes a chain must be supported by.
                          Chains with fewer supporting genes are dropped before
                          sub-chain pruning.
+        alg_min_genes: Minimum shared genes for a chromosome pair to be tested
+                       in ALG detection and in the ALG parameter sweep.
+        jobs: Worker processes for the pairwise species comparisons of ALG
+              detection.
+        alg_cache: Reuse ALG detection results cached in
+                   ``<output_dir>/.alg_cache`` by earlier runs on the same
+                   BUSCO data and parameters.
+        busco_cache_dir: Directory caching the parsed BUSCO tables across runs
+                         (see hobrac.busco_columns); empty to parse them.
+        sweep_alphas: Alpha values of the ALG parameter sweep.
+        sweep_min_chain_genes: min_chain_genes values of the ALG parameter
+                               sweep.
+        sweep_permissive: Sweep both strict and permissive chain validation.
+                          Setting any sweep argument writes ``alg_sweep.tsv``;
+                          grids left unset hold the run's own value.
 
     Returns:
         Dictionary with paths to generated files
@@ -552,10 +575,14 @@ def run(
     # bed/links parsers (which would crash with "too many values to unpack").
     species_keys = [name for name, _ in species_order]
 
+    # One load per table gives both the --min-busco-genes view used for the
+    # analysis and the unfiltered view used by the empty-track warning below.
     species_busco = []
+    unfiltered_busco = []
     for name, path in species_order:
-        busco_data = read_busco_tsv(path, min_busco_genes)
+        busco_data, all_genes = read_busco_views(path, min_busco_genes, busco_cache_dir)
         species_busco.append((name, busco_data))
+        unfiltered_busco.append(all_genes)
 
     # jcvi karyotype cannot render a track whose BED is empty. A track goes
     # empty when no sequence reaches --min-busco-genes complete BUSCO genes
@@ -566,9 +593,9 @@ def run(
     empty_species = [name for name, data in species_busco if not data]
     if empty_species:
         detail_lines = []
-        for name, path in species_order:
+        for (name, _), all_genes in zip(species_order, unfiltered_busco):
             counts = defaultdict(int)
-            for gene in read_busco_tsv(path).values():
+            for gene in all_genes.values():
                 counts[gene.chromosome] += 1
             best = max(counts.values()) if counts else 0
             detail_lines.append(
@@ -623,17 +650,42 @@ def run(
     gene_to_chain: Dict[str, int] = {}
     chain_colors: Dict[int, str] = {}
     chains: List[List[Tuple[str, str]]] = []
-    if not (custom_colors and skip_alg):
+    # Built once and shared by ALG detection and the per-gene chain table.
+    gene_matrix = GeneMatrix(species_busco)
+    alg_detection = not (custom_colors and skip_alg)
+    if alg_detection:
         _, chains, gene_to_chain, chain_colors, all_chromosome_associations = (
             detect_algs_transitive(
-                species_busco,
+                gene_matrix,
                 alpha=alpha,
+                min_genes=alg_min_genes,
                 min_chain_genes=min_chain_genes,
                 permissive_alg=permissive_alg,
+                jobs=jobs,
+                cache_dir=(
+                    os.path.join(output_dir, CACHE_DIRNAME) if alg_cache else None
+                ),
             )
         )
     save_chromosome_associations(all_chromosome_associations, associations_output)
 
+    sweep_output = ""
+    if sweep_alphas or sweep_min_chain_genes or sweep_permissive:
+        sweep_output = os.path.join(output_dir, "alg_sweep.tsv")
+        sweep_rows = sweep(
+            gene_matrix,
+            sweep_alphas or [alpha],
+            sweep_min_chain_genes or [min_chain_genes],
+            [False, True] if sweep_permissive else [permissive_alg],
+            custom_algs=custom_algs,
+            min_genes=alg_min_genes,
+            jobs=jobs,
+            # The tests of the run above, possibly from the ALG cache; they
+            # are re-thresholded, not recomputed.
+            tested=all_chromosome_associations if alg_detection else None,
+        )
+        save_sweep_table(sweep_rows, sweep_output)
+
     algs_output = os.path.join(output_dir, "algs.tsv")
     save_chains(
         chains,
@@ -645,16 +697,14 @@ def run(
 
     # Resolve one run-wide identity color per gene, matching how the karyotype
     # renders it (see resolve_gene_identity_colors).
-    all_gene_ids = set()
-    for _, busco_data in species_busco:
-        all_gene_ids.update(busco_data.keys())
+    all_gene_ids = set(gene_matrix.gene_ids)
     gene_identity_colors = resolve_gene_identity_colors(
         all_gene_ids, gene_to_chain, chain_colors, custom_colors, skip_alg
     )
 
     gene_chains_output = os.path.join(output_dir, "gene_chains.tsv")
     save_gene_chains(
-        species_busco,
+        gene_matrix,
         gene_to_chain,
         gene_identity_colors,
         custom_algs,
@@ -723,6 +773,7 @@ def run(
         "chromosome_associations": associations_output,
         "algs": algs_output,
         "gene_chains": gene_chains_output,
+        "alg_sweep": sweep_output,
         "rearrangement_index": rearrangement_summary,
         "rearrangement_index_by_alg": rearrangement_by_alg,
         "bed_files": [p for _, p in bed_files],
@@ -835,6 +886,44 @@ def main():
         "with at least n/2 other nodes; this flag relaxes the requirement "
         "to just 1 significant link per node.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for the pairwise species comparisons of ALG "
+        "detection (default: 1).",
+    )
+    parser.add_argument(
+        "--no-alg-cache",
+        action="store_true",
+        help="Recompute ALG detection instead of reusing the results cached in "
+        "<output_dir>/.alg_cache by an earlier run on the same BUSCO data, "
+        "alpha and chain parameters.",
+    )
+    parser.add_argument(
+        "--busco-cache-dir",
+        default="",
+        help="Directory caching the parsed BUSCO tables, shared across runs "
+        "(default: none).",
+    )
+    parser.add_argument(
+        "--alg-sweep-pvalues",
+        default="",
+        help="Comma-separated alpha values to compare in alg_sweep.tsv, e.g. "
+        "0.01,0.001,1e-5. Pairwise tests run once and are re-thresholded for "
+        "each value.",
+    )
+    parser.add_argument(
+        "--alg-sweep-min-chain-genes",
+        default="",
+        help="Comma-separated --jcvi-min-chain-genes values to compare in "
+        "alg_sweep.tsv, e.g. 3,5,10.",
+    )
+    parser.add_argument(
+        "--alg-sweep-permissive",
+        action="store_true",
+        help="Compare strict and permissive chain validation in alg_sweep.tsv.",
+    )
 
     args = parser.parse_args()
 
@@ -856,6 +945,14 @@ def main():
         alpha=args.alg_pvalue,
         min_chain_genes=args.jcvi_min_chain_genes,
         permissive_alg=args.jcvi_permissive_alg,
+        jobs=args.jobs,
+        alg_cache=not args.no_alg_cache,
+        busco_cache_dir=args.busco_cache_dir,
+        sweep_alphas=[float(v) for v in args.alg_sweep_pvalues.split(",") if v],
+        sweep_min_chain_genes=[
+            int(v) for v in args.alg_sweep_min_chain_genes.split(",") if v
+        ],
+        sweep_permissive=args.alg_sweep_permissive,
     )
 
 
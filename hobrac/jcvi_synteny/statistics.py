@@ -1,9 +1,12 @@
-from collections import defaultdict
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 
-from scipy.stats import fisher_exact
+import numpy as np
+from scipy.stats import hypergeom
 
+from . import cache
 from .chains import build_gene_chain_mapping, enumerate_chains, validate_chains
+from .matrix import GeneMatrix, SpeciesBusco
 from .models import (
     ALG_PALETTE,
     BuscoGene,
@@ -12,6 +15,25 @@ from .models import (
 )
 
 
+def fisher_exact_greater(
+    a: np.ndarray, b: np.ndarray, c: np.ndarray, d: np.ndarray
+) -> np.ndarray:
+    """
+    One-sided ("greater") Fisher's exact test p-values of the 2x2 tables
+    ``[[a, b], [c, d]]``, element-wise.
+
+    Same formula as ``scipy.stats.fisher_exact(table, alternative="greater")``
+    (a hypergeometric CDF over the second column), evaluated in one call for
+    all tables.
+    """
+    a, b, c, d = (np.asarray(x, dtype=np.int64) for x in (a, b, c, d))
+    p_values = np.minimum(hypergeom.cdf(b, a + b + c + d, a + b, b + d), 1.0)
+    # A table with an empty row or column has p = 1.
+    empty = (a + b == 0) | (c + d == 0) | (a + c == 0) | (b + d == 0)
+    p_values[empty] = 1.0
+    return p_values
+
+
 def detect_algs_pairwise_raw(
     busco1: Dict[str, BuscoGene],
     busco2: Dict[str, BuscoGene],
@@ -19,6 +41,7 @@ def detect_algs_pairwise_raw(
     species2: str,
     alpha: float = 0.01,
     min_genes: int = 5,
+    matrix: Optional[GeneMatrix] = None,
 ) -> Tuple[List[PairwiseAssociation], List[ChromosomeAssociation]]:
     """
     Run Fisher's exact test, return significant associations and all tested pairs.
@@ -30,47 +53,85 @@ def detect_algs_pairwise_raw(
         species2: Name of species 2
         alpha: Significance level before correction
         min_genes: Minimum genes in a chr pair to test
+        matrix: GeneMatrix holding both species (looked up by name, which
+            must then be unique); when given, the genes are counted from it
+            instead of from busco1/busco2
 
     Returns:
         Tuple of:
         - List of significant PairwiseAssociation objects
         - List of all tested ChromosomeAssociation objects (significant and not)
     """
-    common_ids = set(busco1.keys()) & set(busco2.keys())
-    if not common_ids:
-        return [], []
+    if matrix is None:
+        # By position: the two species may share a name.
+        s1, s2 = 0, 1
+        matrix = GeneMatrix([(species1, busco1), (species2, busco2)])
+    else:
+        s1, s2 = matrix.species_position(species1), matrix.species_position(species2)
+    return _pairwise_from_matrix(
+        matrix,
+        s1,
+        s2,
+        alpha,
+        min_genes,
+    )
 
-    chr_pair_counts = defaultdict(int)
-    chr1_counts = defaultdict(int)
-    chr2_counts = defaultdict(int)
 
-    for busco_id in common_ids:
-        chr1 = busco1[busco_id].chromosome
-        chr2 = busco2[busco_id].chromosome
-        chr_pair_counts[(chr1, chr2)] += 1
-        chr1_counts[chr1] += 1
-        chr2_counts[chr2] += 1
+def _pairwise_from_matrix(
+    matrix: GeneMatrix,
+    s1: int,
+    s2: int,
+    alpha: float,
+    min_genes: int,
+) -> Tuple[List[PairwiseAssociation], List[ChromosomeAssociation]]:
+    """detect_algs_pairwise_raw for species positions *s1* and *s2* of *matrix*.
 
-    total_genes = len(common_ids)
+    Chromosome pairs are tested in order of their first shared gene (by id).
+    """
+    rows = matrix.common_rows(s1, s2)
+    if not len(rows):
+        return [], []
 
-    testable_pairs = [
-        (chr1, chr2, count)
-        for (chr1, chr2), count in chr_pair_counts.items()
-        if count >= min_genes
-    ]
+    # Chromosome pairs as one integer code each; only the observed pairs are
+    # materialised, so memory follows the shared genes rather than the
+    # number of scaffolds squared.
+    codes1 = matrix.codes[rows, s1].astype(np.int64)
+    codes2 = matrix.codes[rows, s2].astype(np.int64)
+    n_chr2 = len(matrix.chromosomes[s2])
+    pairs, first_gene, pair_counts = np.unique(
+        codes1 * n_chr2 + codes2, return_index=True, return_counts=True
+    )
+    chr1_counts = np.bincount(codes1, minlength=len(matrix.chromosomes[s1]))
+    chr2_counts = np.bincount(codes2, minlength=n_chr2)
 
-    if not testable_pairs:
-        return [], []
+    total_genes = len(rows)
 
-    results = []
-    for chr1, chr2, observed in testable_pairs:
-        chr1_other = chr1_counts[chr1] - observed
-        chr2_other = chr2_counts[chr2] - observed
-        neither = total_genes - chr1_counts[chr1] - chr2_counts[chr2] + observed
+    testable = np.flatnonzero(pair_counts >= min_genes)
+    if not len(testable):
+        return [], []
+    testable = testable[np.argsort(first_gene[testable], kind="stable")]
+    pair_chr1, pair_chr2 = np.divmod(pairs[testable], n_chr2)
+    observed = pair_counts[testable]
 
-        table = [[observed, chr1_other], [chr2_other, neither]]
-        _, p_value = fisher_exact(table, alternative="greater")
-        results.append((chr1, chr2, p_value, observed))
+    species1, species2 = matrix.species[s1], matrix.species[s2]
+    names1, names2 = matrix.chromosomes[s1], matrix.chromosomes[s2]
+    chr1_total = chr1_counts[pair_chr1]
+    chr2_total = chr2_counts[pair_chr2]
+    p_values = fisher_exact_greater(
+        observed,
+        chr1_total - observed,
+        chr2_total - observed,
+        total_genes - chr1_total - chr2_total + observed,
+    )
+    results = [
+        (names1[chr1], names2[chr2], p_value, count)
+        for chr1, chr2, p_value, count in zip(
+            pair_chr1.tolist(),
+            pair_chr2.tolist(),
+            p_values.tolist(),
+            observed.tolist(),
+        )
+    ]
 
     num_tests = len(results)
 
@@ -108,12 +169,96 @@ def detect_algs_pairwise_raw(
     return significant, all_tested
 
 
+def _test_pair(
+    matrix: GeneMatrix,
+    i: int,
+    j: int,
+    alpha: float,
+    min_genes: int,
+) -> Tuple[List[PairwiseAssociation], List[ChromosomeAssociation]]:
+    sp1_name, sp1_busco = matrix[i]
+    sp2_name, sp2_busco = matrix[j]
+    return detect_algs_pairwise_raw(
+        sp1_busco,
+        sp2_busco,
+        sp1_name,
+        sp2_name,
+        alpha,
+        min_genes,
+        matrix=matrix,
+    )
+
+
+# GeneMatrix of the current detect_algs_transitive worker process.
+_worker_matrix: Optional[GeneMatrix] = None
+
+
+def _init_pair_worker(matrix: GeneMatrix) -> None:
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _test_pair_in_worker(pair: Tuple[int, int, float, int]):
+    return _test_pair(_worker_matrix, *pair)
+
+
+def _test_all_pairs(
+    matrix: GeneMatrix,
+    alpha: float,
+    min_genes: int,
+    jobs: int,
+) -> Tuple[List[PairwiseAssociation], List[ChromosomeAssociation]]:
+    pairs = [
+        (i, j, alpha, min_genes)
+        for i in range(len(matrix))
+        for j in range(i + 1, len(matrix))
+    ]
+    if jobs <= 1 or len(pairs) <= 1:
+        pair_results = [_test_pair(matrix, *pair) for pair in pairs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_pair_worker, initargs=(matrix,)
+        ) as pool:
+            chunksize = max(1, len(pairs) // (jobs * 4))
+            pair_results = list(
+                pool.map(_test_pair_in_worker, pairs, chunksize=chunksize)
+            )
+
+    all_associations: List[PairwiseAssociation] = []
+    all_chromosome_associations: List[ChromosomeAssociation] = []
+    for significant, tested in pair_results:
+        all_associations.extend(significant)
+        all_chromosome_associations.extend(tested)
+    return all_associations, all_chromosome_associations
+
+
+def _find_chains(
+    matrix: GeneMatrix,
+    all_associations: List[PairwiseAssociation],
+    all_chromosome_associations: List[ChromosomeAssociation],
+    min_chain_genes: int,
+    permissive_alg: bool,
+) -> Tuple[List[List[Tuple[str, str]]], Dict[str, int]]:
+    chains = enumerate_chains(all_associations, matrix, min_chain_genes=min_chain_genes)
+    if all_chromosome_associations:
+        chains = validate_chains(
+            chains,
+            all_chromosome_associations,
+            permissive=permissive_alg,
+            min_chain_genes=min_chain_genes,
+            species_busco=matrix,
+        )
+    return chains, build_gene_chain_mapping(matrix, chains)
+
+
 def detect_algs_transitive(
-    species_busco: List[Tuple[str, Dict[str, BuscoGene]]],
+    species_busco: Union[GeneMatrix, SpeciesBusco],
     alpha: float = 0.01,
     min_genes: int = 5,
     min_chain_genes: int = 5,
     permissive_alg: bool = False,
+    jobs: int = 1,
+    cache_dir: Optional[str] = None,
 ) -> Tuple[
     List[PairwiseAssociation],
     List[List[Tuple[str, str]]],
@@ -126,13 +271,24 @@ def detect_algs_transitive(
     grouping.
 
     Args:
-        species_busco: List of (species_name, busco_data) tuples
+        species_busco: List of (species_name, busco_data) tuples, or the
+            GeneMatrix built from it
         alpha: Significance level before correction
         min_genes: Minimum genes in a chr pair to test
         min_chain_genes: Minimum BUSCO genes a chain must be supported by to
             survive. Chains with fewer genes are dropped before sub-chain
             pruning, so sub-chains contained in a dropped chain can
             re-emerge. Default 5.
+        permissive_alg: Require a single significant link per chain node
+            (see validate_chains)
+        jobs: Worker processes for the species-pair tests. Workers receive
+            the GeneMatrix once, at start-up (copy-on-write under fork); the
+            results are gathered in pair order, so they do not depend on it.
+        cache_dir: Directory of a persistent cache of the results. The
+            pairwise tests are keyed by a digest of the gene placements plus
+            alpha and min_genes, the chains and gene assignment additionally
+            by min_chain_genes and permissive_alg, so a re-run that changes
+            only later parameters skips the tests, or both stages.
 
     Returns:
         Tuple of:
@@ -142,31 +298,65 @@ def detect_algs_transitive(
         - chain_colors: Dict mapping chain ID to hex color
         - all_chromosome_associations: List of all tested ChromosomeAssociation objects
     """
-    all_associations: List[PairwiseAssociation] = []
-    all_chromosome_associations: List[ChromosomeAssociation] = []
-    for i in range(len(species_busco)):
-        for j in range(i + 1, len(species_busco)):
-            sp1_name, sp1_busco = species_busco[i]
-            sp2_name, sp2_busco = species_busco[j]
-            significant, tested = detect_algs_pairwise_raw(
-                sp1_busco, sp2_busco, sp1_name, sp2_name, alpha, min_genes
+    matrix = GeneMatrix.coerce(species_busco)
+
+    tests_key = chains_key = None
+    tests = chain_data = None
+    if cache_dir:
+        tests_key = cache.cache_key(cache.matrix_digest(matrix), alpha, min_genes)
+        chains_key = cache.cache_key(tests_key, min_chain_genes, permissive_alg)
+        tests = cache.load(cache_dir, "tests", tests_key)
+        chain_data = cache.load(cache_dir, "chains", chains_key)
+
+    if tests is None:
+        all_associations, all_chromosome_associations = _test_all_pairs(
+            matrix, alpha, min_genes, jobs
+        )
+        if cache_dir:
+            cache.save(
+                cache_dir,
+                "tests",
+                tests_key,
+                {"tested": cache.to_records(all_chromosome_associations)},
+            )
+    else:
+        all_chromosome_associations = [
+            ChromosomeAssociation(**record) for record in tests["tested"]
+        ]
+        # The significant associations are the significant tested pairs, in
+        # the same order (see _pairwise_from_matrix).
+        all_associations = [
+            PairwiseAssociation(
+                species1=a.species1,
+                species2=a.species2,
+                chr1=a.chr1,
+                chr2=a.chr2,
+                p_value=a.p_value,
+                gene_count=a.gene_count,
             )
-            all_associations.extend(significant)
-            all_chromosome_associations.extend(tested)
+            for a in all_chromosome_associations
+            if a.significant
+        ]
 
-    chains = enumerate_chains(
-        all_associations, species_busco, min_chain_genes=min_chain_genes
-    )
-    if all_chromosome_associations:
-        chains = validate_chains(
-            chains,
+    if chain_data is None:
+        chains, gene_to_chain = _find_chains(
+            matrix,
+            all_associations,
             all_chromosome_associations,
-            permissive=permissive_alg,
-            min_chain_genes=min_chain_genes,
-            species_busco=species_busco,
+            min_chain_genes,
+            permissive_alg,
         )
+        if cache_dir:
+            cache.save(
+                cache_dir,
+                "chains",
+                chains_key,
+                {"chains": chains, "gene_to_chain": gene_to_chain},
+            )
+    else:
+        chains = [[tuple(node) for node in chain] for chain in chain_data["chains"]]
+        gene_to_chain = chain_data["gene_to_chain"]
 
-    gene_to_chain = build_gene_chain_mapping(species_busco, chains)
     chain_colors = {i: ALG_PALETTE[i % len(ALG_PALETTE)] for i in range(len(chains))}
 
     return (
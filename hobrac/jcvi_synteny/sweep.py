@@ -0,0 +1,167 @@
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .chains import (
+    _select_chains,
+    _walk_chain_counts,
+    build_gene_chain_mapping,
+    validate_chains,
+)
+from .matrix import GeneMatrix
+from .models import ChromosomeAssociation, PairwiseAssociation
+from .statistics import _test_all_pairs
+
+
+class SweepRow(NamedTuple):
+    alpha: float
+    min_chain_genes: int
+    permissive: bool
+    significant_pairs: int
+    chains: int
+    assigned_genes: int
+    # None when no ALG labels were given.
+    recovered_algs: Optional[List[str]]
+
+
+def rethreshold(
+    tested: List[ChromosomeAssociation], alpha: float
+) -> Tuple[List[PairwiseAssociation], List[ChromosomeAssociation]]:
+    """
+    The (significant, tested) associations of detect_algs_pairwise_raw at
+    another *alpha*. P-values and their Bonferroni correction do not depend
+    on alpha, so only the significance flags are recomputed.
+    """
+    significant: List[PairwiseAssociation] = []
+    retested: List[ChromosomeAssociation] = []
+    for a in tested:
+        is_significant = a.corrected_p_value <= alpha
+        retested.append(
+            ChromosomeAssociation(
+                species1=a.species1,
+                species2=a.species2,
+                chr1=a.chr1,
+                chr2=a.chr2,
+                p_value=a.p_value,
+                corrected_p_value=a.corrected_p_value,
+                gene_count=a.gene_count,
+                significant=is_significant,
+            )
+        )
+        if is_significant:
+            significant.append(
+                PairwiseAssociation(
+                    species1=a.species1,
+                    species2=a.species2,
+                    chr1=a.chr1,
+                    chr2=a.chr2,
+                    p_value=a.p_value,
+                    gene_count=a.gene_count,
+                )
+            )
+    return significant, retested
+
+
+def recovered_algs(
+    chains: List[List[Tuple[str, str]]],
+    gene_to_chain: Dict[str, int],
+    custom_algs: Dict[str, str],
+) -> List[str]:
+    """
+    Reference ALGs recovered by the chains: those that are the label of more
+    than half of the labelled genes assigned to some chain. Sorted.
+    """
+    labels: Dict[int, Counter] = {cid: Counter() for cid in range(len(chains))}
+    for gene_id, cid in gene_to_chain.items():
+        if cid >= 0 and gene_id in custom_algs:
+            labels[cid][custom_algs[gene_id]] += 1
+    recovered = set()
+    for counts in labels.values():
+        if counts:
+            alg, count = max(counts.items(), key=lambda item: (item[1], item[0]))
+            if 2 * count > sum(counts.values()):
+                recovered.add(alg)
+    return sorted(recovered)
+
+
+def sweep(
+    matrix: GeneMatrix,
+    alphas: Sequence[float],
+    min_chain_genes_values: Sequence[int],
+    permissive_values: Sequence[bool],
+    custom_algs: Optional[Dict[str, str]] = None,
+    min_genes: int = 5,
+    jobs: int = 1,
+    tested: Optional[List[ChromosomeAssociation]] = None,
+) -> List[SweepRow]:
+    """
+    Run ALG detection for every combination of the parameter grids.
+
+    Each setting gives the chains detect_algs_transitive would, but the work
+    is shared: the pairwise tests are re-thresholded for each alpha, and the
+    chain walk of an alpha is reused by every min_chain_genes and permissive
+    value.
+
+    *tested* are the tested pairs of a detect_algs_transitive run on *matrix*
+    with the same *min_genes*, at any alpha; the pairwise tests are only run
+    here when they are not given.
+    """
+    if tested is None:
+        _, tested = _test_all_pairs(matrix, max(alphas), min_genes, jobs)
+
+    rows: List[SweepRow] = []
+    for alpha in alphas:
+        significant, retested = rethreshold(tested, alpha)
+        chain_counts = _walk_chain_counts(significant, matrix)
+        for min_chain_genes in min_chain_genes_values:
+            candidates = _select_chains(chain_counts, min_chain_genes)
+            for permissive in permissive_values:
+                chains = candidates
+                if retested:
+                    chains = validate_chains(
+                        candidates,
+                        retested,
+                        permissive=permissive,
+                        min_chain_genes=min_chain_genes,
+                        species_busco=matrix,
+                    )
+                gene_to_chain = build_gene_chain_mapping(matrix, chains)
+                rows.append(
+                    SweepRow(
+                        alpha,
+                        min_chain_genes,
+                        permissive,
+                        len(significant),
+                        len(chains),
+                        sum(1 for cid in gene_to_chain.values() if cid >= 0),
+                        (
+                            recovered_algs(chains, gene_to_chain, custom_algs)
+                            if custom_algs
+                            else None
+                        ),
+                    )
+                )
+    return rows
+
+
+def save_sweep_table(rows: List[SweepRow], output_path: str) -> None:
+    """
+    One line per setting. ``recovered_algs`` is the number of reference ALGs
+    recovered (see recovered_algs) and ``algs`` their labels, both ``-``
+    without a custom color file.
+    """
+    with open(output_path, "w") as f:
+        f.write(
+            "alpha\tmin_chain_genes\tpermissive\tsignificant_pairs\tchains\t"
+            "assigned_genes\trecovered_algs\talgs\n"
+        )
+        for row in rows:
+            if row.recovered_algs is None:
+                count, algs = "-", "-"
+            else:
+                count = str(len(row.recovered_algs))
+                algs = ",".join(row.recovered_algs) or "-"
+            f.write(
+                f"{row.alpha:g}\t{row.min_chain_genes}\t"
+                f"{'yes' if row.permissive else 'no'}\t{row.significant_pairs}\t"
+                f"{row.chains}\t{row.assigned_genes}\t{count}\t{algs}\n"
+            )
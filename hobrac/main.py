@@ -13,13 +13,17 @@ snakefile_path = os.path.join(thisdir, "workflow", "Snakefile")
 
 
 def check_dependencies(
-    require_busco: bool = True, require_reference_search: bool = True
+    require_busco: bool = True,
+    require_reference_search: bool = True,
+    require_miniprot: bool = False,
 ):
     deps = ["taxonkit", "mash"]
     if require_reference_search:
         deps.extend(["find_reference_genomes", "datasets"])
     if require_busco:
         deps.append("busco")
+    if require_miniprot:
+        deps.append("miniprot")
 
     for dep in deps:
         if not shutil.which(dep):
@@ -230,6 +234,8 @@ def generate_snakemake_command(args) -> str:
 
     cmd += f"minimap2_runtime={args.minimap2_runtime * 60} "
     cmd += f"busco_runtime={args.busco_runtime * 60} "
+    cmd += f"busco_scatter={args.busco_scatter} "
+    cmd += f"aln_scatter={args.aln_scatter} "
     cmd += f"min_busco_genes={args.min_busco_genes} "
     cmd += f"alg_pvalue={args.alg_pvalue} "
     cmd += f"jcvi_min_chain_genes={args.min_chain_genes} "
@@ -254,11 +260,76 @@ def generate_snakemake_command(args) -> str:
     if args.permissive_alg:
         cmd += "jcvi_permissive_alg=True "
 
+    if args.alg_sweep_pvalues:
+        cmd += f"alg_sweep_pvalues='{args.alg_sweep_pvalues}' "
+    if args.alg_sweep_min_chain_genes:
+        cmd += f"alg_sweep_min_chain_genes='{args.alg_sweep_min_chain_genes}' "
+    if args.alg_sweep_permissive:
+        cmd += "alg_sweep_permissive=True "
+
     if getattr(args, "busco_assembly_override_path", None):
         cmd += f"busco_assembly_override='{args.busco_assembly_override_path}' "
     if getattr(args, "busco_reference_override_path", None):
         cmd += f"busco_reference_override='{args.busco_reference_override_path}' "
 
+    if args.mmi_cache_dir:
+        cmd += f"mmi_cache_dir='{args.mmi_cache_dir}' "
+        cmd += f"mmi_cache_max_gb={args.mmi_cache_max_gb} "
+
+    if args.aln_cache_dir:
+        cmd += f"aln_cache_dir='{args.aln_cache_dir}' "
+        cmd += f"aln_cache_max_sequences={args.aln_cache_max_sequences} "
+
+    if args.compress_paf:
+        cmd += "paf_store=True "
+
+    if args.anchor_dotplot:
+        cmd += "anchor_dotplot=True "
+
+    if args.aln_scatter > 1 and (args.anchor_dotplot or args.aln_cache_dir):
+        mode = "--anchor-dotplot" if args.anchor_dotplot else "--aln-cache-dir"
+        print(
+            f"Warning: {mode} replaces the scattered minimap2 alignment;"
+            " --aln-scatter is ignored.",
+            file=sys.stderr,
+        )
+
+    if args.fast_dotplot:
+        cmd += "dotplot_engine=numpy "
+
+    if args.incremental_busco:
+        cmd += "incremental_busco=True "
+        if args.busco_cache_dir:
+            cmd += f"busco_cache_dir='{args.busco_cache_dir}' "
+        cmd += f"busco_cache_max_sequences={args.busco_cache_max_sequences} "
+        if (
+            args.busco_scatter > 1
+            and args.marker_engine == "busco"
+            and not args.upgrade_quick_look
+        ):
+            print(
+                "Warning: --incremental-busco runs BUSCO on the changed assembly"
+                " sequences in a single job; --busco-scatter only applies to the"
+                " references.",
+                file=sys.stderr,
+            )
+
+    if args.prefilter_min_length:
+        cmd += f"prefilter_min_length={args.prefilter_min_length} "
+    if args.prefilter_coverage:
+        cmd += f"prefilter_coverage={args.prefilter_coverage} "
+    if args.prefilter_max_sequences:
+        cmd += f"prefilter_max_sequences={args.prefilter_max_sequences} "
+
+    if args.marker_engine == "miniprot":
+        cmd += "marker_engine=miniprot "
+
+    if args.upgrade_quick_look:
+        cmd += "busco_dataset=upgrade "
+    elif args.quick_look:
+        cmd += "busco_dataset=quick "
+        cmd += f"quick_look_markers={args.quick_look_markers} "
+
     if args.reference:
         # Pass manual references as a semicolon-separated string of paths
         # Snakemake will parse this to map IDs to paths
@@ -307,6 +378,7 @@ def main():
             # REQUIRE reference search tools ONLY if NO manual references are provided
             require_reference_search=(not args.reference)
             and (not args.stop_after_mash),
+            require_miniprot=require_busco and args.marker_engine == "miniprot",
         )
 
     if args.reference:
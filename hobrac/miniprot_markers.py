@@ -0,0 +1,378 @@
+"""Call BUSCO markers by mapping the lineage proteins with miniprot directly.
+
+In ``--miniprot`` mode most of BUSCO's wall time goes to wrapper steps whose
+outputs hobrac deletes anyway. Downstream steps (``busco_to_paf``,
+``jcvi_synteny``) only read the location of Complete markers from
+``full_table.tsv``, so this engine skips BUSCO altogether:
+
+  * the ancestral protein set of the lineage (``ancestral_variants``, or
+    ``ancestral``) is aligned to the genome with a single miniprot run;
+  * hits of the variants of a marker that overlap on the genome are collapsed
+    into one locus, keeping the best miniprot score;
+  * a locus is Complete when its aligned protein length reaches the dataset
+    length cutoff (mean - 2 sigma, as BUSCO does, from ``lengths_cutoff``),
+    has no in-frame stop codon and enough positive residues; otherwise it is
+    Fragmented. Several Complete loci make the marker Duplicated.
+
+The length cutoff is BUSCO's own rule for Complete genes, applied to the same
+``lengths_cutoff`` file, so it needs no calibration. BUSCO's ``scores_cutoff``
+holds HMMER bit scores, which miniprot scores cannot be compared to; the
+fraction of positive residues stands in for them. Its default,
+``DEFAULT_MIN_POSITIVE``, is a provisional value that has not been benchmarked
+against BUSCO runs yet. It only has to drop the weak hits of paralogs and
+distant homologs, which miniprot reports along with the orthologs. A hit below
+it makes the marker Missing rather than misplacing it, and downstream steps
+only use the markers that are Complete in both genomes. ``--min-positive``
+overrides it.
+
+The ``concordance`` subcommand compares such a table with a real BUSCO
+``full_table.tsv`` of the same genome and lineage, status by status; running
+it on a few genomes per lineage is how the threshold should be tuned.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+from hobrac.busco_subset import lineage_markers
+from hobrac.busco_table import (
+    DEFAULT_HEADER,
+    format_summary,
+    merge_tables,
+    read_full_table,
+    resolve_statuses,
+    summarize,
+    write_full_table,
+    write_short_summary,
+)
+
+# Minimum fraction of positive-scoring residues over the aligned protein
+# (provisional, see the module docstring).
+DEFAULT_MIN_POSITIVE = 0.4
+# Statuses compared one by one in the concordance report.
+STATUSES = ("Complete", "Duplicated", "Fragmented", "Missing")
+
+
+def protein_set(lineage_dir: str) -> str:
+    """Path of the protein set mapped for a lineage, preferring all variants."""
+    for name in ("ancestral_variants", "ancestral"):
+        path = os.path.join(lineage_dir, name)
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"No ancestral protein set in {lineage_dir}")
+
+
+def read_length_cutoffs(lineage_dir: str) -> Dict[str, float]:
+    """Minimum protein length of a Complete marker: mean - 2 sigma."""
+    cutoffs = {}
+    with open(os.path.join(lineage_dir, "lengths_cutoff")) as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 4:
+                continue
+            sigma = float(fields[2]) or 1.0
+            cutoffs[fields[0]] = float(fields[3]) - 2 * sigma
+    return cutoffs
+
+
+def run_miniprot(genome: str, proteins: str, paf_path: str, threads: int) -> None:
+    with open(paf_path, "w") as out:
+        subprocess.run(
+            ["miniprot", "-t", str(threads), "-I", "--outs=0.95", genome, proteins],
+            stdout=out,
+            check=True,
+        )
+
+
+def parse_paf(lines: Iterable[str]) -> List[dict]:
+    """Parse miniprot PAF lines into hit dicts keyed by marker id."""
+    hits = []
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        fields = line.rstrip("\n").split("\t")
+        if len(fields) < 12 or fields[5] == "*":
+            continue
+        tags = {}
+        for tag in fields[12:]:
+            parts = tag.split(":", 2)
+            if len(parts) == 3 and parts[1] == "i":
+                tags[parts[0]] = int(parts[2])
+        q_start, q_end = int(fields[2]), int(fields[3])
+        hits.append(
+            {
+                # Variant proteins are named <marker>_<suffix>.
+                "marker": fields[0].split("_")[0],
+                "aa_length": q_end - q_start,
+                "strand": fields[4],
+                "sequence": fields[5],
+                "start": int(fields[7]) + 1,
+                "end": int(fields[8]),
+                "score": tags.get("AS", 0),
+                "positives": tags.get("np", 0),
+                "stops": tags.get("st", 0),
+            }
+        )
+    return hits
+
+
+def _collapse_loci(hits: List[dict]) -> List[dict]:
+    """Keep the best-scoring hit among overlapping hits of one marker."""
+    loci: List[dict] = []
+    for hit in sorted(hits, key=lambda h: (-h["score"], h["sequence"], h["start"])):
+        if not any(
+            locus["sequence"] == hit["sequence"]
+            and locus["start"] <= hit["end"]
+            and hit["start"] <= locus["end"]
+            for locus in loci
+        ):
+            loci.append(hit)
+    return sorted(loci, key=lambda h: (h["sequence"], h["start"]))
+
+
+def call_markers(
+    hits: List[dict],
+    markers: List[str],
+    length_cutoffs: Dict[str, float],
+    min_positive: float = DEFAULT_MIN_POSITIVE,
+) -> List[List[str]]:
+    """Turn miniprot hits into resolved ``full_table.tsv`` rows, one per locus.
+
+    Every marker of ``markers`` gets at least a Missing row, in that order.
+    """
+    by_marker: Dict[str, List[dict]] = {}
+    for hit in hits:
+        if hit["aa_length"] <= 0:
+            continue
+        if hit["positives"] / hit["aa_length"] < min_positive:
+            continue
+        by_marker.setdefault(hit["marker"], []).append(hit)
+
+    rows = []
+    for marker in markers:
+        rows.append([marker, "Missing"])
+        loci = _collapse_loci(by_marker.get(marker, []))
+        complete = [
+            locus
+            for locus in loci
+            if locus["stops"] == 0
+            and locus["aa_length"] >= length_cutoffs.get(marker, 0)
+        ]
+        if complete:
+            called = [("Complete", locus) for locus in complete]
+        elif loci:
+            called = [("Fragmented", max(loci, key=lambda h: h["score"]))]
+        else:
+            called = []
+        for status, locus in called:
+            rows.append(
+                [
+                    marker,
+                    status,
+                    locus["sequence"],
+                    str(locus["start"]),
+                    str(locus["end"]),
+                    locus["strand"],
+                    str(locus["score"]),
+                    str(locus["aa_length"]),
+                ]
+            )
+    return resolve_statuses(rows)
+
+
+def _complete_locations(rows: List[List[str]]) -> Dict[str, Tuple[str, int, int]]:
+    """Location of every single-copy Complete marker."""
+    return {
+        row[0]: (row[2], int(row[3]), int(row[4]))
+        for row in rows
+        if row[1] == "Complete"
+    }
+
+
+def _statuses(rows: List[List[str]]) -> Dict[str, str]:
+    statuses: Dict[str, str] = {}
+    for row in rows:
+        statuses.setdefault(row[0], row[1])
+    return statuses
+
+
+def concordance(busco_rows: List[List[str]], engine_rows: List[List[str]]) -> dict:
+    """Compare engine calls with BUSCO calls of the same genome and lineage.
+
+    ``agree`` counts markers Complete in both tables at overlapping locations,
+    ``moved`` those Complete in both but elsewhere on the genome. Precision and
+    recall are those of the engine's Complete calls against BUSCO's.
+    ``status_agreement`` maps each BUSCO status to the number of markers with
+    that status in the BUSCO table and how many of them the engine gives the
+    same status.
+    """
+    busco_complete = _complete_locations(busco_rows)
+    engine_complete = _complete_locations(engine_rows)
+
+    agree = moved = 0
+    for marker, (seq, start, end) in engine_complete.items():
+        if marker not in busco_complete:
+            continue
+        b_seq, b_start, b_end = busco_complete[marker]
+        if seq == b_seq and start <= b_end and b_start <= end:
+            agree += 1
+        else:
+            moved += 1
+
+    busco_status = _statuses(busco_rows)
+    engine_status = _statuses(engine_rows)
+    confusion: Dict[Tuple[str, str], int] = {}
+    for marker in sorted(set(busco_status) | set(engine_status)):
+        key = (
+            busco_status.get(marker, "Missing"),
+            engine_status.get(marker, "Missing"),
+        )
+        confusion[key] = confusion.get(key, 0) + 1
+
+    status_agreement = {}
+    for status in STATUSES:
+        total = sum(n for (busco, _), n in confusion.items() if busco == status)
+        status_agreement[status] = (total, confusion.get((status, status), 0))
+
+    return {
+        "busco_complete": len(busco_complete),
+        "engine_complete": len(engine_complete),
+        "agree": agree,
+        "moved": moved,
+        "precision": agree / len(engine_complete) if engine_complete else 0.0,
+        "recall": agree / len(busco_complete) if busco_complete else 0.0,
+        "confusion": confusion,
+        "status_agreement": status_agreement,
+    }
+
+
+def format_concordance(result: dict) -> str:
+    lines = [
+        f"busco_complete\t{result['busco_complete']}",
+        f"engine_complete\t{result['engine_complete']}",
+        f"agree\t{result['agree']}",
+        f"moved\t{result['moved']}",
+        f"precision\t{result['precision']:.4f}",
+        f"recall\t{result['recall']:.4f}",
+        "",
+        "busco_status\tmarkers\tsame_engine_status\tagreement",
+    ]
+    for status, (total, same) in result["status_agreement"].items():
+        rate = same / total if total else 0.0
+        lines.append(f"{status}\t{total}\t{same}\t{rate:.4f}")
+    lines += ["", "busco_status\tengine_status\tcount"]
+    for (busco, engine), count in sorted(result["confusion"].items()):
+        lines.append(f"{busco}\t{engine}\t{count}")
+    return "\n".join(lines) + "\n"
+
+
+def run(
+    genome: str,
+    lineage_dir: str,
+    output_table: str,
+    threads: int = 1,
+    min_positive: float = DEFAULT_MIN_POSITIVE,
+    extra_tables: List[str] = (),
+) -> List[List[str]]:
+    """Map, call and write ``output_table`` (plus a ``short_summary.txt``).
+
+    ``extra_tables`` are merged in, e.g. the tables of a quick-look run when
+    ``lineage_dir`` holds the remaining markers only.
+    """
+    out_dir = os.path.dirname(output_table) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    paf_path = os.path.join(out_dir, "miniprot.paf")
+    run_miniprot(genome, protein_set(lineage_dir), paf_path, threads)
+
+    with open(paf_path) as f:
+        hits = parse_paf(f)
+    rows = call_markers(
+        hits,
+        lineage_markers(lineage_dir),
+        read_length_cutoffs(lineage_dir),
+        min_positive,
+    )
+    header = DEFAULT_HEADER
+    if extra_tables:
+        extra_header, extra_rows = merge_tables(list(extra_tables))
+        header = extra_header or header
+        rows = resolve_statuses(extra_rows + rows)
+    os.remove(paf_path)
+
+    write_full_table(output_table, header, rows)
+    write_short_summary(
+        os.path.join(out_dir, "short_summary.txt"),
+        rows,
+        "Markers called by hobrac from a direct miniprot mapping (no BUSCO run)",
+    )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="miniprot_markers",
+        description=(
+            "Call BUSCO lineage markers with a direct miniprot mapping, or"
+            " compare such calls with a BUSCO run."
+        ),
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser(
+        "run", help="Write a full_table.tsv-compatible table for a genome."
+    )
+    run_parser.add_argument("-i", "--genome", required=True, help="Genome FASTA")
+    run_parser.add_argument(
+        "-l", "--lineage-dir", required=True, help="BUSCO lineage dataset directory"
+    )
+    run_parser.add_argument("-o", "--out", required=True, help="Output full_table.tsv")
+    run_parser.add_argument("-t", "--threads", type=int, default=1, help="Threads")
+    run_parser.add_argument(
+        "--min-positive",
+        type=float,
+        default=DEFAULT_MIN_POSITIVE,
+        help="Minimum fraction of positive residues of a hit",
+    )
+    run_parser.add_argument(
+        "--merge-with",
+        nargs="*",
+        default=[],
+        help="Tables of other markers to merge into the output",
+    )
+
+    conc_parser = subparsers.add_parser(
+        "concordance", help="Compare an engine table with a BUSCO full_table.tsv."
+    )
+    conc_parser.add_argument("--busco", required=True, help="BUSCO full_table.tsv")
+    conc_parser.add_argument("--engine", required=True, help="Engine full_table.tsv")
+    conc_parser.add_argument(
+        "--out", default=None, help="Write the report here instead of stdout"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        rows = run(
+            args.genome,
+            args.lineage_dir,
+            args.out,
+            args.threads,
+            args.min_positive,
+            args.merge_with,
+        )
+        print(format_summary(summarize(rows)), file=sys.stderr)
+    else:
+        _, busco_rows = read_full_table(args.busco)
+        _, engine_rows = read_full_table(args.engine)
+        report = format_concordance(concordance(busco_rows, engine_rows))
+        if args.out:
+            with open(args.out, "w") as out:
+                out.write(report)
+        else:
+            sys.stdout.write(report)
+
+
+if __name__ == "__main__":
+    main()
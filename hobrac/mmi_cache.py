@@ -0,0 +1,157 @@
+"""Persistent cache of minimap2 reference indexes (``.mmi``).
+
+Every alignment job used to re-index its reference from scratch, although many
+assemblies are aligned against the same handful of popular references. An
+index only depends on the reference content (sequence names included), the
+minimap2 version and the preset, so the cache file name is a digest of these.
+
+The cache is a flat directory shared between runs. An index is built once,
+into a temporary file renamed into place, and handed to the job as a hard link
+(a copy across file systems), so a concurrent eviction never pulls an index
+from under a running alignment. Using an entry refreshes its mtime; when the
+cache outgrows its size bound, the least recently used entries are evicted.
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from typing import Callable, List
+
+from hobrac.fasta_index import sequence_digests
+
+SUFFIX = ".mmi"
+
+
+def minimap2_version() -> str:
+    result = subprocess.run(
+        ["minimap2", "--version"], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def cache_key(reference: str, version: str, preset: str) -> str:
+    """Digest of the reference content and names, minimap2 version and preset."""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"minimap2 {version}\npreset {preset}\n".encode())
+    for name, digest in sequence_digests(reference).items():
+        hasher.update(f"{name}\t{digest}\n".encode())
+    return hasher.hexdigest()
+
+
+def build_index(reference: str, index_path: str, preset: str, threads: int) -> None:
+    subprocess.run(
+        ["minimap2", "-x", preset, "-t", str(threads), "-d", index_path, reference],
+        check=True,
+    )
+
+
+def _entries(cache_dir: str) -> List[str]:
+    return [
+        os.path.join(cache_dir, name)
+        for name in os.listdir(cache_dir)
+        if name.endswith(SUFFIX)
+    ]
+
+
+def evict(cache_dir: str, max_bytes: int, keep: str = None) -> List[str]:
+    """Remove least recently used entries until the cache fits in ``max_bytes``.
+
+    ``keep`` (the entry just used) is never removed. Returns the removed paths.
+    """
+    entries = sorted(_entries(cache_dir), key=os.path.getmtime)
+    total = sum(os.path.getsize(path) for path in entries)
+    removed = []
+    for path in entries:
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        size = os.path.getsize(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Evicted concurrently by another job.
+            pass
+        total -= size
+        removed.append(path)
+    return removed
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def get_index(
+    reference: str,
+    cache_dir: str,
+    output: str,
+    preset: str = "asm20",
+    threads: int = 1,
+    max_bytes: int = 0,
+    version: str = None,
+    build: Callable[[str, str, str, int], None] = build_index,
+) -> bool:
+    """Place the index of ``reference`` at ``output``, building it on a miss.
+
+    ``max_bytes`` of 0 disables eviction. Returns True on a cache hit.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    key = cache_key(reference, version or minimap2_version(), preset)
+    entry = os.path.join(cache_dir, key + SUFFIX)
+
+    hit = os.path.isfile(entry)
+    if hit:
+        os.utime(entry)
+    else:
+        tmp_path = f"{entry}.tmp.{os.getpid()}"
+        build(reference, tmp_path, preset, threads)
+        os.replace(tmp_path, entry)
+
+    _link_or_copy(entry, output)
+    if max_bytes:
+        evict(cache_dir, max_bytes, keep=entry)
+    return hit
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="mmi_cache",
+        description="Fetch a minimap2 reference index from a shared cache.",
+    )
+    parser.add_argument("-r", "--reference", required=True, help="Reference FASTA")
+    parser.add_argument("-o", "--out", required=True, help="Output .mmi path")
+    parser.add_argument("--cache-dir", required=True, help="Shared cache directory")
+    parser.add_argument("-x", "--preset", default="asm20", help="minimap2 preset")
+    parser.add_argument("-t", "--threads", type=int, default=1, help="Threads")
+    parser.add_argument(
+        "--max-size-gb",
+        type=float,
+        default=0,
+        help="Evict least recently used indexes beyond this size (0: no bound)",
+    )
+    args = parser.parse_args()
+
+    hit = get_index(
+        args.reference,
+        args.cache_dir,
+        args.out,
+        args.preset,
+        args.threads,
+        int(args.max_size_gb * 1024**3),
+    )
+    print(
+        f"minimap2 index cache {'hit' if hit else 'miss'} for {args.reference}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
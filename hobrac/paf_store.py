@@ -0,0 +1,166 @@
+"""Block-compressed, sorted and indexed storage for genomic PAF alignments.
+
+Genome-to-genome ``aln.paf`` files are large, pile up on shared storage and
+are mostly consumed one chromosome pair at a time. A store is a BGZF file
+(``aln.paf.gz``, readable with ``zcat``) holding the PAF records sorted by
+query, target and query start, next to a ``.idx`` index with one line per
+sequence pair: the BGZF virtual offset of its first record, its record count
+and its longest alignment block, so a reader can seek straight to one pair and
+skip pairs whose alignments are all too short.
+
+Packing takes two passes over the plain PAF to keep memory low: the first one
+only collects sort keys and file offsets, the second copies the records in
+sorted order. ``iter_records`` streams records back, optionally restricted to a
+query, a target and a minimum alignment block length (PAF column 11), and
+``paf_store view`` writes them out as plain PAF for external viewers.
+"""
+
+import argparse
+import os
+import sys
+from typing import Iterator, List, NamedTuple
+
+from Bio import bgzf
+
+INDEX_SUFFIX = ".idx"
+
+
+class PairEntry(NamedTuple):
+    query: str
+    target: str
+    offset: int
+    records: int
+    max_length: int
+
+
+def index_path(store_path: str) -> str:
+    return store_path + INDEX_SUFFIX
+
+
+def pack(paf_path: str, store_path: str) -> List[PairEntry]:
+    """Write the sorted store of ``paf_path`` and its pair index."""
+    keys = []
+    with open(paf_path, "rb") as f:
+        offset = 0
+        for line in f:
+            fields = line.split(b"\t", 12)
+            if len(fields) >= 12:
+                keys.append(
+                    (fields[0], fields[5], int(fields[2]), int(fields[7]), offset)
+                )
+            offset += len(line)
+    keys.sort()
+
+    entries: List[PairEntry] = []
+    with open(paf_path, "rb") as src, bgzf.BgzfWriter(store_path, "wb") as out:
+        for query, target, _, _, offset in keys:
+            src.seek(offset)
+            line = src.readline()
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            length = int(line.split(b"\t", 11)[10])
+            last = entries[-1] if entries else None
+            if last and (last.query, last.target) == (query.decode(), target.decode()):
+                entries[-1] = last._replace(
+                    records=last.records + 1, max_length=max(last.max_length, length)
+                )
+            else:
+                entries.append(
+                    PairEntry(query.decode(), target.decode(), out.tell(), 1, length)
+                )
+            out.write(line)
+
+    with open(index_path(store_path), "w") as idx:
+        print("query\ttarget\toffset\trecords\tmax_length", file=idx)
+        for entry in entries:
+            print("\t".join(str(value) for value in entry), file=idx)
+    return entries
+
+
+def read_index(store_path: str) -> List[PairEntry]:
+    entries = []
+    with open(index_path(store_path)) as f:
+        next(f, None)
+        for line in f:
+            query, target, offset, records, max_length = line.rstrip("\n").split("\t")
+            entries.append(
+                PairEntry(query, target, int(offset), int(records), int(max_length))
+            )
+    return entries
+
+
+def iter_records(
+    store_path: str, query: str = None, target: str = None, min_length: int = 0
+) -> Iterator[str]:
+    """Yield the PAF lines of the store matching every given criterion.
+
+    Pairs are visited in store order and only the selected ones are read.
+    """
+    entries = [
+        entry
+        for entry in read_index(store_path)
+        if (query is None or entry.query == query)
+        and (target is None or entry.target == target)
+        and entry.max_length >= min_length
+    ]
+    if not entries:
+        return
+    with bgzf.BgzfReader(store_path, "rt") as reader:
+        for entry in entries:
+            reader.seek(entry.offset)
+            for _ in range(entry.records):
+                line = reader.readline()
+                if int(line.split("\t", 11)[10]) >= min_length:
+                    yield line
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="paf_store",
+        description="Pack PAF alignments into a sorted, indexed BGZF store or view it.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = subparsers.add_parser("pack", help="Build a store from a PAF file.")
+    pack_parser.add_argument("-i", "--input", required=True, help="Plain PAF file")
+    pack_parser.add_argument("-o", "--out", required=True, help="Output store (.gz)")
+    pack_parser.add_argument(
+        "--remove-input", action="store_true", help="Delete the plain PAF afterwards"
+    )
+
+    view_parser = subparsers.add_parser("view", help="Write records as plain PAF.")
+    view_parser.add_argument("store", help="PAF store (.gz with its .idx)")
+    view_parser.add_argument("--query", default=None, help="Only this query sequence")
+    view_parser.add_argument("--target", default=None, help="Only this target sequence")
+    view_parser.add_argument(
+        "--min-length", type=int, default=0, help="Minimum alignment block length"
+    )
+    view_parser.add_argument(
+        "-o", "--out", default=None, help="Output PAF (default: stdout)"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        entries = pack(args.input, args.out)
+        print(
+            f"Packed {sum(e.records for e in entries)} records"
+            f" over {len(entries)} sequence pairs into {args.out}",
+            file=sys.stderr,
+        )
+        if args.remove_input:
+            os.remove(args.input)
+    else:
+        out = open(args.out, "w") if args.out else sys.stdout
+        try:
+            for line in iter_records(
+                args.store, args.query, args.target, args.min_length
+            ):
+                out.write(line)
+        finally:
+            if args.out:
+                out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Keep the chromosome-scale sequences of a draft assembly.
+
+Draft assemblies can hold hundreds of thousands of tiny contigs that slow BUSCO
+and minimap2 down, bloat ``aln.paf`` and are dropped later anyway (by the
+``--min-busco-genes`` filter and ``dotplotrs -m``). This step writes the subset
+of sequences worth aligning, chosen on the lengths of the FASTA index:
+
+  * ``min_length``: sequences shorter than this are excluded;
+  * ``coverage``: only the longest sequences needed to cover this percentage
+    of the assembly bases are kept, optionally capped at ``max_sequences``.
+
+Both criteria can be combined. Every excluded sequence is listed with its
+length and the reason it was excluded, so the reports stay honest about what
+the alignments cover.
+"""
+
+import argparse
+import sys
+from typing import Dict, List, Tuple
+
+from hobrac.fasta_index import fasta_lengths, write_subset
+
+
+def select_sequences(
+    lengths: Dict[str, int],
+    min_length: int = 0,
+    coverage: float = 0,
+    max_sequences: int = 0,
+) -> Tuple[List[str], Dict[str, str]]:
+    """Return the kept names (in file order) and ``{excluded_name: reason}``.
+
+    The longest sequence is always kept, so the subset is never empty.
+    """
+    by_length = sorted(lengths, key=lambda name: (-lengths[name], name))
+    excluded: Dict[str, str] = {}
+
+    if coverage > 0 or max_sequences > 0:
+        target = sum(lengths.values()) * min(coverage or 100, 100) / 100
+        covered = 0
+        for rank, name in enumerate(by_length):
+            if covered >= target or (max_sequences and rank >= max_sequences):
+                excluded[name] = "coverage"
+            covered += lengths[name]
+
+    for name in by_length[1:]:
+        if lengths[name] < min_length:
+            excluded.setdefault(name, "min_length")
+
+    kept = [name for name in lengths if name not in excluded]
+    return kept, excluded
+
+
+def write_excluded(
+    path: str, lengths: Dict[str, int], kept: List[str], excluded: Dict[str, str]
+) -> None:
+    """Write the excluded sequences after a ``#`` summary of what was kept."""
+    total = sum(lengths.values()) or 1
+    kept_bp = sum(lengths[name] for name in kept)
+    with open(path, "w") as out:
+        print(
+            f"# kept {len(kept)} sequences ({kept_bp} bp,"
+            f" {100 * kept_bp / total:.2f}% of bases);"
+            f" excluded {len(excluded)} sequences ({total - kept_bp} bp)",
+            file=out,
+        )
+        print("sequence\tlength\treason", file=out)
+        for name in lengths:
+            if name in excluded:
+                print(f"{name}\t{lengths[name]}\t{excluded[name]}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="prefilter_fasta",
+        description="Keep the chromosome-scale sequences of an assembly.",
+    )
+    parser.add_argument("-i", "--input", required=True, help="Input FASTA")
+    parser.add_argument("-o", "--output", required=True, help="Output FASTA")
+    parser.add_argument(
+        "--excluded", required=True, help="Output TSV of the excluded sequences"
+    )
+    parser.add_argument(
+        "--min-length", type=int, default=0, help="Minimum sequence length (bp)"
+    )
+    parser.add_argument(
+        "--coverage",
+        type=float,
+        default=0,
+        help="Keep the longest sequences covering this percentage of bases",
+    )
+    parser.add_argument(
+        "--max-sequences",
+        type=int,
+        default=0,
+        help="Keep at most this many (longest) sequences",
+    )
+    args = parser.parse_args()
+
+    lengths = fasta_lengths(args.input)
+    kept, excluded = select_sequences(
+        lengths, args.min_length, args.coverage, args.max_sequences
+    )
+    write_subset(args.input, args.output, kept)
+    write_excluded(args.excluded, lengths, kept, excluded)
+    print(
+        f"Prefilter: kept {len(kept)} of {len(lengths)} sequences,"
+        f" excluded {len(excluded)} (see {args.excluded}).",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
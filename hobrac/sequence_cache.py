@@ -0,0 +1,154 @@
+"""Per-sequence result caches shared by the incremental pipeline steps.
+
+BUSCO hits and minimap2 alignments are both local to the assembly sequence they
+come from, so the results of a sequence whose residues did not change since
+the previous run can be reused as-is (under its new name, if it was renamed).
+``busco_incremental`` and ``aln_cache`` keep such results in a cache keyed by
+the content digest of the sequence (see ``fasta_index.sequence_digests``), one
+TSV row per result, and run in two steps around the tool:
+
+  * ``plan`` hashes the assembly, writes the new/changed sequences to a FASTA
+    for the tool and records, per sequence, whether its results come from the
+    cache, along with the cache file the plan was made against;
+  * the ``merge`` of each module joins the cached results with those of the
+    fresh run and adds the entries of the current assembly to the cache.
+
+A cache directory can be shared by several runs, even concurrent ones: updates
+keep the entries of other assemblies and are serialised with a lock file. The
+entries are kept in least to most recently used order, and the oldest ones are
+evicted once the cache holds more than a bounded number of sequences. A merge
+whose planned cache entries were evicted in the meantime fails rather than
+losing the results of these sequences.
+"""
+
+import fcntl
+import os
+from typing import Dict, List, Tuple
+
+from hobrac.fasta_index import sequence_digests, write_subset
+
+# First line of a plan: the cache file it was made against.
+PLAN_CACHE_PREFIX = "#cache\t"
+# Sequences kept per cache file before the least recently used are evicted.
+DEFAULT_MAX_SEQUENCES = 100_000
+
+
+def read_cache(path: str) -> Tuple[List[str], Dict[str, List[List[str]]]]:
+    """Return the cached header lines and the result rows keyed by digest.
+
+    Every processed digest is a key, possibly with no rows (a sequence without
+    any result). A missing cache reads as empty.
+    """
+    header: List[str] = []
+    rows_by_digest: Dict[str, List[List[str]]] = {}
+    if not os.path.isfile(path):
+        return header, rows_by_digest
+
+    with open(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                header.append(line)
+                continue
+            fields = line.rstrip("\n").split("\t")
+            rows = rows_by_digest.setdefault(fields[0], [])
+            if len(fields) > 1:
+                rows.append(fields[1:])
+    return header, rows_by_digest
+
+
+def write_cache(
+    path: str, header: List[str], rows_by_digest: Dict[str, List[List[str]]]
+) -> None:
+    """Atomically replace the cache at ``path``."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        for line in header:
+            f.write(line)
+        for digest, rows in rows_by_digest.items():
+            if not rows:
+                f.write(f"{digest}\n")
+            for row in rows:
+                f.write(digest + "\t" + "\t".join(row) + "\n")
+    os.replace(tmp_path, path)
+
+
+def update_cache(
+    path: str,
+    header: List[str],
+    rows_by_digest: Dict[str, List[List[str]]],
+    max_sequences: int = DEFAULT_MAX_SEQUENCES,
+) -> int:
+    """Add entries to the cache at ``path``, keeping those of other runs.
+
+    The given entries become the most recently used ones; the least recently
+    used entries beyond ``max_sequences`` (0 for no bound) are evicted. An
+    empty ``header`` keeps the cached one. Returns the number of evicted
+    entries.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        cached_header, entries = read_cache(path)
+        for digest in rows_by_digest:
+            entries.pop(digest, None)
+        entries.update(rows_by_digest)
+
+        evicted = 0
+        if max_sequences > 0 and len(entries) > max_sequences:
+            evicted = len(entries) - max_sequences
+            entries = dict(list(entries.items())[evicted:])
+        write_cache(path, header or cached_header, entries)
+    return evicted
+
+
+def cached_rows(
+    cached: Dict[str, List[List[str]]], name: str, digest: str, cache_file: str
+) -> List[List[str]]:
+    """The cached rows of a sequence that the plan marked as cached."""
+    if digest not in cached:
+        raise ValueError(
+            f"The plan reuses the cached results of {name}, but they were evicted"
+            f" from {cache_file} since; plan the run again"
+        )
+    return cached[digest]
+
+
+def plan(
+    assembly: str, cache_file: str, changed_fasta: str, plan_file: str
+) -> Tuple[int, int]:
+    """Split the assembly into cached and new/changed sequences.
+
+    Returns ``(reused, changed)`` sequence counts.
+    """
+    _, cached = read_cache(cache_file)
+    digests = sequence_digests(assembly)
+
+    changed = [name for name, digest in digests.items() if digest not in cached]
+    write_subset(assembly, changed_fasta, changed)
+
+    changed_set = set(changed)
+    with open(plan_file, "w") as out:
+        print(f"{PLAN_CACHE_PREFIX}{cache_file}", file=out)
+        print("sequence\tdigest\tsource", file=out)
+        for name, digest in digests.items():
+            source = "new" if name in changed_set else "cached"
+            print(f"{name}\t{digest}\t{source}", file=out)
+
+    return len(digests) - len(changed), len(changed)
+
+
+def plan_cache_file(path: str) -> str:
+    """The cache file a plan written by ``plan`` was made against."""
+    with open(path) as f:
+        first = f.readline().rstrip("\n")
+    if not first.startswith(PLAN_CACHE_PREFIX):
+        raise ValueError(f"{path} does not name its cache file")
+    return first[len(PLAN_CACHE_PREFIX) :]
+
+
+def read_plan(path: str) -> List[Tuple[str, str, str]]:
+    """Read the ``sequence<TAB>digest<TAB>source`` rows written by ``plan``."""
+    with open(path) as f:
+        lines = [line for line in f if not line.startswith("#")]
+    return [tuple(line.rstrip("\n").split("\t")) for line in lines[1:] if line.strip()]
@@ -0,0 +1,64 @@
+"""Split a FASTA into size-balanced chunks of whole sequences.
+
+Used by the scatter modes of the pipeline: each chunk becomes its own cluster
+job and the partial results are gathered afterwards. Chunks are balanced on the
+sequence lengths read from the FASTA index (see ``fasta_index.fasta_lengths``)
+and sequences are never cut, so per-sequence results need no coordinate lifting.
+Exactly ``--chunks`` files are always written, some of them possibly empty, so
+the workflow can declare the outputs before the split runs.
+"""
+
+import argparse
+import os
+import sys
+
+from hobrac.fasta_index import balanced_chunks, fasta_lengths, write_chunks
+
+
+def chunk_path(output_dir: str, index: int) -> str:
+    return os.path.join(output_dir, f"chunk_{index}.fna")
+
+
+def split_fasta(fasta_path: str, n_chunks: int, output_dir: str):
+    """Write ``n_chunks`` FASTA chunks and a ``chunks.tsv`` manifest."""
+    os.makedirs(output_dir, exist_ok=True)
+    lengths = fasta_lengths(fasta_path)
+    chunks = balanced_chunks(lengths, n_chunks)
+    write_chunks(
+        fasta_path, chunks, [chunk_path(output_dir, i) for i in range(len(chunks))]
+    )
+
+    with open(os.path.join(output_dir, "chunks.tsv"), "w") as out:
+        print("chunk\tsequence\tlength", file=out)
+        for i, names in enumerate(chunks):
+            for name in names:
+                print(f"{i}\t{name}\t{lengths[name]}", file=out)
+
+    return chunks, lengths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="split_fasta",
+        description="Split a FASTA into size-balanced chunks of whole sequences.",
+    )
+    parser.add_argument("-i", "--input", required=True, help="Input FASTA")
+    parser.add_argument(
+        "-n", "--chunks", required=True, type=int, help="Number of chunks"
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        required=True,
+        help="Output directory for chunk_<i>.fna files and chunks.tsv",
+    )
+    args = parser.parse_args()
+
+    chunks, lengths = split_fasta(args.input, args.chunks, args.output_dir)
+    for i, names in enumerate(chunks):
+        size = sum(lengths[name] for name in names)
+        print(f"chunk_{i}: {len(names)} sequences, {size} bp", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,301 @@
 import os
 
 
-rule aln:
-    input:
-        reference=ancient("reference/{accession}.fna"),
-        assembly=config["assembly"],
-    output:
-        "aln/vs_{accession}/aln.paf",
-    benchmark:
-        "benchmarks/aln_{accession}.txt"
-    container:
-        HOBRAC_TOOLS
-    threads: 12
-    resources:
-        mem_mb=config["minimap2_memory"],
-        runtime=config["minimap2_runtime"],
-    shell:
+# Anchor mode (--anchor-dotplot): minimap2 is replaced by an alignment-free
+# sketch of both genomes whose shared minimizers are chained into coarse
+# collinear segments (see hobrac/anchor_paf.py), written as PAF for the dotplots.
+ANCHOR_DOTPLOT = config.get("anchor_dotplot", False)
+
+
+# Alignment cache (--aln-cache-dir): PAF records are cached per query sequence,
+# keyed by its content digest, for each reference / minimap2 version / preset;
+# only new or changed assembly sequences are aligned again.
+ALN_CACHE = config.get("aln_cache_dir", "")
+
+
+# Scatter mode (--aln-scatter N): the reference is indexed once, the assembly is
+# split into N size-balanced chunks of whole sequences and each chunk is aligned
+# against the shared index as its own job. minimap2 aligns every query sequence
+# independently, so concatenating the partial PAFs gives the same alignments.
+# Anchor mode and the alignment cache take precedence: scatter mode is off
+# with either of them (hobrac warns about it).
+ALN_SCATTER = (
+    0 if ANCHOR_DOTPLOT or ALN_CACHE else int(config.get("aln_scatter", 0))
+)
+
+# PAF store (--compress-paf): the plain aln.paf only lives until it is packed
+# into a sorted, block-compressed aln.paf.gz with a per-pair index (see
+# hobrac/paf_store.py); `paf_store view` gives plain PAF back on demand.
+PAF_STORE = config.get("paf_store", False)
+ALN_PAF = (
+    temp("aln/vs_{accession}/aln.paf") if PAF_STORE else "aln/vs_{accession}/aln.paf"
+)
+
+
+# Index cache (--mmi-cache-dir): reference indexes are kept in a shared
+# directory keyed by reference content, minimap2 version and preset, so most
+# alignment jobs skip the indexing phase.
+MMI_CACHE = config.get("mmi_cache_dir", "")
+
+# Dotplot engine (--fast-dotplot): "numpy" draws both dotplots from one binned
+# density raster of the PAF (see hobrac/density_dotplot.py) instead of two
+# dotplotrs runs; it reads aln.paf.gz directly and dumps no significance table.
+DOTPLOT_ENGINE = config.get("dotplot_engine", "dotplotrs")
+
+
+if MMI_CACHE:
+
+    rule minimap2_index:
+        input:
+            reference=ancient("reference/{accession}.fna"),
+        output:
+            temp("aln/index/{accession}.mmi"),
+        benchmark:
+            "benchmarks/minimap2_index_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        threads: 4
+        resources:
+            mem_mb=config["minimap2_memory"],
+            runtime=config["minimap2_runtime"],
+        params:
+            cache_dir=MMI_CACHE,
+            max_size_gb=config.get("mmi_cache_max_gb", 0),
+        shell:
+            """
+            mmi_cache -r {input.reference} -o {output} -x asm20 -t {threads} \
+                --cache-dir {params.cache_dir} --max-size-gb {params.max_size_gb}
+        """
+
+elif ALN_SCATTER > 1:
+
+    rule minimap2_index:
+        input:
+            reference=ancient("reference/{accession}.fna"),
+        output:
+            temp("aln/index/{accession}.mmi"),
+        benchmark:
+            "benchmarks/minimap2_index_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        threads: 4
+        resources:
+            mem_mb=config["minimap2_memory"],
+            runtime=config["minimap2_runtime"],
+        shell:
+            """
+            minimap2 -x asm20 -t {threads} -d {output} {input.reference}
+        """
+
+
+if ANCHOR_DOTPLOT:
+
+    rule aln:
+        input:
+            reference=ancient("reference/{accession}.fna"),
+            assembly=ASSEMBLY,
+        output:
+            ALN_PAF,
+        benchmark:
+            "benchmarks/aln_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=config["minimap2_memory"],
+            runtime=config["minimap2_runtime"],
+        shell:
+            """
+            anchor_paf -q {input.assembly} -r {input.reference} -o {output}
+        """
+
+elif ALN_CACHE:
+
+    rule aln:
+        input:
+            reference=ancient("reference/{accession}.fna"),
+            assembly=ASSEMBLY,
+            index=["aln/index/{accession}.mmi"] if MMI_CACHE else [],
+        output:
+            paf=ALN_PAF,
+            stats="aln/vs_{accession}/aln_cache_stats.tsv",
+        benchmark:
+            "benchmarks/aln_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        threads: 12
+        resources:
+            mem_mb=config["minimap2_memory"],
+            runtime=config["minimap2_runtime"],
+        params:
+            cache_dir=ALN_CACHE,
+            max_sequences=config.get("aln_cache_max_sequences", 100000),
+            target=lambda wildcards, input: (
+                input.index[0] if MMI_CACHE else input.reference
+            ),
+        shell:
+            """
+            workdir=aln/vs_{wildcards.accession}/tmp_aln_cache
+            rm -rf $workdir
+            mkdir -p $workdir
+
+            aln_cache plan --assembly {input.assembly} \
+                --cache-dir {params.cache_dir} --reference {input.reference} -x asm20 \
+                --changed-fasta $workdir/changed.fna --plan $workdir/plan.tsv
+
+            if [ -s $workdir/changed.fna ]; then
+                minimap2 -x asm20 -t {threads} {params.target} $workdir/changed.fna \
+                    > $workdir/changed.paf
+            fi
+
+            aln_cache merge --plan $workdir/plan.tsv --assembly {input.assembly} \
+                --new-paf $workdir/changed.paf --out {output.paf} --stats {output.stats} \
+                --max-sequences {params.max_sequences}
+
+            rm -rf $workdir
+        """
+
+elif ALN_SCATTER > 1:
+
+    rule split_for_aln:
+        input:
+            ASSEMBLY,
+        output:
+            chunks=temp(
+                expand("aln/scatter/query/chunk_{chunk}.fna", chunk=range(ALN_SCATTER))
+            ),
+            manifest="aln/scatter/query/chunks.tsv",
+        benchmark:
+            "benchmarks/split_for_aln.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=60,
+        params:
+            chunks=ALN_SCATTER,
+        shell:
+            """
+            split_fasta -i {input} -n {params.chunks} -o aln/scatter/query
+        """
+
+    rule aln_chunk:
+        input:
+            index="aln/index/{accession}.mmi",
+            chunk="aln/scatter/query/chunk_{chunk}.fna",
+        output:
+            temp("aln/scatter/vs_{accession}/aln_{chunk}.paf"),
+        wildcard_constraints:
+            chunk=r"\d+",
+        benchmark:
+            "benchmarks/aln_{accession}_chunk_{chunk}.txt"
+        container:
+            HOBRAC_TOOLS
+        threads: 12
+        resources:
+            mem_mb=config["minimap2_memory"],
+            runtime=config["minimap2_runtime"],
+        shell:
+            """
+            # An assembly with fewer sequences than chunks leaves some chunks empty.
+            if [ ! -s {input.chunk} ]; then
+                touch {output}
+                exit 0
+            fi
+            minimap2 -x asm20 -t {threads} {input.index} {input.chunk} > {output}
+        """
+
+    rule aln:
+        input:
+            lambda wildcards: expand(
+                "aln/scatter/vs_{accession}/aln_{chunk}.paf",
+                accession=wildcards.accession,
+                chunk=range(ALN_SCATTER),
+            ),
+        output:
+            ALN_PAF,
+        benchmark:
+            "benchmarks/aln_{accession}.txt"
+        resources:
+            mem_mb=1000,
+            runtime=30,
+        shell:
+            """
+            cat {input} > {output}
+        """
+
+elif MMI_CACHE:
+
+    rule aln:
+        input:
+            index="aln/index/{accession}.mmi",
+            assembly=ASSEMBLY,
+        output:
+            ALN_PAF,
+        benchmark:
+            "benchmarks/aln_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        threads: 12
+        resources:
+            mem_mb=config["minimap2_memory"],
+            runtime=config["minimap2_runtime"],
+        shell:
+            """
+            minimap2 -x asm20 -t {threads} {input.index} {input.assembly} > {output}
+        """
+
+else:
+
+    rule aln:
+        input:
+            reference=ancient("reference/{accession}.fna"),
+            assembly=ASSEMBLY,
+        output:
+            ALN_PAF,
+        benchmark:
+            "benchmarks/aln_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        threads: 12
+        resources:
+            mem_mb=config["minimap2_memory"],
+            runtime=config["minimap2_runtime"],
+        shell:
+            """
+            minimap2 -x asm20 -t {threads} {input.reference} {input.assembly} > {output}
+        """
+
+
+if PAF_STORE:
+
+    rule pack_paf:
+        input:
+            "aln/vs_{accession}/aln.paf",
+        output:
+            store="aln/vs_{accession}/aln.paf.gz",
+            index="aln/vs_{accession}/aln.paf.gz.idx",
+        benchmark:
+            "benchmarks/pack_paf_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=10000,
+            runtime=60,
+        shell:
+            """
+            paf_store pack -i {input} -o {output.store}
         """
-        minimap2 -x asm20 -t {threads} {input.reference} {input.assembly} > {output}
-    """
 
 
 rule gen_dgenies_index:
     input:
-        aln="aln/vs_{accession}/aln.paf",
+        aln=(
+            "aln/vs_{accession}/aln.paf.gz"
+            if PAF_STORE
+            else "aln/vs_{accession}/aln.paf"
+        ),
         reference=ancient("reference/{accession}.fna"),
-        assembly=config["assembly"],
+        assembly=ASSEMBLY,
     output:
         touch("aln/vs_{accession}/dgenies.done"),
     log:
@@ -35,7 +305,7 @@ rule gen_dgenies_index:
     container:
         HOBRAC_TOOLS
     resources:
-        mem_mb=50000,
+        mem_mb=10000 if DOTPLOT_ENGINE == "numpy" else 50000,
         runtime=60,
     params:
         name=config["scientific_name"],
@@ -50,6 +320,9 @@ rule gen_dgenies_index:
             if os.path.isabs(input.reference)
             else f"../../{input.reference}"
         ),
+        paf_store=PAF_STORE,
+        engine=DOTPLOT_ENGINE,
+        aln_name=lambda wildcards, input: os.path.basename(input.aln),
     shell:
         """
         cd aln/vs_{wildcards.accession}
@@ -57,8 +330,26 @@ rule gen_dgenies_index:
         dgenies_fasta_to_index -i {params.assembly_path} -n "{params.name}" -o "query_{params.assembly_prefix}.idx"
         dgenies_fasta_to_index -i {params.reference_path} -n "{wildcards.accession}" -o target_{wildcards.accession}.idx
 
-        dotplotrs -m 2000 -p aln.paf -o dotplot.png --line-thickness 4 --dump-significance significance_results.txt
-        dotplotrs -m 2000 -p aln.paf -o dotplot_bw.png --line-thickness 4 --no-color
+        if [ "{params.engine}" = "numpy" ]; then
+            density_dotplot -m 2000 -p {params.aln_name} -q {params.assembly_path} -r {params.reference_path} -o dotplot.png --bw dotplot_bw.png --query-name "{params.name}" --reference-name "{wildcards.accession}"
+            exit 0
+        fi
+
+        # dotplotrs reads plain PAF. From a store, only the records that pass
+        # its -m 2000 filter are unpacked: the pair index skips every sequence
+        # pair without a block that long, so the view stays small.
+        paf=aln.paf
+        if [ "{params.paf_store}" = "True" ]; then
+            paf=aln.view.paf
+            paf_store view aln.paf.gz --min-length 2000 -o $paf
+        fi
+
+        dotplotrs -m 2000 -p $paf -o dotplot.png --line-thickness 4 --dump-significance significance_results.txt
+        dotplotrs -m 2000 -p $paf -o dotplot_bw.png --line-thickness 4 --no-color
+
+        if [ "$paf" = aln.view.paf ]; then
+            rm -f $paf
+        fi
     """
 
 
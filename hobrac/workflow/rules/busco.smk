@@ -97,98 +97,555 @@ rule download_busco_dataset:
     """
 
 
-rule busco_reference:
-    input:
-        # ancient(): manual references (-r) are rewritten by main.py on every
-        # invocation, bumping the .fna mtime and otherwise re-triggering BUSCO
-        # (and a fresh busco_downloads re-download) even when content is
-        # unchanged. Ignoring mtime here keeps cached BUSCO results valid. Trade-
-        # off: replacing a reference in place no longer auto-reruns BUSCO; delete
-        # busco/busco_reference_{accession} to force it.
-        fna=ancient("reference/{accession}.fna"),
-        dataset="busco/chosen_dataset.txt",
-        busco_db="busco/busco_downloads",
-    output:
-        directory("busco/busco_reference_{accession}"),
-    benchmark:
-        "benchmarks/busco_reference_{accession}.txt"
-    container:
-        "docker://ezlabgva/busco:v6.1.0_cv1"
-    threads: 12
-    resources:
-        mem_mb=config["busco_memory"],
-        runtime=config["busco_runtime"],
-    params:
-        method=config["busco_method"],
-        fna_path=lambda wildcards, input: (
-            input.fna if os.path.isabs(input.fna) else f"../../{input.fna}"
-        ),
-    shell:
+# Quick-look mode (--quick-look): BUSCO runs against a reduced, ALG-balanced
+# subset of the lineage markers written to busco/subset_downloads, and every
+# BUSCO table is saved under busco/quick_look so that a later --upgrade-quick-look
+# run only searches the remaining markers and merges them with the saved hits.
+# The upgrade goes through the scatter/gather rules below (with a single chunk
+# unless --busco-scatter asks for more), as their gather step merges tables.
+BUSCO_DATASET = config.get("busco_dataset", "full")
+BUSCO_UPGRADE = BUSCO_DATASET == "upgrade"
+# Direct miniprot engine (--marker-engine miniprot): markers are called from a
+# miniprot mapping of the lineage proteins instead of a BUSCO run. It replaces
+# the scatter and incremental modes, and merges upgraded quick looks itself.
+MINIPROT_ENGINE = config.get("marker_engine", "busco") == "miniprot"
+BUSCO_DB = "busco/busco_downloads" if BUSCO_DATASET == "full" else "busco/subset_downloads"
+# Parsed BUSCO tables (see hobrac/busco_columns.py) are cached in a directory of
+# their own, shared by busco_to_paf and jcvi_synteny. The tables themselves are
+# never written next to: their directories are BUSCO rule outputs or user data.
+BUSCO_COLUMNS_CACHE = config.get("busco_columns_cache", "busco/columns_cache")
+
+
+def get_quick_look_tables(wildcards):
+    """Saved quick-look BUSCO tables of the assembly and every reference."""
+    checkpoint_output = checkpoints.select_references.get(**wildcards).output[0]
+    accessions = []
+    with open(checkpoint_output) as f:
+        for line in f:
+            if line.strip():
+                accessions.append(line.strip())
+    return ["busco/quick_look/assembly.tsv"] + expand(
+        "busco/quick_look/reference_{accession}.tsv", accession=accessions
+    )
+
+
+def busco_download_path(wildcards, input):
+    """Absolute BUSCO download directory, valid from any working directory."""
+    return os.path.abspath(input.busco_db)
+
+
+if BUSCO_DATASET == "quick":
+
+    rule subset_busco_dataset:
+        input:
+            dataset="busco/chosen_dataset.txt",
+            busco_db="busco/busco_downloads",
+        output:
+            subset=directory(BUSCO_DB),
+            markers="busco/quick_look/markers.txt",
+        benchmark:
+            "benchmarks/subset_busco_dataset.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=30,
+        params:
+            markers=config.get("quick_look_markers", 250),
+        shell:
+            """
+            lineage=$(cat {input.dataset} | cut -f 2)
+            busco_subset --download-dir {input.busco_db} --lineage $lineage \
+                --markers {params.markers} --selected-out {output.markers} \
+                --out-dir {output.subset}
         """
-        dataset=$(cat {input.dataset} | cut -f 1)
 
-        # Run in an isolated working directory so concurrent BUSCO jobs don't
-        # clobber each other's logs in the shared busco/ folder.
-        workdir=busco/tmp_busco_reference_{wildcards.accession}
-        rm -rf $workdir
-        mkdir -p $workdir
-        cd $workdir
+    rule keep_quick_look_table:
+        input:
+            "busco/busco_{target}",
+        output:
+            "busco/quick_look/{target}.tsv",
+        wildcard_constraints:
+            target=r"assembly|reference_[^/]+",
+        resources:
+            mem_mb=1000,
+            runtime=5,
+        run:
+            import glob
+            import shutil
 
-        busco --skip_bbtools --{params.method} -i {params.fna_path} -c {threads} -m geno \
-            -o busco_reference_{wildcards.accession} -l $dataset \
-            --offline --download_path ../busco_downloads --datasets_version odb12
+            shutil.copyfile(glob.glob(f"{input[0]}/run*/full_table.tsv")[0], output[0])
 
-        rm -rf busco_reference_{wildcards.accession}/run*/{{busco_sequences,hmmer_output,metaeuk_output,miniprot_output}}
+    rule quick_look_notice:
+        input:
+            tables=get_quick_look_tables,
+            markers="busco/quick_look/markers.txt",
+        output:
+            "synteny_plots/QUICK_LOOK_PRELIMINARY.txt",
+        resources:
+            mem_mb=1000,
+            runtime=5,
+        run:
+            from hobrac.busco_table import format_summary, read_full_table, summarize
 
-        cd ..
-        rm -rf busco_reference_{wildcards.accession}
-        mv tmp_busco_reference_{wildcards.accession}/busco_reference_{wildcards.accession} busco_reference_{wildcards.accession}
-        rm -rf tmp_busco_reference_{wildcards.accession}
-    """
+            with open(input.markers) as f:
+                n_markers = sum(1 for line in f if line.strip())
+            with open(output[0], "w") as out:
+                print(
+                    "PRELIMINARY: quick-look run. BUSCO searched a reduced subset of"
+                    f" {n_markers} lineage markers, balanced across ALGs; the"
+                    " karyotype and dotplots in this directory are a first look"
+                    " only. Re-run with --upgrade-quick-look to complete the"
+                    " BUSCO tables with the remaining markers.",
+                    file=out,
+                )
+                print("", file=out)
+                for table in input.tables:
+                    name = os.path.basename(table)[: -len(".tsv")]
+                    _, rows = read_full_table(table)
+                    print(f"{name}\t{format_summary(summarize(rows))}", file=out)
 
+elif BUSCO_UPGRADE:
 
-rule busco_assembly:
-    input:
-        assembly=config["assembly"],
-        dataset=rules.get_closest_busco_dataset.output,
-        busco_db="busco/busco_downloads",
-    output:
-        directory("busco/busco_assembly"),
-    benchmark:
-        "benchmarks/busco_assembly.txt"
-    container:
-        "docker://ezlabgva/busco:v6.1.0_cv1"
-    threads: 12
-    resources:
-        mem_mb=config["busco_memory"],
-        runtime=config["busco_runtime"],
-    params:
-        method=config["busco_method"],
-        assembly_path=lambda wildcards, input: (
-            input.assembly if os.path.isabs(input.assembly) else f"../../{input.assembly}"
-        ),
-    shell:
+    rule subset_busco_dataset:
+        input:
+            dataset="busco/chosen_dataset.txt",
+            busco_db="busco/busco_downloads",
+            markers="busco/quick_look/markers.txt",
+        output:
+            subset=directory(BUSCO_DB),
+            # The merged tables replace the quick-look ones. Declaring the
+            # notice of the quick look as a temporary output lets Snakemake
+            # remove it: stale outputs are deleted before the job runs, and
+            # the placeholder written here once the job is done.
+            notice=temp("synteny_plots/QUICK_LOOK_PRELIMINARY.txt"),
+        benchmark:
+            "benchmarks/subset_busco_dataset.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=30,
+        shell:
+            """
+            lineage=$(cat {input.dataset} | cut -f 2)
+            busco_subset --download-dir {input.busco_db} --lineage $lineage \
+                --complement-of {input.markers} --out-dir {output.subset}
+            touch {output.notice}
         """
-        dataset=$(cat {input.dataset} | cut -f 1)
 
-        # Run in an isolated working directory so concurrent BUSCO jobs don't
-        # clobber each other's logs in the shared busco/ folder.
-        workdir=busco/tmp_busco_assembly
-        rm -rf $workdir
-        mkdir -p $workdir
-        cd $workdir
 
-        busco --skip_bbtools --{params.method} -i {params.assembly_path} -c {threads} -m geno \
-            -o busco_assembly -l $dataset \
-            --offline --download_path ../busco_downloads --datasets_version odb12
+# Scatter mode (--busco-scatter N): each genome is split into N size-balanced
+# chunks of whole sequences, BUSCO runs on every chunk as its own job, and the
+# busco_assembly / busco_reference rules below gather the partial tables,
+# re-resolving Complete/Duplicated status over the whole genome.
+BUSCO_SCATTER = int(config.get("busco_scatter", 0))
+BUSCO_GATHER = not MINIPROT_ENGINE and (BUSCO_SCATTER > 1 or BUSCO_UPGRADE)
+BUSCO_CHUNKS = max(BUSCO_SCATTER, 1)
 
-        rm -rf busco_assembly/run*/{{busco_sequences,hmmer_output,metaeuk_output,miniprot_output}}
 
-        cd ..
-        rm -rf busco_assembly
-        mv tmp_busco_assembly/busco_assembly busco_assembly
-        rm -rf tmp_busco_assembly
-    """
+def busco_gather_tables(target):
+    """Partial tables merged into the final table of a scattered BUSCO run."""
+    tables = expand(
+        "busco/scatter/{target}/full_table_{chunk}.tsv",
+        target=target,
+        chunk=range(BUSCO_CHUNKS),
+    )
+    if BUSCO_UPGRADE:
+        tables.append(f"busco/quick_look/{target}.tsv")
+    return tables
+
+
+def busco_scatter_fasta(wildcards):
+    """Genome split for a scattered BUSCO run: the assembly or one reference."""
+    if wildcards.target == "assembly":
+        return ASSEMBLY
+    accession = wildcards.target[len("reference_") :]
+    return ancient(f"reference/{accession}.fna")
+
+
+if BUSCO_GATHER:
+
+    rule split_for_busco:
+        input:
+            busco_scatter_fasta,
+        output:
+            chunks=temp(
+                expand(
+                    "busco/scatter/{{target}}/chunk_{chunk}.fna",
+                    chunk=range(BUSCO_CHUNKS),
+                )
+            ),
+            manifest="busco/scatter/{target}/chunks.tsv",
+        wildcard_constraints:
+            target=r"assembly|reference_[^/]+",
+        benchmark:
+            "benchmarks/split_for_busco_{target}.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=60,
+        params:
+            chunks=BUSCO_CHUNKS,
+        shell:
+            """
+            split_fasta -i {input} -n {params.chunks} -o busco/scatter/{wildcards.target}
+        """
+
+    rule busco_chunk:
+        input:
+            chunk="busco/scatter/{target}/chunk_{chunk}.fna",
+            dataset="busco/chosen_dataset.txt",
+            busco_db=BUSCO_DB,
+        output:
+            "busco/scatter/{target}/full_table_{chunk}.tsv",
+        wildcard_constraints:
+            target=r"assembly|reference_[^/]+",
+            chunk=r"\d+",
+        benchmark:
+            "benchmarks/busco_{target}_chunk_{chunk}.txt"
+        container:
+            "docker://ezlabgva/busco:v6.1.0_cv1"
+        threads: 4
+        resources:
+            mem_mb=max(config["busco_memory"] // BUSCO_CHUNKS, 10000),
+            runtime=config["busco_runtime"],
+        params:
+            method=config["busco_method"],
+            download_path=busco_download_path,
+        shell:
+            """
+            # A genome with fewer sequences than chunks leaves some chunks empty.
+            if [ ! -s {input.chunk} ]; then
+                touch {output}
+                exit 0
+            fi
+
+            dataset=$(cat {input.dataset} | cut -f 1)
+
+            workdir=busco/scatter/{wildcards.target}/tmp_{wildcards.chunk}
+            rm -rf $workdir
+            mkdir -p $workdir
+            cd $workdir
+
+            busco --skip_bbtools --{params.method} -i ../chunk_{wildcards.chunk}.fna -c {threads} -m geno \
+                -o busco_chunk -l $dataset \
+                --offline --download_path {params.download_path} --datasets_version odb12
+
+            cd ../../../..
+            mv $workdir/busco_chunk/run*/full_table.tsv {output}
+            rm -rf $workdir
+        """
+
+
+if MINIPROT_ENGINE:
+
+    rule busco_reference:
+        input:
+            genome=ancient("reference/{accession}.fna"),
+            dataset="busco/chosen_dataset.txt",
+            busco_db=BUSCO_DB,
+            previous=lambda wildcards: (
+                [f"busco/quick_look/reference_{wildcards.accession}.tsv"]
+                if BUSCO_UPGRADE
+                else []
+            ),
+        output:
+            directory("busco/busco_reference_{accession}"),
+        benchmark:
+            "benchmarks/busco_reference_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        threads: 12
+        resources:
+            mem_mb=config["busco_memory"],
+            runtime=config["busco_runtime"],
+        shell:
+            """
+            lineage=$(cat {input.dataset} | cut -f 2)
+            miniprot_markers run -i {input.genome} -t {threads} \
+                -l {input.busco_db}/lineages/$lineage \
+                --merge-with {input.previous} \
+                -o {output}/run_$lineage/full_table.tsv
+        """
+
+elif BUSCO_GATHER:
+
+    rule busco_reference:
+        input:
+            tables=lambda wildcards: busco_gather_tables(
+                f"reference_{wildcards.accession}"
+            ),
+            dataset="busco/chosen_dataset.txt",
+        output:
+            directory("busco/busco_reference_{accession}"),
+        benchmark:
+            "benchmarks/busco_reference_{accession}.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=30,
+        shell:
+            """
+            lineage=$(cat {input.dataset} | cut -f 2)
+            merge_busco_tables --tables {input.tables} \
+                --out {output}/run_$lineage/full_table.tsv
+        """
+
+else:
+
+    rule busco_reference:
+        input:
+            # ancient(): manual references (-r) are rewritten by main.py on every
+            # invocation, bumping the .fna mtime and otherwise re-triggering BUSCO
+            # (and a fresh busco_downloads re-download) even when content is
+            # unchanged. Ignoring mtime here keeps cached BUSCO results valid. Trade-
+            # off: replacing a reference in place no longer auto-reruns BUSCO; delete
+            # busco/busco_reference_{accession} to force it.
+            fna=ancient("reference/{accession}.fna"),
+            dataset="busco/chosen_dataset.txt",
+            busco_db=BUSCO_DB,
+        output:
+            directory("busco/busco_reference_{accession}"),
+        benchmark:
+            "benchmarks/busco_reference_{accession}.txt"
+        container:
+            "docker://ezlabgva/busco:v6.1.0_cv1"
+        threads: 12
+        resources:
+            mem_mb=config["busco_memory"],
+            runtime=config["busco_runtime"],
+        params:
+            method=config["busco_method"],
+            download_path=busco_download_path,
+            fna_path=lambda wildcards, input: (
+                input.fna if os.path.isabs(input.fna) else f"../../{input.fna}"
+            ),
+        shell:
+            """
+            dataset=$(cat {input.dataset} | cut -f 1)
+
+            # Run in an isolated working directory so concurrent BUSCO jobs don't
+            # clobber each other's logs in the shared busco/ folder.
+            workdir=busco/tmp_busco_reference_{wildcards.accession}
+            rm -rf $workdir
+            mkdir -p $workdir
+            cd $workdir
+
+            busco --skip_bbtools --{params.method} -i {params.fna_path} -c {threads} -m geno \
+                -o busco_reference_{wildcards.accession} -l $dataset \
+                --offline --download_path {params.download_path} --datasets_version odb12
+
+            rm -rf busco_reference_{wildcards.accession}/run*/{{busco_sequences,hmmer_output,metaeuk_output,miniprot_output}}
+
+            cd ..
+            rm -rf busco_reference_{wildcards.accession}
+            mv tmp_busco_reference_{wildcards.accession}/busco_reference_{wildcards.accession} busco_reference_{wildcards.accession}
+            rm -rf tmp_busco_reference_{wildcards.accession}
+        """
+
+
+if MINIPROT_ENGINE:
+
+    rule busco_assembly:
+        input:
+            genome=ASSEMBLY,
+            dataset="busco/chosen_dataset.txt",
+            busco_db=BUSCO_DB,
+            previous=["busco/quick_look/assembly.tsv"] if BUSCO_UPGRADE else [],
+        output:
+            directory("busco/busco_assembly"),
+        benchmark:
+            "benchmarks/busco_assembly.txt"
+        container:
+            HOBRAC_TOOLS
+        threads: 12
+        resources:
+            mem_mb=config["busco_memory"],
+            runtime=config["busco_runtime"],
+        shell:
+            """
+            lineage=$(cat {input.dataset} | cut -f 2)
+            miniprot_markers run -i {input.genome} -t {threads} \
+                -l {input.busco_db}/lineages/$lineage \
+                --merge-with {input.previous} \
+                -o {output}/run_$lineage/full_table.tsv
+        """
+
+elif config.get("incremental_busco", False) and not BUSCO_UPGRADE:
+
+    # Only the sequences whose content is not in the hit cache go through
+    # BUSCO; hits of unchanged sequences are reused as-is. Planning and merging
+    # are hobrac steps, BUSCO itself runs in its pinned image in between.
+    BUSCO_HIT_CACHE = config.get("busco_cache_dir", "busco/hit_cache")
+    # Quick-look hits only cover the marker subset: cache them apart.
+    BUSCO_CACHE_METHOD = config["busco_method"] + (
+        ".quick" if BUSCO_DATASET == "quick" else ""
+    )
+
+    rule busco_incremental_plan:
+        input:
+            assembly=ASSEMBLY,
+            dataset=rules.get_closest_busco_dataset.output,
+        output:
+            changed=temp("busco/incremental/changed.fna"),
+            plan=temp("busco/incremental/plan.tsv"),
+        benchmark:
+            "benchmarks/busco_incremental_plan.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=60,
+        params:
+            cache_dir=BUSCO_HIT_CACHE,
+            cache_method=BUSCO_CACHE_METHOD,
+        shell:
+            """
+            lineage=$(cat {input.dataset} | cut -f 2)
+            busco_incremental plan --assembly {input.assembly} \
+                --cache-dir {params.cache_dir} --lineage $lineage --method {params.cache_method} \
+                --changed-fasta {output.changed} --plan {output.plan}
+        """
+
+    rule busco_incremental_run:
+        input:
+            changed="busco/incremental/changed.fna",
+            dataset=rules.get_closest_busco_dataset.output,
+            busco_db=BUSCO_DB,
+        output:
+            temp("busco/incremental/full_table.tsv"),
+        benchmark:
+            "benchmarks/busco_incremental_run.txt"
+        container:
+            "docker://ezlabgva/busco:v6.1.0_cv1"
+        threads: 12
+        resources:
+            mem_mb=config["busco_memory"],
+            runtime=config["busco_runtime"],
+        params:
+            method=config["busco_method"],
+            download_path=busco_download_path,
+        shell:
+            """
+            # Nothing changed since the cached revision: no BUSCO run at all.
+            if [ ! -s {input.changed} ]; then
+                touch {output}
+                exit 0
+            fi
+
+            dataset=$(cat {input.dataset} | cut -f 1)
+
+            workdir=busco/incremental/tmp_busco
+            rm -rf $workdir
+            mkdir -p $workdir
+            cd $workdir
+
+            busco --skip_bbtools --{params.method} -i ../changed.fna -c {threads} -m geno \
+                -o busco_assembly -l $dataset \
+                --offline --download_path {params.download_path} --datasets_version odb12
+
+            cd ../../..
+            mv $workdir/busco_assembly/run*/full_table.tsv {output}
+            rm -rf $workdir
+        """
+
+    rule busco_assembly:
+        input:
+            plan="busco/incremental/plan.tsv",
+            table="busco/incremental/full_table.tsv",
+            dataset=rules.get_closest_busco_dataset.output,
+        output:
+            directory("busco/busco_assembly"),
+        benchmark:
+            "benchmarks/busco_assembly.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=60,
+        params:
+            cache_dir=BUSCO_HIT_CACHE,
+            cache_method=BUSCO_CACHE_METHOD,
+            max_sequences=config.get("busco_cache_max_sequences", 100000),
+        shell:
+            """
+            lineage=$(cat {input.dataset} | cut -f 2)
+            busco_incremental merge --plan {input.plan} \
+                --cache-dir {params.cache_dir} --lineage $lineage --method {params.cache_method} \
+                $([ -s {input.table} ] && echo "--busco-table {input.table}") \
+                --out {output}/run_$lineage/full_table.tsv --max-sequences {params.max_sequences}
+        """
+
+elif BUSCO_GATHER:
+
+    rule busco_assembly:
+        input:
+            tables=busco_gather_tables("assembly"),
+            dataset=rules.get_closest_busco_dataset.output,
+        output:
+            directory("busco/busco_assembly"),
+        benchmark:
+            "benchmarks/busco_assembly.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=30,
+        shell:
+            """
+            lineage=$(cat {input.dataset} | cut -f 2)
+            merge_busco_tables --tables {input.tables} \
+                --out {output}/run_$lineage/full_table.tsv
+        """
+
+else:
+
+    rule busco_assembly:
+        input:
+            assembly=ASSEMBLY,
+            dataset=rules.get_closest_busco_dataset.output,
+            busco_db=BUSCO_DB,
+        output:
+            directory("busco/busco_assembly"),
+        benchmark:
+            "benchmarks/busco_assembly.txt"
+        container:
+            "docker://ezlabgva/busco:v6.1.0_cv1"
+        threads: 12
+        resources:
+            mem_mb=config["busco_memory"],
+            runtime=config["busco_runtime"],
+        params:
+            method=config["busco_method"],
+            download_path=busco_download_path,
+            assembly_path=lambda wildcards, input: (
+                input.assembly if os.path.isabs(input.assembly) else f"../../{input.assembly}"
+            ),
+        shell:
+            """
+            dataset=$(cat {input.dataset} | cut -f 1)
+
+            # Run in an isolated working directory so concurrent BUSCO jobs don't
+            # clobber each other's logs in the shared busco/ folder.
+            workdir=busco/tmp_busco_assembly
+            rm -rf $workdir
+            mkdir -p $workdir
+            cd $workdir
+
+            busco --skip_bbtools --{params.method} -i {params.assembly_path} -c {threads} -m geno \
+                -o busco_assembly -l $dataset \
+                --offline --download_path {params.download_path} --datasets_version odb12
+
+            rm -rf busco_assembly/run*/{{busco_sequences,hmmer_output,metaeuk_output,miniprot_output}}
+
+            cd ..
+            rm -rf busco_assembly
+            mv tmp_busco_assembly/busco_assembly busco_assembly
+            rm -rf tmp_busco_assembly
+        """
 
 
 rule cleanup_busco_downloads:
@@ -201,20 +658,70 @@ rule cleanup_busco_downloads:
         runtime=5,
     shell:
         """
-        rm -rf busco/busco_downloads reference/*.fna assembly/*.fna
+        rm -rf busco/busco_downloads busco/subset_downloads busco/scatter reference/*.fna assembly/*.fna
     """
 
 
-rule busco_to_paf:
+# A single job reads the assembly BUSCO table and sequence lengths once and
+# writes the BUSCO PAF, blocks and idx files of every selected reference into
+# aln/busco_paf_batch/<accession>, using a pool of worker processes. The
+# dotplots are drawn by one job per reference, which hard-links its files into
+# aln/busco_{accession}.
+
+
+def busco_paf_batch_inputs(wildcards):
+    accessions_file = checkpoints.select_references.get(**wildcards).output[0]
+    with open(accessions_file) as f:
+        accessions = [line.strip() for line in f if line.strip()]
+    if "busco_reference_override" in config:
+        busco_references = [config["busco_reference_override"]]
+    else:
+        busco_references = expand(
+            "busco/busco_reference_{accession}", accession=accessions
+        )
+    return {
+        "accessions": accessions_file,
+        "references": ancient(expand("reference/{accession}.fna", accession=accessions)),
+        "busco_references": busco_references,
+    }
+
+
+rule busco_to_paf_batch:
     input:
-        reference=ancient("reference/{accession}.fna"),
-        assembly=config["assembly"],
-        busco_reference=lambda wildcards: config.get(
-            "busco_reference_override", f"busco/busco_reference_{wildcards.accession}"
-        ),
-        busco_assembly=lambda wildcards: config.get(
-            "busco_assembly_override", "busco/busco_assembly"
+        unpack(busco_paf_batch_inputs),
+        assembly=ASSEMBLY,
+        busco_assembly=config.get("busco_assembly_override", "busco/busco_assembly"),
+    output:
+        temp(directory("aln/busco_paf_batch")),
+    benchmark:
+        "benchmarks/busco_to_paf_batch.txt"
+    container:
+        HOBRAC_TOOLS
+    threads: 4
+    resources:
+        mem_mb=50000,
+        runtime=600,
+    params:
+        cache_dir=BUSCO_COLUMNS_CACHE,
+        # A function, so that Snakemake leaves {accession} to busco_to_paf.
+        busco_reference=lambda wildcards: os.path.join(
+            config.get("busco_reference_override", "busco/busco_reference_{accession}"),
+            "run*",
+            "full_table.tsv",
         ),
+    shell:
+        """
+        busco_to_paf --busco_query {input.busco_assembly}/run*/full_table.tsv \
+            --busco_ref '{params.busco_reference}' --query {input.assembly} \
+            --ref 'reference/{{accession}}.fna' --out '{output}/{{accession}}' \
+            --accessions {input.accessions} --jobs {threads} \
+            --busco_cache_dir {params.cache_dir}
+    """
+
+
+rule busco_to_paf:
+    input:
+        "aln/busco_paf_batch",
     output:
         directory("aln/busco_{accession}"),
     benchmark:
@@ -222,15 +729,14 @@ rule busco_to_paf:
     container:
         HOBRAC_TOOLS
     resources:
-        mem_mb=50000,
-        runtime=600,
+        mem_mb=5000,
+        runtime=60,
     params:
         prefix_assembly=config["scientific_name"].replace(" ", "_"),
     shell:
         """
-        busco_to_paf --busco_query {input.busco_assembly}/run*/full_table.tsv \
-            --busco_ref {input.busco_reference}/run*/full_table.tsv \
-            --query {input.assembly} --ref {input.reference} --out {output}
+        # Hard links: nothing is copied out of the temporary batch directory.
+        cp -rl {input}/{wildcards.accession} {output}
 
         mv {output}/query_assembly.idx "{output}/busco_query_{params.prefix_assembly}.idx"
         mv {output}/target_reference.idx {output}/busco_target_{wildcards.accession}.idx
@@ -94,7 +94,7 @@ rule jcvi_synteny:
         busco_assembly="busco/busco_assembly",
         busco_references=get_busco_reference_dirs,
         accession_order="mash/selected_accessions.txt",
-        assembly=config["assembly"],
+        assembly=ASSEMBLY,
         resolved_colors="synteny_plots/resolved_colors.txt",
         reference_reports=get_reference_report_inputs,
     output:
@@ -104,6 +104,7 @@ rule jcvi_synteny:
         orders=directory("synteny_plots/dotplot_orders"),
     benchmark:
         "benchmarks/jcvi_synteny.txt"
+    threads: 4
     resources:
         mem_mb=12000,
         runtime=600,
@@ -120,6 +121,10 @@ rule jcvi_synteny:
         alg_pvalue=config.get("alg_pvalue", 0.01),
         jcvi_min_chain_genes=config.get("jcvi_min_chain_genes", 5),
         jcvi_permissive_alg=config.get("jcvi_permissive_alg", False),
+        busco_cache_dir=BUSCO_COLUMNS_CACHE,
+        alg_sweep_pvalues=config.get("alg_sweep_pvalues", ""),
+        alg_sweep_min_chain_genes=config.get("alg_sweep_min_chain_genes", ""),
+        alg_sweep_permissive=config.get("alg_sweep_permissive", False),
     shell:
         """
         RESOLVED_COLORS=$(cat {input.resolved_colors})
@@ -144,11 +149,16 @@ rule jcvi_synteny:
             --min-busco-genes {params.min_busco_genes} \
             --alg-pvalue {params.alg_pvalue} \
             --jcvi-min-chain-genes {params.jcvi_min_chain_genes} \
+            --jobs {threads} \
+            --busco-cache-dir {params.busco_cache_dir} \
             $([ -n "$COLOR_ARG" ] && echo "--jcvi-custom-colors $COLOR_ARG") \
             --jcvi-names "{params.jcvi_names}" \
             $([ "{params.hide_non_significant}" = "True" ] && echo "--hide-non-significant") \
             $([ "{params.skip_alg}" = "True" ] && echo "--skip-alg") \
-            $([ "{params.jcvi_permissive_alg}" = "True" ] && echo "--jcvi-permissive-alg")
+            $([ "{params.jcvi_permissive_alg}" = "True" ] && echo "--jcvi-permissive-alg") \
+            --alg-sweep-pvalues "{params.alg_sweep_pvalues}" \
+            --alg-sweep-min-chain-genes "{params.alg_sweep_min_chain_genes}" \
+            $([ "{params.alg_sweep_permissive}" = "True" ] && echo "--alg-sweep-permissive")
         """
 
 
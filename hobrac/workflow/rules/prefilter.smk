@@ -0,0 +1,37 @@
+# Length prefilter (--prefilter-*): BUSCO and minimap2 consume a subset of the
+# assembly restricted to its chromosome-scale sequences. MASH still sees the
+# whole assembly. prefilter/excluded.tsv lists every sequence left out.
+PREFILTER = (
+    int(config.get("prefilter_min_length", 0)) > 0
+    or float(config.get("prefilter_coverage", 0)) > 0
+    or int(config.get("prefilter_max_sequences", 0)) > 0
+)
+ASSEMBLY = "prefilter/assembly.fna" if PREFILTER else config["assembly"]
+
+
+if PREFILTER:
+
+    rule prefilter_assembly:
+        input:
+            config["assembly"],
+        output:
+            # Removed by Snakemake once BUSCO and minimap2 are done with it.
+            fasta=temp("prefilter/assembly.fna"),
+            excluded="prefilter/excluded.tsv",
+        benchmark:
+            "benchmarks/prefilter_assembly.txt"
+        container:
+            HOBRAC_TOOLS
+        resources:
+            mem_mb=5000,
+            runtime=60,
+        params:
+            min_length=config.get("prefilter_min_length", 0),
+            coverage=config.get("prefilter_coverage", 0),
+            max_sequences=config.get("prefilter_max_sequences", 0),
+        shell:
+            """
+            prefilter_fasta -i {input} -o {output.fasta} --excluded {output.excluded} \
+                --min-length {params.min_length} --coverage {params.coverage} \
+                --max-sequences {params.max_sequences}
+        """
@@ -24,13 +24,27 @@ setuptools.setup(
         "snakemake-executor-plugin-slurm",
         "find_reference_genomes",
         "xopen",
+        "biopython",
+        "numpy",
         "scipy",
+        "matplotlib",
         "jcvi",
     ],
     entry_points={
         "console_scripts": [
             "hobrac=hobrac.main:main",
             "busco_to_paf=hobrac.busco_to_paf:main",
+            "busco_incremental=hobrac.busco_incremental:main",
+            "busco_subset=hobrac.busco_subset:main",
+            "miniprot_markers=hobrac.miniprot_markers:main",
+            "merge_busco_tables=hobrac.busco_table:main",
+            "split_fasta=hobrac.split_fasta:main",
+            "prefilter_fasta=hobrac.prefilter_fasta:main",
+            "mmi_cache=hobrac.mmi_cache:main",
+            "aln_cache=hobrac.aln_cache:main",
+            "paf_store=hobrac.paf_store:main",
+            "density_dotplot=hobrac.density_dotplot:main",
+            "anchor_paf=hobrac.anchor_paf:main",
             "dgenies_fasta_to_index=hobrac.dgenies_fasta_to_index:main",
             "precompute_mash=hobrac.precompute_mash_refseq:main",
             "dedup_ncbi=hobrac.dedup_ncbi:main",
@@ -339,7 +339,7 @@ class TestRunBranching:
         }
         mock_specs = {
             "read_fasta_sizes": {"return_value": {}},
-            "read_busco_tsv": {"return_value": busco_data},
+            "read_busco_views": {"return_value": (busco_data, busco_data)},
             "glob.glob": {"return_value": ["/fake/full_table.tsv"]},
             "generate_bed_file": {},
             "generate_links_file": {},
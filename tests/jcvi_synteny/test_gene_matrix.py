@@ -0,0 +1,187 @@
+"""Tests for GeneMatrix, the genes x species view shared by the ALG analysis."""
+
+import random
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from hobrac.jcvi_synteny.chains import (
+    _ChainIndex,
+    _count_matching_genes,
+    _longest_paths_per_component,
+    _walk_chain_counts,
+    build_gene_chain_mapping,
+    enumerate_chains,
+    validate_chains,
+)
+from hobrac.jcvi_synteny.matrix import GeneMatrix
+from hobrac.jcvi_synteny.models import BuscoGene, PairwiseAssociation
+from hobrac.jcvi_synteny.statistics import detect_algs_pairwise_raw
+
+
+def _gene(chromosome, start=0):
+    return BuscoGene(busco_id="", chromosome=chromosome, start=start, end=start + 100)
+
+
+def _species_busco():
+    return [
+        ("A", {"g2": _gene("A2", 200), "g1": _gene("A1", 100), "lone": _gene("A1")}),
+        ("B", {"g1": _gene("B1", 10), "g2": _gene("B1", 20), "g3": _gene("B2")}),
+        ("C", {"g3": _gene("C1", 5), "g1": _gene("C1", 7)}),
+    ]
+
+
+def test_codes_presence_and_coordinates():
+    matrix = GeneMatrix(_species_busco())
+
+    assert matrix.species == ["A", "B", "C"]
+    assert matrix.gene_ids == ["g1", "g2", "g3", "lone"]
+    # Chromosome codes follow first appearance in each species' BUSCO data.
+    assert matrix.chromosomes == [["A2", "A1"], ["B1", "B2"], ["C1"]]
+    assert matrix.codes.tolist() == [[1, 0, 0], [0, 0, -1], [-1, 1, 0], [1, -1, -1]]
+    assert matrix.starts[0].tolist() == [100, 10, 7]
+    assert matrix.ends[1].tolist() == [300, 120, 0]
+    assert matrix.eligible_ids() == ["g1", "g2", "g3"]
+    assert matrix.gene_nodes(0) == [("A", "A1"), ("B", "B1"), ("C", "C1")]
+    assert matrix.common_rows(0, 2).tolist() == [0]
+
+
+def test_coerce_and_list_access():
+    species_busco = _species_busco()
+    matrix = GeneMatrix.coerce(species_busco)
+
+    assert GeneMatrix.coerce(matrix) is matrix
+    assert len(matrix) == 3
+    assert list(matrix) == species_busco
+    assert matrix[1] == species_busco[1]
+    assert GeneMatrix.coerce(None).gene_ids == []
+
+
+def test_code_paths_map_unknown_chromosomes_to_no_gene():
+    matrix = GeneMatrix(_species_busco())
+    paths = matrix.code_paths([[("A", "A1"), ("B", "B9")]])
+    assert paths == [{0: 1, 1: -2}]
+
+
+def test_analysis_accepts_list_or_matrix():
+    species_busco = _species_busco()
+    matrix = GeneMatrix(species_busco)
+    assocs = [
+        PairwiseAssociation("A", "B", "A1", "B1", 1e-6, 1),
+        PairwiseAssociation("B", "C", "B1", "C1", 1e-6, 1),
+    ]
+
+    chains = enumerate_chains(assocs, species_busco, min_chain_genes=1)
+    assert chains == enumerate_chains(assocs, matrix, min_chain_genes=1)
+    assert build_gene_chain_mapping(species_busco, chains) == (
+        build_gene_chain_mapping(matrix, chains)
+    )
+    assert validate_chains(
+        chains, [], min_chain_genes=1, species_busco=species_busco
+    ) == validate_chains(chains, [], min_chain_genes=1, species_busco=matrix)
+
+
+def test_pairwise_counts_from_shared_matrix():
+    sp1 = {f"g{i}": _gene("chr1" if i < 10 else "chr2") for i in range(20)}
+    sp2 = {f"g{i}": _gene("chrA" if i < 10 else "chrB") for i in range(20)}
+    sp3 = {"g0": _gene("chrX")}
+    matrix = GeneMatrix([("sp1", sp1), ("sp3", sp3), ("sp2", sp2)])
+
+    expected = detect_algs_pairwise_raw(sp1, sp2, "sp1", "sp2", min_genes=5)
+    shared = detect_algs_pairwise_raw(
+        sp1, sp2, "sp1", "sp2", min_genes=5, matrix=matrix
+    )
+    assert shared == expected
+    assert [(a.chr1, a.chr2) for a in expected[0]] == [
+        ("chr1", "chrA"),
+        ("chr2", "chrB"),
+    ]
+
+
+def test_species_sharing_a_name_are_compared_by_position():
+    sp1 = {f"g{i}": _gene("chr1" if i < 10 else "chr2") for i in range(20)}
+    sp2 = {f"g{i}": _gene("chrA" if i < 10 else "chrB") for i in range(20)}
+    significant, _ = detect_algs_pairwise_raw(sp1, sp2, "x", "x", min_genes=5)
+    assert [(a.chr1, a.chr2) for a in significant] == [
+        ("chr1", "chrA"),
+        ("chr2", "chrB"),
+    ]
+
+    matrix = GeneMatrix([("x", sp1), ("x", sp2)])
+    with pytest.raises(ValueError, match="'x'"):
+        detect_algs_pairwise_raw(sp1, sp2, "x", "x", matrix=matrix)
+
+
+def test_signature_walk_matches_gene_by_gene_walk():
+    # Four genes share one signature; g4 differs only in species C.
+    species_busco = [
+        ("A", {f"g{i}": _gene("A1") for i in range(5)}),
+        ("B", {f"g{i}": _gene("B1") for i in range(5)}),
+        ("C", {**{f"g{i}": _gene("C1") for i in range(4)}, "g4": _gene("C2")}),
+    ]
+    assocs = [
+        PairwiseAssociation("A", "B", "A1", "B1", 1e-6, 5),
+        PairwiseAssociation("B", "C", "B1", "C1", 1e-6, 4),
+        PairwiseAssociation("A", "C", "A1", "C2", 1e-6, 1),
+    ]
+    adj = defaultdict(set)
+    for a in assocs:
+        adj[(a.species1, a.chr1)].add((a.species2, a.chr2))
+        adj[(a.species2, a.chr2)].add((a.species1, a.chr1))
+
+    expected = defaultdict(int)
+    matrix = GeneMatrix(species_busco)
+    for row in matrix.eligible_rows:
+        nodes = matrix.gene_nodes(row)
+        gene_adj = {n: adj[n] & set(nodes) for n in nodes}
+        for chain in _longest_paths_per_component(nodes, gene_adj):
+            expected[chain] += 1
+
+    counts = _walk_chain_counts(assocs, species_busco)
+    assert counts == expected
+    assert counts[(("A", "A1"), ("B", "B1"), ("C", "C1"))] == 4
+
+
+def _brute_force_matches(codes, chain_paths):
+    present = {pos: code for pos, code in enumerate(codes) if code >= 0}
+    matches = []
+    for cid, path in enumerate(chain_paths):
+        shared = [pos for pos in path if pos in present]
+        if shared and all(present[pos] == path[pos] for pos in shared):
+            matches.append(cid)
+    return matches
+
+
+def test_chain_index_and_support_counts_match_brute_force():
+    rng = random.Random(0)
+    species_busco = [
+        (
+            f"sp{s}",
+            {
+                f"g{i}": _gene(f"sp{s}_c{rng.randrange(3)}")
+                for i in range(60)
+                if rng.random() < 0.8
+            },
+        )
+        for s in range(4)
+    ]
+    matrix = GeneMatrix(species_busco)
+    chains = [
+        [(f"sp{s}", f"sp{s}_c{rng.randrange(3)}") for s in rng.sample(range(4), 3)]
+        for _ in range(8)
+    ]
+    chain_paths = matrix.code_paths(chains)
+    index = _ChainIndex(chain_paths, len(matrix))
+
+    expected_support = [0] * len(chains)
+    for codes in matrix.codes[matrix.eligible_rows].tolist():
+        expected = _brute_force_matches(codes, chain_paths)
+        assert index.matches(codes) == expected
+        for cid in expected:
+            expected_support[cid] += 1
+    assert _count_matching_genes(chains, matrix).tolist() == expected_support
+
+    signatures, inverse, counts = matrix.signatures()
+    assert np.array_equal(signatures[inverse], matrix.codes[matrix.eligible_rows])
+    assert counts.sum() == len(matrix.eligible_rows)
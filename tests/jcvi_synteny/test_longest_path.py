@@ -0,0 +1,70 @@
+"""Tests for the exact longest-path search used by chain enumeration."""
+
+import itertools
+import random
+
+from hobrac.jcvi_synteny import chains
+from hobrac.jcvi_synteny.chains import (
+    _longest_path,
+    _longest_path_dfs,
+    _longest_path_exact,
+)
+
+
+def _random_component(rng, n, p):
+    nodes = sorted({(f"sp{rng.randrange(12)}", f"chr{i}") for i in range(n)})
+    adj = {node: set() for node in nodes}
+    for a, b in itertools.combinations(nodes, 2):
+        if rng.random() < p:
+            adj[a].add(b)
+            adj[b].add(a)
+    component, stack = {nodes[0]}, [nodes[0]]
+    while stack:
+        for nbr in adj[stack.pop()]:
+            if nbr not in component:
+                component.add(nbr)
+                stack.append(nbr)
+    return sorted(component), adj
+
+
+def test_exact_matches_exhaustive_dfs_including_tie_breaks():
+    rng = random.Random(0)
+    compared = 0
+    for _ in range(500):
+        component, adj = _random_component(rng, rng.randint(2, 8), rng.random())
+        if len(component) < 2:
+            continue
+        assert _longest_path_exact(component, adj) == _longest_path_dfs(component, adj)
+        compared += 1
+    assert compared > 300
+
+
+def test_star_keeps_smallest_canonical_path():
+    center, leaves = ("B", "b1"), [("A", "a1"), ("C", "c1"), ("D", "d1")]
+    adj = {center: set(leaves), **{leaf: {center} for leaf in leaves}}
+    component = sorted([center, *leaves])
+    assert _longest_path(component, adj) == (("A", "a1"), ("B", "b1"), ("C", "c1"))
+
+
+def test_large_components_are_not_truncated(monkeypatch):
+    # A 14-node path plus chords: the capped DFS gives up early, the DP
+    # still finds the path through every node.
+    nodes = [(f"sp{i:02d}", "chr1") for i in range(14)]
+    adj = {node: set() for node in nodes}
+    for a, b in zip(nodes, nodes[1:]):
+        adj[a].add(b)
+        adj[b].add(a)
+    for i in range(0, 12, 3):
+        adj[nodes[i]].add(nodes[i + 2])
+        adj[nodes[i + 2]].add(nodes[i])
+
+    monkeypatch.setattr(chains, "_MAX_DFS_VISITS", 20)
+    assert len(_longest_path_dfs(nodes, adj)) < len(nodes)
+    assert _longest_path(nodes, adj) == tuple(nodes)
+
+
+def test_state_budget_falls_back_to_dfs(monkeypatch):
+    nodes = [(f"sp{i}", "chr1") for i in range(6)]
+    adj = {a: {b for b in nodes if b != a} for a in nodes}
+    monkeypatch.setattr(chains, "_MAX_DP_STATES", 1)
+    assert _longest_path(nodes, adj) == _longest_path_dfs(nodes, adj)
@@ -1,7 +1,17 @@
 """Tests for detect_algs_pairwise_raw: corrected p-values and significance."""
 
+import os
+
+import numpy as np
+from scipy.stats import fisher_exact
+
+from hobrac.jcvi_synteny import cache, statistics
 from hobrac.jcvi_synteny.models import BuscoGene
-from hobrac.jcvi_synteny.statistics import detect_algs_pairwise_raw
+from hobrac.jcvi_synteny.statistics import (
+    detect_algs_pairwise_raw,
+    detect_algs_transitive,
+    fisher_exact_greater,
+)
 
 
 def _gene(chromosome, start=0):
@@ -168,3 +178,105 @@ class TestDetectAlgsPairwiseRaw:
         )
         assert significant == []
         assert all_tested == []
+
+
+def test_fisher_exact_greater_matches_scipy():
+    rng = np.random.default_rng(0)
+    tables = rng.integers(0, 40, size=(300, 4))
+    tables[:10, 2:] = 0  # empty second row
+    tables[10:20, [1, 3]] = 0  # empty second column
+    expected = [
+        fisher_exact([[a, b], [c, d]], alternative="greater")[1]
+        for a, b, c, d in tables
+    ]
+    np.testing.assert_allclose(
+        fisher_exact_greater(*tables.T), expected, rtol=1e-12, atol=0
+    )
+
+
+def test_fragmented_assembly_counts_only_observed_pairs():
+    # 5000 single-gene scaffolds plus two real chromosomes; only pairs with
+    # at least min_genes shared genes are tested, in first-gene order.
+    sp1 = {f"frag{i}": _gene(f"scaffold{i}") for i in range(5000)}
+    sp2 = {f"frag{i}": _gene(f"chr{i % 3}") for i in range(5000)}
+    for i in range(12):
+        sp1[f"b{i:02d}"] = _gene("chrB")
+        sp2[f"b{i:02d}"] = _gene("chr1")
+        sp1[f"a{i:02d}"] = _gene("chrA")
+        sp2[f"a{i:02d}"] = _gene("chr2")
+
+    _, all_tested = detect_algs_pairwise_raw(sp1, sp2, "sp1", "sp2", min_genes=5)
+    assert [(a.chr1, a.chr2, a.gene_count) for a in all_tested] == [
+        ("chrA", "chr2", 12),
+        ("chrB", "chr1", 12),
+    ]
+
+
+def test_parallel_pairs_match_serial():
+    rng = np.random.default_rng(1)
+    species_busco = []
+    for s in range(4):
+        chroms = rng.integers(0, 4, size=120)
+        species_busco.append(
+            (
+                f"sp{s}",
+                {
+                    f"g{i}": _gene(f"sp{s}_c{(i // 30 + c % 2) % 4}")
+                    for i, c in enumerate(chroms)
+                },
+            )
+        )
+    serial = detect_algs_transitive(species_busco, min_chain_genes=3)
+    parallel = detect_algs_transitive(species_busco, min_chain_genes=3, jobs=2)
+    assert parallel == serial
+    assert serial[1]
+
+
+def test_cached_stages_are_reused(tmp_path, monkeypatch):
+    rng = np.random.default_rng(3)
+    species_busco = [
+        (
+            f"sp{s}",
+            {
+                f"g{i}": _gene(f"c{(i // 25 + int(rng.random() < 0.1)) % 4}")
+                for i in range(100)
+            },
+        )
+        for s in range(3)
+    ]
+    cache_dir = str(tmp_path / "cache")
+    first = detect_algs_transitive(
+        species_busco, min_chain_genes=3, cache_dir=cache_dir
+    )
+    assert first[1]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("recomputed a cached stage")
+
+    monkeypatch.setattr(statistics, "_test_all_pairs", fail)
+    monkeypatch.setattr(statistics, "_find_chains", fail)
+    assert (
+        detect_algs_transitive(species_busco, min_chain_genes=3, cache_dir=cache_dir)
+        == first
+    )
+
+    # A new chain parameter reuses the tests but recomputes the chains.
+    monkeypatch.undo()
+    monkeypatch.setattr(statistics, "_test_all_pairs", fail)
+    permissive = detect_algs_transitive(
+        species_busco, min_chain_genes=3, permissive_alg=True, cache_dir=cache_dir
+    )
+    assert permissive[4] == first[4]
+
+
+def test_entries_of_other_versions_are_pruned(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    cache.save(cache_dir, "tests", cache.cache_key("a"), {"tested": []})
+    old_key = cache.cache_key("a")
+
+    monkeypatch.setattr(cache, "VERSION_TAG", "0000beef")
+    assert cache.cache_key("a") != old_key
+    new_key = cache.cache_key("a")
+    cache.save(cache_dir, "tests", new_key, {"tested": [1]})
+    assert os.listdir(cache_dir) == [f"0000beef-tests-{new_key}.json"]
+    assert cache.load(cache_dir, "tests", new_key) == {"tested": [1]}
@@ -0,0 +1,90 @@
+"""Tests for the ALG parameter sweep."""
+
+import itertools
+
+import numpy as np
+
+from hobrac.jcvi_synteny import sweep as sweep_module
+from hobrac.jcvi_synteny.matrix import GeneMatrix
+from hobrac.jcvi_synteny.models import BuscoGene
+from hobrac.jcvi_synteny.statistics import detect_algs_transitive
+from hobrac.jcvi_synteny.sweep import (
+    recovered_algs,
+    save_sweep_table,
+    sweep,
+)
+
+
+def _gene(chromosome):
+    return BuscoGene(busco_id="", chromosome=chromosome, start=0, end=100)
+
+
+def _species(n_species=4, n_genes=160, seed=4):
+    # Four blocks of 40 genes, each on its own chromosome in every species,
+    # with the last two blocks fused in half of the species and some noise.
+    rng = np.random.default_rng(seed)
+    species_busco = []
+    for s in range(n_species):
+        genes = {}
+        for i in range(n_genes):
+            block = i // 40
+            if s % 2 and block == 3:
+                block = 2
+            if rng.random() < 0.15:
+                block = int(rng.integers(0, 4))
+            genes[f"g{i}"] = _gene(f"sp{s}_c{block}")
+        species_busco.append((f"sp{s}", genes))
+    return species_busco
+
+
+def test_each_setting_matches_a_full_run():
+    matrix = GeneMatrix(_species())
+    alphas, min_chain_genes_values = [1.0, 0.01, 1e-8], [3, 10, 60]
+    custom_algs = {f"g{i}": "ABCD"[i // 40] for i in range(160)}
+    rows = sweep(
+        matrix, alphas, min_chain_genes_values, [False, True], custom_algs=custom_algs
+    )
+
+    settings = itertools.product(alphas, min_chain_genes_values, [False, True])
+    assert [(r.alpha, r.min_chain_genes, r.permissive) for r in rows] == list(settings)
+    for row in rows:
+        assocs, chains, gene_to_chain, _, _ = detect_algs_transitive(
+            matrix,
+            alpha=row.alpha,
+            min_chain_genes=row.min_chain_genes,
+            permissive_alg=row.permissive,
+        )
+        assert row.significant_pairs == len(assocs)
+        assert row.chains == len(chains)
+        assert row.assigned_genes == sum(1 for c in gene_to_chain.values() if c >= 0)
+        assert row.recovered_algs == recovered_algs(chains, gene_to_chain, custom_algs)
+    assert max(len(r.recovered_algs) for r in rows) >= 3
+
+
+def test_tests_of_the_main_run_are_reused(monkeypatch):
+    matrix = GeneMatrix(_species())
+    expected = sweep(matrix, [1.0, 1e-8], [3], [False], min_genes=4)
+    *_, tested = detect_algs_transitive(matrix, alpha=0.01, min_genes=4)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("re-ran the pairwise tests")
+
+    monkeypatch.setattr(sweep_module, "_test_all_pairs", fail)
+    assert sweep(matrix, [1.0, 1e-8], [3], [False], tested=tested) == expected
+
+
+def test_recovered_algs_need_a_majority():
+    chains = [[("sp0", "c0")], [("sp0", "c1")]]
+    gene_to_chain = {"a1": 0, "a2": 0, "b1": 0, "c1": 1, "d1": 1, "x": -1}
+    custom_algs = {"a1": "A", "a2": "A", "b1": "B", "c1": "C", "d1": "D", "x": "X"}
+    assert recovered_algs(chains, gene_to_chain, custom_algs) == ["A"]
+
+
+def test_sweep_table(tmp_path):
+    rows = sweep(GeneMatrix(_species()), [0.01], [5], [False])
+    path = tmp_path / "alg_sweep.tsv"
+    save_sweep_table(rows, str(path))
+    header, line = path.read_text().splitlines()
+    assert header.split("\t")[:3] == ["alpha", "min_chain_genes", "permissive"]
+    assert line.split("\t")[:3] == ["0.01", "5", "no"]
+    assert line.split("\t")[-2:] == ["-", "-"]
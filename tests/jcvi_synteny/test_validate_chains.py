@@ -1,6 +1,8 @@
 """Tests for validate_chains: pruning chain nodes by significant link count."""
 
-from hobrac.jcvi_synteny.chains import validate_chains
+import random
+
+from hobrac.jcvi_synteny.chains import _prune_subchains, validate_chains
 from hobrac.jcvi_synteny.models import BuscoGene, ChromosomeAssociation
 
 
@@ -312,3 +314,28 @@ class TestValidateChains:
             species_busco=species_busco,
         )
         assert result == [chain_strong]
+
+
+class TestPruneSubchains:
+    def test_matches_pairwise_subset_checks(self):
+        rng = random.Random(0)
+        nodes = [(f"sp{s}", f"c{c}") for s in range(6) for c in range(2)]
+        for _ in range(50):
+            chains = {
+                tuple(rng.sample(nodes, rng.randint(2, 5)))
+                for _ in range(rng.randint(1, 30))
+            }
+            expected = {
+                chain
+                for chain in chains
+                if not any(
+                    len(other) > len(chain) and set(chain) <= set(other)
+                    for other in chains
+                )
+            }
+            assert _prune_subchains(chains) == expected
+
+    def test_same_nodes_same_length_are_both_kept(self):
+        a = (("sp1", "c1"), ("sp2", "c2"), ("sp3", "c3"))
+        b = (("sp2", "c2"), ("sp1", "c1"), ("sp3", "c3"))
+        assert _prune_subchains({a, b}) == {a, b}
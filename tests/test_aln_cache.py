@@ -0,0 +1,93 @@
+"""Tests for the per-sequence minimap2 alignment cache."""
+
+import pytest
+
+from hobrac.aln_cache import merge, plan
+from hobrac.sequence_cache import plan_cache_file, read_cache, update_cache
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def _paf(query, target="chrR", start=0):
+    return f"{query}\t8\t0\t8\t+\t{target}\t100\t{start}\t{start + 8}\t8\t8\t60\n"
+
+
+def _run(tmp_path, fasta_text, new_records, tag, max_sequences=0):
+    fasta = _write(tmp_path / f"{tag}.fa", fasta_text)
+    changed = tmp_path / f"{tag}.changed.fa"
+    plan_file = str(tmp_path / f"{tag}.plan.tsv")
+    cache = str(tmp_path / "cache.paf.tsv")
+    counts = plan(fasta, cache, str(changed), plan_file)
+    assert plan_cache_file(plan_file) == cache
+    new_paf = _write(tmp_path / f"{tag}.new.paf", "".join(new_records))
+    out = tmp_path / f"{tag}.paf"
+    lengths = {"s1": 8, "s2": 8, "s3": 8}
+    stats = merge(plan_file, cache, str(out), new_paf, lengths, max_sequences)
+    return counts, changed.read_text(), out.read_text(), stats
+
+
+def test_unchanged_and_renamed_sequences_reuse_cached_records(tmp_path):
+    counts, changed, paf, stats = _run(
+        tmp_path,
+        ">s1\nAAAACCCC\n>s2\nGGGGTTTT\n",
+        [_paf("s1"), _paf("s1", "chrQ")],
+        "v1",
+    )
+    assert counts == (0, 2)
+    assert ">s1" in changed and ">s2" in changed
+    assert paf == _paf("s1") + _paf("s1", "chrQ")
+    assert (stats["hit"], stats["miss"]) == (0, 2)
+
+    # s1 is renamed s3, s2 (no alignment) is unchanged: nothing to align.
+    counts, changed, paf, stats = _run(
+        tmp_path, ">s2\nGGGGTTTT\n>s3\nAAAACCCC\n", [], "v2"
+    )
+    assert counts == (2, 0)
+    assert changed == ""
+    assert paf == _paf("s3") + _paf("s3", "chrQ")
+    assert (stats["hit"], stats["hit_bp"], stats["miss"]) == (2, 16, 0)
+
+
+def test_changed_sequence_is_realigned(tmp_path):
+    _run(tmp_path, ">s1\nAAAACCCC\n>s2\nGGGGTTTT\n", [_paf("s1"), _paf("s2")], "v1")
+    counts, changed, paf, stats = _run(
+        tmp_path, ">s1\nAAAACCCC\n>s2\nGGGGTTTA\n", [_paf("s2", start=50)], "v2"
+    )
+    assert counts == (1, 1)
+    assert changed == ">s2\nGGGGTTTA\n"
+    assert paf == _paf("s1") + _paf("s2", start=50)
+    assert (stats["hit"], stats["miss"], stats["miss_bp"]) == (1, 1, 8)
+
+
+def test_other_assemblies_stay_cached_and_old_entries_are_evicted(tmp_path):
+    _run(tmp_path, ">s1\nAAAACCCC\n", [_paf("s1")], "a")
+    _run(tmp_path, ">s2\nGGGGTTTT\n", [_paf("s2")], "b")
+    # The first assembly was not evicted by the run on the second one.
+    counts, _, paf, _ = _run(tmp_path, ">s1\nAAAACCCC\n", [], "a2", max_sequences=2)
+    assert counts == (1, 0)
+    assert paf == _paf("s1")
+
+    # A third sequence evicts the least recently used one, s2.
+    counts, _, _, stats = _run(
+        tmp_path, ">s3\nTTTTTTTT\n", [_paf("s3")], "c", max_sequences=2
+    )
+    assert stats["evicted"] == 1
+    _, cached = read_cache(str(tmp_path / "cache.paf.tsv"))
+    assert len(cached) == 2
+    assert _run(tmp_path, ">s2\nGGGGTTTT\n", [_paf("s2")], "b2")[0] == (0, 1)
+
+
+def test_merge_fails_when_a_planned_entry_was_evicted(tmp_path):
+    _run(tmp_path, ">s1\nAAAACCCC\n", [_paf("s1")], "v1")
+    fasta = _write(tmp_path / "v2.fa", ">s1\nAAAACCCC\n")
+    cache = str(tmp_path / "cache.paf.tsv")
+    plan_file = str(tmp_path / "v2.plan.tsv")
+    assert plan(fasta, cache, str(tmp_path / "v2.changed.fa"), plan_file) == (1, 0)
+
+    # Another run fills the cache and evicts s1 before this one merges.
+    update_cache(cache, [], {"other": [["x"]]}, max_sequences=1)
+    with pytest.raises(ValueError, match="s1"):
+        merge(plan_file, cache, str(tmp_path / "v2.paf"))
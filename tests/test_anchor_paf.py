@@ -0,0 +1,112 @@
+"""Tests for the alignment-free minimizer anchor PAF."""
+
+import numpy as np
+
+from hobrac.anchor_paf import (
+    _CODES,
+    chain_anchors,
+    join_anchors,
+    kmer_hashes,
+    minimizers,
+    sketch_fasta,
+    sketch_sequence,
+    write_paf,
+)
+
+_COMPLEMENT = bytes.maketrans(b"ACGT", b"TGCA")
+
+
+def _random(length, seed):
+    rng = np.random.default_rng(seed)
+    return np.frombuffer(b"ACGT", np.uint8)[rng.integers(0, 4, length)].tobytes()
+
+
+def _revcomp(residues):
+    return residues.translate(_COMPLEMENT)[::-1]
+
+
+def _write(path, records):
+    with open(path, "w") as f:
+        for name, residues in records:
+            f.write(f">{name}\n")
+            for i in range(0, len(residues), 60):
+                f.write(residues[i : i + 60].decode() + "\n")
+    return str(path)
+
+
+def test_canonical_hashes_are_strand_independent():
+    residues = _random(200, 1)
+    forward, _ = kmer_hashes(_CODES[np.frombuffer(residues, np.uint8)], 15)
+    backward, _ = kmer_hashes(_CODES[np.frombuffer(_revcomp(residues), np.uint8)], 15)
+    assert np.array_equal(forward, backward[::-1])
+
+
+def test_minimizers_match_window_definition_and_skip_n():
+    residues = _random(3000, 2)
+    residues = residues[:1000] + b"N" * 50 + residues[1050:]
+    codes = _CODES[np.frombuffer(residues, np.uint8)]
+    hashes, _ = kmer_hashes(codes, 11)
+
+    expected = set()
+    for start in range(len(hashes) - 20 + 1):
+        window = hashes[start : start + 20]
+        if window.min() != np.iinfo(np.uint64).max:
+            expected.update(start + np.flatnonzero(window == window.min()))
+    positions, _, _ = minimizers(codes, 11, 20)
+    assert list(positions) == sorted(expected)
+    assert not any(990 <= p < 1050 for p in positions)
+
+
+def test_block_processing_matches_whole_sequence(monkeypatch):
+    residues = _random(50_000, 3)
+    whole = sketch_sequence(residues, 15, 25)
+    monkeypatch.setattr("hobrac.anchor_paf.BLOCK_KMERS", 4999)
+    blocks = sketch_sequence(residues, 15, 25)
+    for a, b in zip(whole, blocks):
+        assert np.array_equal(a, b)
+
+
+def test_collinear_segments_with_strand(tmp_path):
+    ref1, ref2 = _random(60_000, 4), _random(40_000, 5)
+    reference = _write(tmp_path / "ref.fa", [("r1", ref1), ("r2", ref2)])
+    query = _write(
+        tmp_path / "asm.fa",
+        [("chrA", ref1[:30_000] + _revcomp(ref2[10_000:30_000])), ("chrB", ref1)],
+    )
+
+    q_sketch = sketch_fasta(query, k=15, w=10)
+    t_sketch = sketch_fasta(reference, k=15, w=10)
+    anchors = join_anchors(q_sketch, t_sketch)
+    segments = chain_anchors(anchors, k=15, band=500, max_gap=5000)
+    found = {
+        (
+            q_sketch.names[s.q_seq],
+            t_sketch.names[s.t_seq],
+            s.reverse,
+            s.q_start // 1000,
+            s.t_start // 1000,
+        )
+        for s in segments
+    }
+    assert found == {
+        ("chrA", "r1", False, 0, 0),
+        ("chrA", "r2", True, 30, 10),
+        ("chrB", "r1", False, 0, 0),
+    }
+
+    paf = tmp_path / "anchors.paf"
+    write_paf(segments, q_sketch, t_sketch, str(paf), k=15, w=10)
+    for line in paf.read_text().splitlines():
+        fields = line.split("\t")
+        assert len(fields) == 13 and fields[12].startswith("cm:i:")
+        assert 0 < int(fields[9]) <= int(fields[10])
+
+
+def test_repeated_minimizers_are_dropped(tmp_path):
+    unit = _random(2000, 6)
+    reference = _write(tmp_path / "ref.fa", [("r1", unit * 10)])
+    query = _write(tmp_path / "asm.fa", [("chrA", unit)])
+    anchors = join_anchors(
+        sketch_fasta(query, 15, 10), sketch_fasta(reference, 15, 10), 8
+    )
+    assert len(anchors["q_pos"]) == 0
@@ -0,0 +1,92 @@
+"""Tests for BUSCO-anchored collinear block detection."""
+
+from hobrac.busco_blocks import (
+    SharedGene,
+    collinear_blocks,
+    shared_genes,
+    write_blocks_paf,
+    write_blocks_tsv,
+)
+
+
+def _genes(query, target, target_positions, start_id=0):
+    """Genes every 1 kb on ``query`` placed at ``target_positions`` (kb)."""
+    return [
+        SharedGene(
+            f"g{start_id + i}",
+            query,
+            i * 1000,
+            i * 1000 + 500,
+            target,
+            pos * 1000,
+            pos * 1000 + 500,
+        )
+        for i, pos in enumerate(target_positions)
+    ]
+
+
+def test_shared_genes_keeps_genes_present_in_both_tables():
+    query = {
+        "a": {"chr": "chr1", "start": 1, "end": 2},
+        "b": {"chr": "chr1", "start": 3, "end": 4},
+    }
+    target = {"b": {"chr": "ref1", "start": 5, "end": 6}}
+    assert shared_genes(query, target) == [SharedGene("b", "chr1", 3, 4, "ref1", 5, 6)]
+
+
+def test_forward_and_inverted_runs_are_split_with_orientation():
+    # 0..5 collinear, 6..10 inverted, 11..14 collinear again.
+    positions = list(range(6)) + list(range(10, 5, -1)) + list(range(11, 15))
+    blocks = collinear_blocks(_genes("chr1", "ref1", positions))
+    assert [(b.strand, b.genes, b.first_gene, b.last_gene) for b in blocks] == [
+        ("+", 6, "g0", "g5"),
+        ("-", 5, "g6", "g10"),
+        ("+", 4, "g11", "g14"),
+    ]
+    assert (blocks[1].target_start, blocks[1].target_end) == (6000, 10500)
+
+
+def test_gap_tolerance_and_minimum_size():
+    # One misplaced gene inside a run is skipped over, not a break.
+    positions = [0, 1, 2, 40, 3, 4, 5]
+    blocks = collinear_blocks(_genes("chr1", "ref1", positions), max_gap=2)
+    assert [(b.genes, b.first_gene, b.last_gene) for b in blocks] == [(6, "g0", "g6")]
+    assert collinear_blocks(_genes("chr1", "ref1", positions), max_gap=0) == []
+    assert len(collinear_blocks(_genes("chr1", "ref1", [0, 1]), min_genes=2)) == 1
+
+
+def test_other_chromosomes_do_not_break_a_pair():
+    genes = _genes("chr1", "ref1", [0, 1, 2, 3, 4, 5])
+    # Interleave genes of another target between them on the query.
+    genes += _genes("chr1", "ref2", [0, 1, 2], start_id=100)
+    genes = [
+        g._replace(query_start=g.query_start + (1 if g.target == "ref2" else 0))
+        for g in genes
+    ]
+    blocks = collinear_blocks(genes)
+    assert [(b.target, b.genes) for b in blocks] == [("ref1", 6), ("ref2", 3)]
+
+
+def test_outputs(tmp_path):
+    blocks = collinear_blocks(_genes("chr1", "ref1", [5, 4, 3, 2]))
+    paf = tmp_path / "blocks.paf"
+    tsv = tmp_path / "blocks.tsv"
+    write_blocks_paf(blocks, {"chr1": 10_000}, {"ref1": 20_000}, str(paf))
+    write_blocks_tsv(blocks, str(tsv))
+
+    fields = paf.read_text().rstrip("\n").split("\t")
+    assert fields[:9] == [
+        "chr1",
+        "10000",
+        "0",
+        "3500",
+        "-",
+        "ref1",
+        "20000",
+        "2000",
+        "5500",
+    ]
+    assert fields[12] == "ng:i:4"
+    lines = tsv.read_text().splitlines()
+    assert lines[0].split("\t")[:3] == ["query", "query_start", "query_end"]
+    assert lines[1].split("\t")[6:8] == ["-", "4"]
@@ -0,0 +1,90 @@
+"""Tests for the columnar BUSCO table loader and its sidecar cache."""
+
+import os
+
+import numpy as np
+
+from hobrac.busco_columns import load_table, parse_table, sidecar_path
+from hobrac.jcvi_synteny.io import read_busco_tsv, read_busco_views
+
+TABLE = (
+    "# BUSCO version is: 6.0.0\n"
+    "# Busco id\tStatus\tSequence\tGene Start\tGene End\tStrand\tScore\tLength\n"
+    "g1\tComplete\tchr1\t100\t200\t+\t50\t100\n"
+    "g2\tDuplicated\tchr1\t300\t400\t+\t50\t100\n"
+    "g2\tDuplicated\tchr2\t300\t400\t-\t50\t100\n"
+    "g3\tComplete\tchr1\t500\t600\t-\t50\t100\n"
+    "g4\tMissing\n"
+    "g5\tComplete\tchr2\t700\t800\t+\t50\t100\n"
+    "g6\tFragmented\tchr3\t10\t20\t+\t5\t10\n"
+)
+
+
+def _table(tmp_path, text=TABLE):
+    path = tmp_path / "full_table.tsv"
+    path.write_text(text)
+    return str(path)
+
+
+def test_parse_interns_chromosomes_and_statuses(tmp_path):
+    columns = parse_table(_table(tmp_path))
+    assert columns.busco_id.tolist() == ["g1", "g2", "g2", "g3", "g5", "g6"]
+    assert columns.chromosomes == ["chr1", "chr2", "chr3"]
+    assert columns.chromosome.tolist() == [0, 0, 1, 0, 1, 2]
+    assert columns.start.tolist() == [100, 300, 300, 500, 700, 10]
+    assert [columns.statuses[s] for s in columns.status] == [
+        "Complete",
+        "Duplicated",
+        "Duplicated",
+        "Complete",
+        "Complete",
+        "Fragmented",
+    ]
+    assert columns.complete_mask().tolist() == [1, 0, 0, 1, 1, 0]
+    assert columns.complete_mask(min_genes=2).tolist() == [1, 0, 0, 1, 0, 0]
+
+
+def test_sidecar_is_reused_and_invalidated(tmp_path):
+    path = _table(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    first = load_table(path, cache_dir)
+    assert os.path.isfile(sidecar_path(path, cache_dir))
+    cached = load_table(path, cache_dir)
+    for a, b in zip(first, cached):
+        assert list(a) == list(b)
+
+    # A rewritten table (new size) is parsed again.
+    with open(path, "a") as f:
+        f.write("g7\tComplete\tchr4\t1\t2\t+\t5\t10\n")
+    os.utime(path, ns=(1, 1))
+    assert load_table(path, cache_dir).chromosomes[-1] == "chr4"
+
+
+def test_table_directory_is_never_written(tmp_path):
+    path = _table(tmp_path)
+    load_table(path)
+    load_table(path, str(tmp_path / "cache"))
+    assert sorted(os.listdir(tmp_path)) == ["cache", "full_table.tsv"]
+
+
+def test_unwritable_cache_goes_unused(tmp_path, monkeypatch):
+    path = _table(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+
+    def refuse(*args, **kwargs):
+        raise OSError("read-only")
+
+    monkeypatch.setattr(np, "savez", refuse)
+    assert load_table(path, cache_dir).busco_id.size == 6
+    assert not os.path.exists(sidecar_path(path, cache_dir))
+
+
+def test_views_share_genes_and_match_read_busco_tsv(tmp_path):
+    path = _table(tmp_path)
+    filtered, unfiltered = read_busco_views(path, min_busco_genes=2)
+    assert list(unfiltered) == ["g1", "g3", "g5"]
+    assert list(filtered) == ["g1", "g3"]
+    assert filtered["g1"] is unfiltered["g1"]
+    assert unfiltered["g5"].chromosome == "chr2"
+    assert read_busco_tsv(path, 2) == filtered
+    assert read_busco_tsv(path) == unfiltered
@@ -0,0 +1,132 @@
+"""Tests for incremental BUSCO: hit reuse across revisions and status merging."""
+
+import os
+
+import pytest
+
+from hobrac.busco_incremental import cache_path, merge, plan, read_plan
+from hobrac.busco_table import read_full_table
+from hobrac.fasta_index import sequence_digests
+
+HEADER = "# Busco id\tStatus\tSequence\tGene Start\tGene End\tStrand\tScore\tLength\n"
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def _table(path, rows):
+    lines = [HEADER] + ["\t".join(row) + "\n" for row in rows]
+    return _write(path, "".join(lines))
+
+
+def _statuses(rows):
+    return {(row[0], row[2] if len(row) > 2 else ""): row[1] for row in rows}
+
+
+class TestSequenceDigests:
+    def test_digest_ignores_name_case_and_wrapping(self, tmp_path):
+        fasta = _write(tmp_path / "a.fa", ">a desc\nACGT\nacgt\n>b\nACGTACGT\n>c\nAC\n")
+        digests = sequence_digests(fasta)
+        assert digests["a"] == digests["b"]
+        assert digests["a"] != digests["c"]
+
+
+class TestPlanAndMerge:
+    def _run(self, tmp_path, fasta_text, busco_rows, tag):
+        fasta = _write(tmp_path / f"{tag}.fa", fasta_text)
+        changed = tmp_path / f"{tag}.changed.fa"
+        plan_file = str(tmp_path / f"{tag}.plan.tsv")
+        cache = cache_path(str(tmp_path / "cache"), "lin_odb12", "miniprot")
+        counts = plan(fasta, cache, str(changed), plan_file)
+        table = None
+        if busco_rows is not None:
+            table = _table(tmp_path / f"{tag}.full_table.tsv", busco_rows)
+        out = str(tmp_path / tag / "run_lin_odb12" / "full_table.tsv")
+        merge(plan_file, cache, out, table)
+        return counts, changed.read_text(), read_full_table(out)[1]
+
+    def test_first_run_processes_everything(self, tmp_path):
+        counts, changed, rows = self._run(
+            tmp_path,
+            ">s1\nAAAA\n>s2\nCCCC\n",
+            [
+                ["b1", "Complete", "s1", "1", "4", "+", "10", "5"],
+                ["b2", "Missing"],
+            ],
+            "v1",
+        )
+        assert counts == (0, 2)
+        assert ">s1" in changed and ">s2" in changed
+        assert _statuses(rows) == {("b1", "s1"): "Complete", ("b2", ""): "Missing"}
+
+    def test_renamed_sequence_reuses_hits(self, tmp_path):
+        self._run(
+            tmp_path,
+            ">s1\nAAAA\n>s2\nCCCC\n",
+            [["b1", "Complete", "s1", "1", "4", "+", "10", "5"], ["b2", "Missing"]],
+            "v1",
+        )
+        # s1 renamed to chr1, s2 unchanged: nothing for BUSCO to do.
+        counts, changed, rows = self._run(
+            tmp_path, ">chr1\nAAAA\n>s2\nCCCC\n", None, "v2"
+        )
+        assert counts == (2, 0)
+        assert changed == ""
+        assert _statuses(rows) == {("b1", "chr1"): "Complete", ("b2", ""): "Missing"}
+
+    def test_changed_sequence_rerun_and_duplicates_resolved(self, tmp_path):
+        self._run(
+            tmp_path,
+            ">s1\nAAAA\n>s2\nCCCC\n",
+            [["b1", "Complete", "s1", "1", "4", "+", "10", "5"], ["b2", "Missing"]],
+            "v1",
+        )
+        # s2 was edited and now carries a second copy of b1 plus b2.
+        counts, changed, rows = self._run(
+            tmp_path,
+            ">s1\nAAAA\n>s2\nCCCCGG\n",
+            [
+                ["b1", "Complete", "s2", "1", "4", "+", "10", "5"],
+                ["b2", "Complete", "s2", "2", "6", "-", "10", "5"],
+            ],
+            "v2",
+        )
+        assert counts == (1, 1)
+        assert ">s2" in changed and ">s1" not in changed
+        assert _statuses(rows) == {
+            ("b1", "s1"): "Duplicated",
+            ("b1", "s2"): "Duplicated",
+            ("b2", "s2"): "Complete",
+        }
+
+    def test_plan_records_sources(self, tmp_path):
+        self._run(tmp_path, ">s1\nAAAA\n", [["b1", "Missing"]], "v1")
+        fasta = _write(tmp_path / "v2.fa", ">s1\nAAAA\n>s3\nTTTT\n")
+        plan_file = str(tmp_path / "v2.plan.tsv")
+        cache = cache_path(str(tmp_path / "cache"), "lin_odb12", "miniprot")
+        plan(fasta, cache, str(tmp_path / "v2.changed.fa"), plan_file)
+        assert [(name, source) for name, _, source in read_plan(plan_file)] == [
+            ("s1", "cached"),
+            ("s3", "new"),
+        ]
+
+    def test_shared_cache_keeps_other_assemblies(self, tmp_path):
+        hit = ["b1", "Complete", "s1", "1", "4", "+", "10", "5"]
+        self._run(tmp_path, ">s1\nAAAA\n", [hit], "a")
+        self._run(tmp_path, ">t1\nCCCC\n", [["b1", "Missing"]], "b")
+        # The hits of the first assembly survived the run on the second one.
+        counts, _, rows = self._run(tmp_path, ">s1\nAAAA\n", None, "a2")
+        assert counts == (1, 0)
+        assert _statuses(rows) == {("b1", "s1"): "Complete"}
+
+    def test_missing_planned_hits_fail_the_merge(self, tmp_path):
+        self._run(tmp_path, ">s1\nAAAA\n", [["b1", "Missing"]], "v1")
+        fasta = _write(tmp_path / "v2.fa", ">s1\nAAAA\n")
+        plan_file = str(tmp_path / "v2.plan.tsv")
+        cache = cache_path(str(tmp_path / "cache"), "lin_odb12", "miniprot")
+        plan(fasta, cache, str(tmp_path / "v2.changed.fa"), plan_file)
+        os.remove(cache)
+        with pytest.raises(ValueError, match="s1"):
+            merge(plan_file, cache, str(tmp_path / "v2" / "full_table.tsv"))
@@ -0,0 +1,72 @@
+"""Tests for the reduced (quick-look) BUSCO lineage datasets."""
+
+import gzip
+import os
+
+from hobrac.busco_subset import (
+    lineage_markers,
+    select_markers,
+    write_subset_dataset,
+)
+
+
+def _color_file(path, groups):
+    with open(path, "w") as f:
+        for alg, markers in groups.items():
+            for marker in markers:
+                f.write(f"{marker} #000000 {alg}\n")
+    return str(path)
+
+
+def test_selection_is_balanced_across_algs(tmp_path):
+    big = [f"{i}at7898" for i in range(100, 140)]
+    small = ["900at7898", "901at7898"]
+    colors = _color_file(tmp_path / "Busco.Colors.X.l_odb12", {"A": big, "B": small})
+
+    selected = select_markers(big + small, [colors], 4)
+
+    assert len(selected) == 4
+    # The small ALG gets as many markers as the large one while it lasts.
+    assert set(small) <= set(selected)
+    assert selected == select_markers(reversed(big + small), [colors], 4)
+
+
+def test_uncoloured_markers_fill_the_remaining_slots(tmp_path):
+    colors = _color_file(tmp_path / "c", {"A": ["1at1"]})
+    selected = select_markers(["1at1", "2at1", "3at1"], [colors], 2)
+    assert "1at1" in selected and len(selected) == 2
+    assert select_markers(["1at1", "2at1"], [], 10) == ["1at1", "2at1"]
+
+
+def _lineage(tmp_path, markers):
+    lineage = tmp_path / "lineages" / "l_odb12"
+    (lineage / "hmms").mkdir(parents=True)
+    for marker in markers:
+        (lineage / "hmms" / f"{marker}.hmm").write_text(marker)
+    (lineage / "dataset.cfg").write_text(
+        f"name=l_odb12\nnumber_of_BUSCOs={len(markers)}\n"
+    )
+    (lineage / "scores_cutoff").write_text(
+        "".join(f"{marker}\t10.0\n" for marker in markers)
+    )
+    with gzip.open(lineage / "refseq_db.faa.gz", "wt") as f:
+        for marker in markers:
+            f.write(f">{marker}_9606_0:001\nMKV\nLLA\n")
+    return str(lineage)
+
+
+def test_subset_dataset_keeps_only_selected_markers(tmp_path):
+    lineage = _lineage(tmp_path, ["1at1", "2at1", "3at1"])
+    out = str(tmp_path / "subset")
+    assert lineage_markers(lineage) == ["1at1", "2at1", "3at1"]
+
+    write_subset_dataset(lineage, out, ["1at1", "3at1"])
+
+    assert sorted(os.listdir(os.path.join(out, "hmms"))) == ["1at1.hmm", "3at1.hmm"]
+    assert lineage_markers(out) == ["1at1", "3at1"]
+    assert "number_of_BUSCOs=2\n" in open(os.path.join(out, "dataset.cfg")).read()
+    assert open(os.path.join(out, "scores_cutoff")).read() == (
+        "1at1\t10.0\n3at1\t10.0\n"
+    )
+    with gzip.open(os.path.join(out, "refseq_db.faa.gz"), "rt") as f:
+        assert f.read() == ">1at1_9606_0:001\nMKV\nLLA\n>3at1_9606_0:001\nMKV\nLLA\n"
@@ -0,0 +1,73 @@
+"""Tests for BUSCO full_table status resolution and merging of partial runs."""
+
+from hobrac.busco_table import merge_tables, resolve_statuses, summarize
+
+
+def _statuses(rows):
+    return {(row[0], row[2] if len(row) > 2 else ""): row[1] for row in rows}
+
+
+class TestResolveStatuses:
+    def test_two_complete_hits_become_duplicated(self):
+        rows = [
+            ["b1", "Complete", "s1", "10", "90", "+", "100", "50"],
+            ["b1", "Complete", "s2", "10", "90", "+", "100", "50"],
+        ]
+        assert [row[1] for row in resolve_statuses(rows)] == [
+            "Duplicated",
+            "Duplicated",
+        ]
+
+    def test_single_remaining_duplicate_becomes_complete(self):
+        rows = [["b1", "Duplicated", "s1", "10", "90", "+", "100", "50"]]
+        assert resolve_statuses(rows) == [
+            ["b1", "Complete", "s1", "10", "90", "+", "100", "50"]
+        ]
+
+    def test_fragment_dropped_when_complete_elsewhere(self):
+        rows = [
+            ["b1", "Fragmented", "s1", "10", "40", "+", "30", "20"],
+            ["b1", "Complete", "s2", "10", "90", "+", "100", "50"],
+        ]
+        assert resolve_statuses(rows) == [
+            ["b1", "Complete", "s2", "10", "90", "+", "100", "50"]
+        ]
+
+    def test_missing_only_when_found_nowhere(self):
+        rows = [
+            ["b1", "Missing"],
+            ["b2", "Missing"],
+            ["b2", "Complete", "s1", "10", "90", "+", "100", "50"],
+        ]
+        assert _statuses(resolve_statuses(rows)) == {
+            ("b1", ""): "Missing",
+            ("b2", "s1"): "Complete",
+        }
+
+
+class TestMergeTables:
+    def test_chunk_hits_merged_and_duplicates_resolved(self, tmp_path):
+        header = "# Busco id\tStatus\tSequence\tGene Start\tGene End\n"
+        chunk0 = tmp_path / "full_table_0.tsv"
+        chunk0.write_text(
+            header + "b1\tComplete\ts1\t1\t9\nb2\tComplete\ts1\t20\t40\nb3\tMissing\n"
+        )
+        chunk1 = tmp_path / "full_table_1.tsv"
+        chunk1.write_text(
+            header + "b1\tComplete\ts2\t5\t50\nb2\tMissing\nb3\tMissing\n"
+        )
+        # An empty chunk (fewer sequences than chunks) is just an empty file.
+        empty = tmp_path / "full_table_2.tsv"
+        empty.write_text("")
+
+        merged_header, rows = merge_tables([str(chunk0), str(chunk1), str(empty)])
+
+        assert merged_header == [header]
+        assert _statuses(rows) == {
+            ("b1", "s1"): "Duplicated",
+            ("b1", "s2"): "Duplicated",
+            ("b2", "s1"): "Complete",
+            ("b3", ""): "Missing",
+        }
+        counts = summarize(rows)
+        assert (counts["S"], counts["D"], counts["M"], counts["n"]) == (1, 1, 1, 3)
@@ -1,6 +1,6 @@
 """Tests for busco_to_paf PAF generation, including the co:Z: color tag."""
 
-from hobrac.busco_to_paf import generate_paf
+from hobrac.busco_to_paf import generate_paf, run_batch
 
 
 def test_generate_paf_appends_co_tag(tmp_path):
@@ -38,3 +38,51 @@ def test_generate_paf_appends_co_tag(tmp_path):
     assert f[0] == "chr1"      # query chr (assembly)
     assert f[5] == "scfA"      # target chr (reference)
     assert f[12] == "co:Z:123at4751"
+
+
+def _write_table(path, genes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        f.write("# Busco id\tStatus\tSequence\tGene Start\tGene End\n")
+        for busco_id, chrom, start in genes:
+            f.write(f"{busco_id}\tComplete\t{chrom}\t{start}\t{start + 100}\n")
+
+
+def _write_fasta(path, lengths):
+    with open(path, "w") as f:
+        for name, length in lengths.items():
+            f.write(f">{name}\n{'A' * length}\n")
+
+
+def test_run_batch_writes_every_reference(tmp_path):
+    _write_table(
+        tmp_path / "busco_assembly" / "run_x" / "full_table.tsv",
+        [("g1", "chr1", 100), ("g2", "chr1", 300)],
+    )
+    _write_fasta(tmp_path / "asm.fa", {"chr1": 1000})
+    for accession, chrom in (("GCA_1", "scfA"), ("GCA_2", "scfB")):
+        _write_table(
+            tmp_path / f"busco_reference_{accession}" / "run_x" / "full_table.tsv",
+            [("g1", chrom, 10), ("g2", chrom, 500)],
+        )
+        _write_fasta(tmp_path / f"{accession}.fna", {chrom: 800})
+
+    outputs = run_batch(
+        str(tmp_path / "busco_assembly" / "run_x" / "full_table.tsv"),
+        str(tmp_path / "asm.fa"),
+        ["GCA_1", "GCA_2"],
+        str(tmp_path / "busco_reference_{accession}" / "run*" / "full_table.tsv"),
+        str(tmp_path / "{accession}.fna"),
+        str(tmp_path / "out" / "{accession}"),
+        jobs=2,
+    )
+
+    assert outputs == [str(tmp_path / "out" / "GCA_1"), str(tmp_path / "out" / "GCA_2")]
+    for accession, chrom in (("GCA_1", "scfA"), ("GCA_2", "scfB")):
+        out = tmp_path / "out" / accession
+        lines = (out / "aln_busco.paf").read_text().splitlines()
+        assert [line.split("\t")[5] for line in lines] == [chrom, chrom]
+        assert (out / "query_assembly.idx").read_text() == "Assembly\nchr1\t1000\n"
+        target_idx = (out / "target_reference.idx").read_text()
+        assert target_idx == f"Reference\n{chrom}\t800\n"
+        assert (out / "blocks_busco.tsv").exists()
@@ -0,0 +1,96 @@
+"""Tests for the binned density dotplot renderer."""
+
+import gzip
+
+import numpy as np
+import pytest
+
+from hobrac.density_dotplot import DensityRaster, axis_layout
+
+TARGETS = {"ref1": 1000, "ref2": 1000}
+QUERIES = {"chr1": 500, "chr2": 1500}
+
+
+def _rec(query, target, q_start, q_end, t_start, t_end, strand="+", matches=None):
+    length = max(q_end - q_start, t_end - t_start)
+    matches = length if matches is None else matches
+    return (
+        f"{query}\t{QUERIES.get(query, 0)}\t{q_start}\t{q_end}\t{strand}"
+        f"\t{target}\t{TARGETS.get(target, 0)}\t{t_start}\t{t_end}"
+        f"\t{matches}\t{length}\t60\n"
+    )
+
+
+def test_axis_layout_concatenates_in_order():
+    offsets, total = axis_layout(QUERIES)
+    assert offsets == {"chr1": 0, "chr2": 500}
+    assert total == 2000
+
+
+def test_raster_keeps_aligned_bases_and_strand(tmp_path):
+    paf = tmp_path / "aln.paf"
+    paf.write_text(
+        _rec("chr1", "ref1", 0, 500, 0, 500)
+        + _rec("chr2", "ref2", 0, 800, 100, 900, strand="-", matches=600)
+    )
+    raster = DensityRaster(TARGETS, QUERIES, width=100, height=100)
+    assert raster.add_paf(str(paf)) == 2
+
+    assert raster.bases.sum() == pytest.approx(1300)
+    # Identity-weighted sum: 500 bases at 1.0 and 800 bases at 0.75.
+    assert raster.identity.sum() == pytest.approx(500 + 600)
+    assert raster.strand.sum() == pytest.approx(500 - 800)
+
+    # The forward alignment lies on the bottom-left diagonal.
+    bases = raster.bases.reshape(100, 100)
+    assert bases[0, 0] > 0 and bases[24, 24] > 0
+    assert bases[0, 99] == 0
+
+
+def test_short_and_unknown_records_are_skipped(tmp_path):
+    paf = tmp_path / "aln.paf.gz"
+    with gzip.open(paf, "wt") as f:
+        f.write(_rec("chr1", "ref1", 0, 100, 0, 100))
+        f.write(_rec("chr1", "ref1", 0, 3000, 0, 3000))
+        f.write(_rec("scaffold_9", "ref1", 0, 5000, 0, 5000))
+    raster = DensityRaster(TARGETS, QUERIES, width=50, height=50)
+    assert raster.add_paf(str(paf), min_length=2000) == 1
+    assert raster.bases.sum() == pytest.approx(3000)
+
+
+def test_images_shapes_and_colours(tmp_path):
+    paf = tmp_path / "aln.paf"
+    paf.write_text(
+        _rec("chr1", "ref1", 0, 500, 0, 500)
+        + _rec("chr2", "ref2", 0, 1000, 0, 1000, strand="-")
+    )
+    raster = DensityRaster(TARGETS, QUERIES, width=40, height=30)
+    raster.add_paf(str(paf))
+    color, bw = raster.images(thickness=1)
+
+    assert color.shape == bw.shape == (30, 40, 3)
+    drawn = (bw == 0).all(axis=2)
+    assert drawn.any() and not drawn.all()
+    # Background is white in both images.
+    assert np.allclose(color[~drawn], 1.0)
+    # Forward cells lean blue, reverse cells lean red.
+    forward = color[drawn & (np.arange(40) < 20)[None, :]]
+    reverse = color[drawn & (np.arange(40) >= 20)[None, :]]
+    assert (forward[:, 2] > forward[:, 0]).all()
+    assert (reverse[:, 0] > reverse[:, 2]).all()
+
+    thick, _ = raster.images(thickness=3)
+    assert (thick < 1).any(axis=2).sum() > drawn.sum()
+
+
+def test_thick_lines_do_not_wrap_around_the_edges(tmp_path):
+    paf = tmp_path / "aln.paf"
+    paf.write_text(_rec("chr1", "ref1", 0, 200, 0, 200))
+    raster = DensityRaster(TARGETS, QUERIES, width=40, height=40)
+    raster.add_paf(str(paf))
+    _, bw = raster.images(thickness=2)
+
+    drawn = (bw == 0).all(axis=2)
+    # The alignment starts in the bottom-left corner; nothing on the far edges.
+    assert drawn[-1, 0]
+    assert not drawn[0].any() and not drawn[:, -1].any()
@@ -0,0 +1,151 @@
+"""Tests for marker calling from direct miniprot mappings."""
+
+from hobrac.busco_table import read_full_table
+from hobrac.miniprot_markers import (
+    call_markers,
+    concordance,
+    format_concordance,
+    parse_paf,
+    read_length_cutoffs,
+)
+
+# A full_table.tsv laid out as BUSCO writes it (header lines, OrthoDB url and
+# description columns, one row per Duplicated copy), one marker per status.
+BUSCO_TABLE = (
+    "# BUSCO version is: 6.0.0\n"
+    "# The lineage dataset is: metazoa_odb12 (Creation date: 2024-11-14,"
+    " number of genomes: 65, number of BUSCOs: 4)\n"
+    "# Busco id\tStatus\tSequence\tGene Start\tGene End\tStrand\tScore"
+    "\tLength\tOrthoDB url\tDescription\n"
+    "1000at33208\tComplete\tchr1\t10412\t18655\t+\t512.3\t402"
+    "\thttps://www.orthodb.org/v12/fasta?query=1000at33208\tProteasome subunit\n"
+    "1001at33208\tDuplicated\tchr2\t50210\t57998\t-\t611.0\t455"
+    "\thttps://www.orthodb.org/v12/fasta?query=1001at33208\tRibosomal protein\n"
+    "1001at33208\tDuplicated\tchr5\t1204\t9033\t-\t598.4\t455"
+    "\thttps://www.orthodb.org/v12/fasta?query=1001at33208\tRibosomal protein\n"
+    "1002at33208\tFragmented\tchr3\t300\t1450\t+\t98.1\t120"
+    "\thttps://www.orthodb.org/v12/fasta?query=1002at33208\tDNA polymerase\n"
+    "1003at33208\tMissing\n"
+)
+# marker, number of proteins, length sigma, mean length (BUSCO lengths_cutoff).
+LENGTHS_CUTOFF = (
+    "1000at33208\t65\t20.1\t410.5\n"
+    "1001at33208\t65\t15.2\t460.0\n"
+    "1002at33208\t65\t30.4\t700.3\n"
+    "1003at33208\t65\t12.0\t300.2\n"
+)
+
+
+def _paf(protein, seq, start, end, score, aa=(0, 100), positives=80, stops=0):
+    return (
+        f"{protein}\t120\t{aa[0]}\t{aa[1]}\t+\t{seq}\t10000\t{start}\t{end}"
+        f"\t250\t300\t0\tAS:i:{score}\tnp:i:{positives}\tst:i:{stops}\n"
+    )
+
+
+def _status(rows):
+    return [(row[0], row[1], row[2] if len(row) > 2 else "") for row in rows]
+
+
+def test_parse_paf_reads_marker_and_one_based_start():
+    [hit] = parse_paf(["##PAF header\n", _paf("7at1_9606", "chr1", 99, 400, 321)])
+    assert hit["marker"] == "7at1"
+    assert (hit["sequence"], hit["start"], hit["end"]) == ("chr1", 100, 400)
+    assert (hit["score"], hit["aa_length"], hit["positives"]) == (321, 100, 80)
+
+
+def test_variants_of_a_locus_collapse_and_loci_duplicate():
+    hits = parse_paf(
+        [
+            _paf("1at1_1", "chr1", 0, 300, 200),
+            _paf("1at1_2", "chr1", 100, 400, 250),
+            _paf("1at1_1", "chr2", 0, 300, 240),
+            _paf("2at1_1", "chr3", 0, 300, 240),
+        ]
+    )
+    rows = call_markers(hits, ["1at1", "2at1", "3at1"], {"1at1": 50, "2at1": 50})
+    assert _status(rows) == [
+        ("1at1", "Duplicated", "chr1"),
+        ("1at1", "Duplicated", "chr2"),
+        ("2at1", "Complete", "chr3"),
+        ("3at1", "Missing", ""),
+    ]
+    # The better-scoring variant gives the collapsed locus its coordinates.
+    assert rows[0][3:5] == ["101", "400"]
+
+
+def test_short_stopped_or_dissimilar_hits_are_not_complete():
+    hits = parse_paf(
+        [
+            _paf("1at1", "chr1", 0, 90, 80, aa=(0, 30), positives=25),
+            _paf("2at1", "chr1", 500, 800, 300, stops=1),
+            _paf("3at1", "chr1", 900, 1200, 300, positives=10),
+        ]
+    )
+    rows = call_markers(hits, ["1at1", "2at1", "3at1"], {"1at1": 60, "2at1": 60})
+    assert _status(rows) == [
+        ("1at1", "Fragmented", "chr1"),
+        ("2at1", "Fragmented", "chr1"),
+        ("3at1", "Missing", ""),
+    ]
+
+
+def test_concordance_counts_agreeing_and_moved_markers():
+    busco = [
+        ["1at1", "Complete", "chr1", "100", "400"],
+        ["2at1", "Complete", "chr2", "100", "400"],
+        ["3at1", "Complete", "chr3", "100", "400"],
+        ["4at1", "Missing"],
+    ]
+    engine = [
+        ["1at1", "Complete", "chr1", "150", "380"],
+        ["2at1", "Complete", "chr5", "100", "400"],
+        ["3at1", "Missing"],
+        ["4at1", "Complete", "chr4", "1", "90"],
+    ]
+    result = concordance(busco, engine)
+    assert (result["agree"], result["moved"]) == (1, 1)
+    assert result["precision"] == 1 / 3
+    assert result["recall"] == 1 / 3
+    assert result["confusion"][("Complete", "Missing")] == 1
+    assert result["confusion"][("Missing", "Complete")] == 1
+
+
+def test_concordance_with_a_busco_table(tmp_path):
+    table = tmp_path / "full_table.tsv"
+    table.write_text(BUSCO_TABLE)
+    lineage = tmp_path / "metazoa_odb12"
+    lineage.mkdir()
+    (lineage / "lengths_cutoff").write_text(LENGTHS_CUTOFF)
+    _, busco_rows = read_full_table(str(table))
+
+    hits = parse_paf(
+        [
+            _paf(
+                "1000at33208_1", "chr1", 10500, 18600, 900, aa=(5, 400), positives=320
+            ),
+            _paf(
+                "1001at33208_1", "chr2", 50300, 57900, 950, aa=(0, 450), positives=400
+            ),
+            _paf("1001at33208_2", "chr5", 1300, 9000, 940, aa=(0, 450), positives=390),
+            # A partial hit of the fragmented marker, and a weak paralog hit of
+            # the missing one that the positives threshold discards.
+            _paf("1002at33208_1", "chr3", 250, 1500, 150, aa=(0, 130)),
+            _paf("1003at33208_1", "chr4", 0, 900, 60, aa=(0, 300), positives=90),
+        ]
+    )
+    engine_rows = call_markers(
+        hits,
+        ["1000at33208", "1001at33208", "1002at33208", "1003at33208"],
+        read_length_cutoffs(str(lineage)),
+    )
+    result = concordance(busco_rows, engine_rows)
+    assert (result["agree"], result["moved"]) == (1, 0)
+    assert result["status_agreement"] == {
+        "Complete": (1, 1),
+        "Duplicated": (1, 1),
+        "Fragmented": (1, 1),
+        "Missing": (1, 1),
+    }
+    report = format_concordance(result)
+    assert "Duplicated\t1\t1\t1.0000\n" in report
@@ -0,0 +1,63 @@
+"""Tests for the shared minimap2 index cache."""
+
+import os
+
+from hobrac.mmi_cache import cache_key, evict, get_index
+
+
+def _fake_build(calls):
+    def build(reference, index_path, preset, threads):
+        calls.append(reference)
+        with open(index_path, "w") as f:
+            f.write(f"index of {reference} with {preset}\n")
+
+    return build
+
+
+def test_key_depends_on_content_names_version_and_preset(tmp_path):
+    ref = tmp_path / "ref.fna"
+    ref.write_text(">chr1\nACGT\nAC\n")
+    key = cache_key(str(ref), "2.28", "asm20")
+
+    rewrapped = tmp_path / "rewrapped.fna"
+    rewrapped.write_text(">chr1 desc\nAC\nGTAC\n")
+    assert cache_key(str(rewrapped), "2.28", "asm20") == key
+
+    renamed = tmp_path / "renamed.fna"
+    renamed.write_text(">chrA\nACGTAC\n")
+    assert cache_key(str(renamed), "2.28", "asm20") != key
+    assert cache_key(str(ref), "2.29", "asm20") != key
+    assert cache_key(str(ref), "2.28", "asm5") != key
+
+
+def test_index_is_built_once_and_reused(tmp_path):
+    ref = tmp_path / "ref.fna"
+    ref.write_text(">chr1\nACGT\n")
+    cache = tmp_path / "cache"
+    calls = []
+    build = _fake_build(calls)
+
+    out1 = tmp_path / "a.mmi"
+    out2 = tmp_path / "b.mmi"
+    assert not get_index(str(ref), str(cache), str(out1), version="1", build=build)
+    assert get_index(str(ref), str(cache), str(out2), version="1", build=build)
+
+    assert calls == [str(ref)]
+    assert out1.read_text() == out2.read_text()
+    assert len(os.listdir(cache)) == 1
+
+
+def test_eviction_removes_least_recently_used_entries(tmp_path):
+    for i, name in enumerate(["old", "mid", "new"]):
+        path = tmp_path / f"{name}.mmi"
+        path.write_text("x" * 10)
+        os.utime(path, (1000 + i, 1000 + i))
+
+    removed = evict(str(tmp_path), 25)
+    assert [os.path.basename(p) for p in removed] == ["old.mmi"]
+
+    # The entry just used survives even when it is the oldest one.
+    os.utime(tmp_path / "mid.mmi", (999, 999))
+    removed = evict(str(tmp_path), 15, keep=str(tmp_path / "mid.mmi"))
+    assert [os.path.basename(p) for p in removed] == ["new.mmi"]
+    assert os.listdir(tmp_path) == ["mid.mmi"]
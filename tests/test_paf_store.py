@@ -0,0 +1,57 @@
+"""Tests for the sorted, block-compressed PAF store."""
+
+import gzip
+
+from hobrac.paf_store import iter_records, pack, read_index
+
+
+def _rec(query, target, q_start, length):
+    return (
+        f"{query}\t1000\t{q_start}\t{q_start + length}\t+\t{target}\t2000"
+        f"\t{q_start}\t{q_start + length}\t{length}\t{length}\t60\ttp:A:P\n"
+    )
+
+
+RECORDS = [
+    _rec("chr2", "ref1", 500, 3000),
+    _rec("chr1", "ref2", 10, 100),
+    _rec("chr1", "ref1", 700, 5000),
+    _rec("chr1", "ref1", 20, 1500),
+    _rec("chr2", "ref1", 100, 200),
+]
+
+
+def _store(tmp_path):
+    paf = tmp_path / "aln.paf"
+    paf.write_text("".join(RECORDS))
+    store = str(tmp_path / "aln.paf.gz")
+    pack(str(paf), store)
+    return store
+
+
+def test_store_is_sorted_gzip_readable_and_indexed(tmp_path):
+    store = _store(tmp_path)
+    with gzip.open(store, "rt") as f:
+        assert f.read() == "".join(
+            [RECORDS[3], RECORDS[2], RECORDS[1], RECORDS[4], RECORDS[0]]
+        )
+    index = read_index(store)
+    assert [(e.query, e.target, e.records, e.max_length) for e in index] == [
+        ("chr1", "ref1", 2, 5000),
+        ("chr1", "ref2", 1, 100),
+        ("chr2", "ref1", 2, 3000),
+    ]
+
+
+def test_reader_filters_by_pair_and_min_length(tmp_path):
+    store = _store(tmp_path)
+    assert list(iter_records(store, query="chr2", target="ref1")) == [
+        RECORDS[4],
+        RECORDS[0],
+    ]
+    assert list(iter_records(store, target="ref1", min_length=2000)) == [
+        RECORDS[2],
+        RECORDS[0],
+    ]
+    assert list(iter_records(store, query="chr3")) == []
+    assert len(list(iter_records(store))) == len(RECORDS)
@@ -0,0 +1,46 @@
+"""Tests for the length prefilter of draft assemblies."""
+
+from hobrac.prefilter_fasta import select_sequences, write_excluded
+
+LENGTHS = {"ctg3": 10, "chr1": 500, "ctg1": 40, "chr2": 400, "ctg2": 50}
+
+
+def test_min_length_excludes_short_sequences():
+    kept, excluded = select_sequences(LENGTHS, min_length=100)
+    assert kept == ["chr1", "chr2"]
+    assert excluded == {
+        "ctg3": "min_length",
+        "ctg1": "min_length",
+        "ctg2": "min_length",
+    }
+
+
+def test_coverage_keeps_longest_sequences_covering_the_target():
+    # 900 of 1000 bp are covered by the two chromosomes.
+    kept, excluded = select_sequences(LENGTHS, coverage=90)
+    assert kept == ["chr1", "chr2"]
+    kept, _ = select_sequences(LENGTHS, coverage=91)
+    assert kept == ["chr1", "chr2", "ctg2"]
+    kept, _ = select_sequences(LENGTHS, coverage=91, max_sequences=1)
+    assert kept == ["chr1"]
+
+
+def test_longest_sequence_is_always_kept():
+    kept, _ = select_sequences(LENGTHS, min_length=10_000)
+    assert kept == ["chr1"]
+
+
+def test_excluded_report_records_kept_fraction(tmp_path):
+    kept, excluded = select_sequences(LENGTHS, min_length=100)
+    path = tmp_path / "excluded.tsv"
+    write_excluded(str(path), LENGTHS, kept, excluded)
+    lines = path.read_text().splitlines()
+    assert lines[0] == (
+        "# kept 2 sequences (900 bp, 90.00% of bases); excluded 3 sequences (100 bp)"
+    )
+    assert lines[1:] == [
+        "sequence\tlength\treason",
+        "ctg3\t10\tmin_length",
+        "ctg1\t40\tmin_length",
+        "ctg2\t50\tmin_length",
+    ]
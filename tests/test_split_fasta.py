@@ -0,0 +1,67 @@
+"""Tests for size-balanced FASTA chunking used by the scatter modes."""
+
+import os
+
+from hobrac.fasta_index import balanced_chunks, fasta_lengths
+from hobrac.split_fasta import chunk_path, split_fasta
+
+
+def _fasta(path, records):
+    path.write_text("".join(f">{name} desc\n{seq}\n" for name, seq in records))
+    return str(path)
+
+
+def test_balanced_chunks_keeps_sequences_whole_and_balanced():
+    lengths = {"a": 100, "b": 60, "c": 50, "d": 40, "e": 10}
+    chunks = balanced_chunks(lengths, 2)
+    assert sorted(n for chunk in chunks for n in chunk) == sorted(lengths)
+    totals = sorted(sum(lengths[n] for n in chunk) for chunk in chunks)
+    assert totals == [120, 140]
+    assert chunks == balanced_chunks(lengths, 2)
+
+
+def test_balanced_chunks_preserves_file_order_within_chunk():
+    lengths = {"z": 5, "a": 100, "m": 5}
+    chunks = balanced_chunks(lengths, 2)
+    assert chunks == [["a"], ["z", "m"]]
+
+
+def test_more_chunks_than_sequences_leaves_empty_chunks(tmp_path):
+    fasta = _fasta(tmp_path / "g.fa", [("s1", "ACGT"), ("s2", "AC")])
+    out = tmp_path / "chunks"
+    chunks, _ = split_fasta(fasta, 3, str(out))
+
+    assert chunks == [["s1"], ["s2"], []]
+    assert open(chunk_path(str(out), 0)).read() == ">s1 desc\nACGT\n"
+    assert open(chunk_path(str(out), 1)).read() == ">s2 desc\nAC\n"
+    assert os.path.getsize(chunk_path(str(out), 2)) == 0
+
+
+def test_fasta_lengths_prefers_fresh_fai(tmp_path):
+    fasta = _fasta(tmp_path / "g.fa", [("s1", "ACGT")])
+    fai = tmp_path / "g.fa.fai"
+    fai.write_text("s1\t999\t4\t4\t5\n")
+    assert fasta_lengths(fasta) == {"s1": 999}
+
+    # A stale index (older than the FASTA) is ignored.
+    os.utime(fai, (0, 0))
+    assert fasta_lengths(fasta) == {"s1": 4}
+
+
+def test_gathered_chunks_hold_every_record_once(tmp_path):
+    # The --aln-scatter gather concatenates per-chunk results; minimap2 aligns
+    # each query on its own, so this is the same as aligning the assembly
+    # when every record lands, unchanged, in exactly one chunk.
+    records = [(f"s{i}", "ACGT" * (i + 1)) for i in range(7)]
+    fasta = _fasta(tmp_path / "g.fa", records)
+    out = tmp_path / "chunks"
+    chunks, _ = split_fasta(fasta, 3, str(out))
+
+    gathered = "".join(open(chunk_path(str(out), i)).read() for i in range(3))
+    expected = [f">{name} desc\n{seq}\n" for name, seq in records]
+    assert sorted(f">{r}" for r in gathered.split(">")[1:]) == sorted(expected)
+    manifest = (out / "chunks.tsv").read_text().splitlines()[1:]
+    assert sorted(line.split("\t")[1] for line in manifest) == sorted(
+        name for name, _ in records
+    )
+    assert all(chunks)